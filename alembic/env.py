@@ -9,7 +9,7 @@ from alembic import context
 from dotenv import load_dotenv
 from sqlalchemy import engine_from_config, pool
 
-from research_assistant.db.models import Base
+from research_assistant.db.models import POSTGRES_ONLY_SCHEMA, Base
 
 # Load environment variables
 load_dotenv()
@@ -40,6 +40,11 @@ db_url = (
 config.set_main_option("sqlalchemy.url", db_url)
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave out the full-text search schema that the models create as raw DDL."""
+    return not (type_ in ("column", "index") and name in POSTGRES_ONLY_SCHEMA)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -54,6 +59,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -73,7 +79,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
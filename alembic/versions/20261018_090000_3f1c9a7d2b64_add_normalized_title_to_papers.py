@@ -0,0 +1,75 @@
+"""Add normalized_title to papers
+
+Revision ID: 3f1c9a7d2b64
+Revises: 796c4a6aabcb
+Create Date: 2026-10-18 09:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from research_assistant.normalization import normalize_title
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9a7d2b64"
+down_revision: Union[str, None] = "796c4a6aabcb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "papers", sa.Column("normalized_title", sa.String(length=512), nullable=True)
+    )
+
+    # Backfill in Python so existing rows use the same normalization as the app.
+    # Rows whose normalized title duplicates an older row are left NULL.
+    conn = op.get_bind()
+    papers = sa.table(
+        "papers",
+        sa.column("id", sa.Integer),
+        sa.column("title", sa.String),
+        sa.column("normalized_title", sa.String),
+    )
+    update = (
+        sa.update(papers)
+        .where(papers.c.id == sa.bindparam("paper_id"))
+        .values(normalized_title=sa.bindparam("normalized"))
+    )
+    seen = set()
+    duplicates = 0
+    batch = []
+    for paper_id, title in conn.execute(
+        sa.select(papers.c.id, papers.c.title).order_by(papers.c.id)
+    ).all():
+        normalized = normalize_title(title)
+        if normalized in seen:
+            duplicates += 1
+            continue
+        seen.add(normalized)
+        batch.append({"paper_id": paper_id, "normalized": normalized})
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(update, batch)
+            batch = []
+    if batch:
+        conn.execute(update, batch)
+    if duplicates:
+        print(f"{duplicates} papers duplicate an existing normalized title")
+
+    op.create_index(
+        op.f("ix_papers_normalized_title"),
+        "papers",
+        ["normalized_title"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_papers_normalized_title"), table_name="papers")
+    op.drop_column("papers", "normalized_title")
@@ -0,0 +1,59 @@
+"""Add full-text search to papers
+
+Revision ID: 8b2e4d1a9c57
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 09:30:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b2e4d1a9c57"
+down_revision: Union[str, None] = "3f1c9a7d2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Weighted document: title matches (A) rank above abstract matches (B)
+    op.add_column(
+        "papers",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(abstract, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_papers_search_vector",
+        "papers",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+    # Trigram index for typo-tolerant title lookups
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_papers_title_trgm",
+        "papers",
+        ["title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_papers_title_trgm", table_name="papers")
+    op.drop_index("ix_papers_search_vector", table_name="papers")
+    op.drop_column("papers", "search_vector")
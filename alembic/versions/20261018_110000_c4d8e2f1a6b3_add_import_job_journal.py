@@ -0,0 +1,61 @@
+"""Add import job journal
+
+Revision ID: c4d8e2f1a6b3
+Revises: 8b2e4d1a9c57
+Create Date: 2026-10-18 11:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d8e2f1a6b3"
+down_revision: Union[str, None] = "8b2e4d1a9c57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=1024), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_import_jobs_source"), "import_jobs", ["source"])
+
+    op.create_table(
+        "import_job_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=512), nullable=False),
+        sa.Column("normalized_title", sa.String(length=512), nullable=False),
+        sa.Column("state", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(length=1000), nullable=True),
+        sa.Column("paper_id", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["import_jobs.id"]),
+        sa.ForeignKeyConstraint(["paper_id"], ["papers.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_id", "normalized_title"),
+    )
+    op.create_index(
+        "ix_import_job_items_job_id_state",
+        "import_job_items",
+        ["job_id", "state", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_import_job_items_job_id_state", table_name="import_job_items")
+    op.drop_table("import_job_items")
+    op.drop_index(op.f("ix_import_jobs_source"), table_name="import_jobs")
+    op.drop_table("import_jobs")
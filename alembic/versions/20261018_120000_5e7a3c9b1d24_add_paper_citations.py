@@ -0,0 +1,45 @@
+"""Add paper citations
+
+Revision ID: 5e7a3c9b1d24
+Revises: c4d8e2f1a6b3
+Create Date: 2026-10-18 12:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e7a3c9b1d24"
+down_revision: Union[str, None] = "c4d8e2f1a6b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "paper_citations",
+        sa.Column("citing_id", sa.String(length=100), nullable=False),
+        sa.Column("cited_id", sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint("citing_id", "cited_id"),
+    )
+    op.create_index(
+        op.f("ix_paper_citations_cited_id"), "paper_citations", ["cited_id"]
+    )
+
+    op.create_table(
+        "citation_crawls",
+        sa.Column("semantic_scholar_id", sa.String(length=100), nullable=False),
+        sa.Column("found", sa.Boolean(), nullable=False),
+        sa.Column("crawled_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("semantic_scholar_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("citation_crawls")
+    op.drop_index(op.f("ix_paper_citations_cited_id"), table_name="paper_citations")
+    op.drop_table("paper_citations")
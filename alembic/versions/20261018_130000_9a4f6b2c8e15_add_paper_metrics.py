@@ -0,0 +1,49 @@
+"""Add paper metrics
+
+Revision ID: 9a4f6b2c8e15
+Revises: 5e7a3c9b1d24
+Create Date: 2026-10-18 13:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4f6b2c8e15"
+down_revision: Union[str, None] = "5e7a3c9b1d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "paper_metrics",
+        sa.Column("paper_id", sa.Integer(), nullable=False),
+        sa.Column("pagerank", sa.Float(), nullable=True),
+        sa.Column("in_degree", sa.Integer(), nullable=False),
+        sa.Column("out_degree", sa.Integer(), nullable=False),
+        sa.Column("author_centrality", sa.Float(), nullable=True),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["paper_id"], ["papers.id"]),
+        sa.PrimaryKeyConstraint("paper_id"),
+    )
+
+    op.create_table(
+        "paper_similarities",
+        sa.Column("paper_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("similar_paper_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["paper_id"], ["papers.id"]),
+        sa.ForeignKeyConstraint(["similar_paper_id"], ["papers.id"]),
+        sa.PrimaryKeyConstraint("paper_id", "kind", "similar_paper_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("paper_similarities")
+    op.drop_table("paper_metrics")
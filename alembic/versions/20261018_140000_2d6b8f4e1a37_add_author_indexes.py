@@ -0,0 +1,30 @@
+"""Add author indexes
+
+Revision ID: 2d6b8f4e1a37
+Revises: 9a4f6b2c8e15
+Create Date: 2026-10-18 14:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2d6b8f4e1a37"
+down_revision: Union[str, None] = "9a4f6b2c8e15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_paper_authors_author_id", "paper_authors", ["author_id"], unique=False
+    )
+    op.create_index(op.f("ix_authors_name"), "authors", ["name"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_authors_name"), table_name="authors")
+    op.drop_index("ix_paper_authors_author_id", table_name="paper_authors")
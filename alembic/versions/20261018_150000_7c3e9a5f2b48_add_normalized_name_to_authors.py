@@ -0,0 +1,102 @@
+"""Add normalized_name to authors
+
+Revision ID: 7c3e9a5f2b48
+Revises: 2d6b8f4e1a37
+Create Date: 2026-10-18 15:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from research_assistant.normalization import normalize_author_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3e9a5f2b48"
+down_revision: Union[str, None] = "2d6b8f4e1a37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "authors", sa.Column("normalized_name", sa.String(length=255), nullable=True)
+    )
+
+    # Backfill in Python so existing rows use the same normalization as the app.
+    # Authors sharing a key are merged into the oldest one, whose papers they
+    # take over, so every author stays reachable by its key.
+    conn = op.get_bind()
+    authors = sa.table(
+        "authors",
+        sa.column("id", sa.Integer),
+        sa.column("name", sa.String),
+        sa.column("normalized_name", sa.String),
+    )
+    links = sa.table(
+        "paper_authors",
+        sa.column("paper_id", sa.Integer),
+        sa.column("author_id", sa.Integer),
+    )
+    update = (
+        sa.update(authors)
+        .where(authors.c.id == sa.bindparam("author_id"))
+        .values(normalized_name=sa.bindparam("normalized"))
+    )
+    kept = {}
+    duplicates = []
+    batch = []
+    for author_id, name in conn.execute(
+        sa.select(authors.c.id, authors.c.name).order_by(authors.c.id)
+    ).all():
+        normalized = normalize_author_name(name)
+        if normalized in kept:
+            duplicates.append({"dup": author_id, "keep": kept[normalized]})
+            continue
+        kept[normalized] = author_id
+        batch.append({"author_id": author_id, "normalized": normalized})
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(update, batch)
+            batch = []
+    if batch:
+        conn.execute(update, batch)
+
+    if duplicates:
+        existing = sa.select(links.c.paper_id).where(
+            links.c.author_id == sa.bindparam("keep")
+        )
+        conn.execute(
+            sa.insert(links).from_select(
+                ["paper_id", "author_id"],
+                sa.select(links.c.paper_id, sa.bindparam("keep")).where(
+                    links.c.author_id == sa.bindparam("dup"),
+                    links.c.paper_id.not_in(existing),
+                ),
+            ),
+            duplicates,
+        )
+        conn.execute(
+            sa.delete(links).where(links.c.author_id == sa.bindparam("dup")),
+            duplicates,
+        )
+        conn.execute(
+            sa.delete(authors).where(authors.c.id == sa.bindparam("dup")), duplicates
+        )
+        print(f"Merged {len(duplicates)} authors into authors with the same key")
+
+    op.create_index(
+        op.f("ix_authors_normalized_name"),
+        "authors",
+        ["normalized_name"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_authors_normalized_name"), table_name="authors")
+    op.drop_column("authors", "normalized_name")
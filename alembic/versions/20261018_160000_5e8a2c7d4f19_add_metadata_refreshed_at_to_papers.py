@@ -0,0 +1,36 @@
+"""Add metadata_refreshed_at to papers
+
+Revision ID: 5e8a2c7d4f19
+Revises: 7c3e9a5f2b48
+Create Date: 2026-10-18 16:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8a2c7d4f19"
+down_revision: Union[str, None] = "7c3e9a5f2b48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "papers", sa.Column("metadata_refreshed_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_papers_metadata_refreshed_at"),
+        "papers",
+        ["metadata_refreshed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_papers_metadata_refreshed_at"), table_name="papers")
+    op.drop_column("papers", "metadata_refreshed_at")
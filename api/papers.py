@@ -1,14 +1,58 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import httpx
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+import asyncio
 import datetime
-from typing import Optional, List
-from pydantic import BaseModel
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, List, Tuple
+from pydantic import BaseModel, TypeAdapter
 
-from research_assistant.db.config import get_db
-from research_assistant.db.models import DBPaper
+from research_assistant.db.config import get_async_db, get_async_sessionmaker
+from research_assistant.db.models import DBAuthor, DBPaper, paper_authors
+from research_assistant.db.service import store_papers_bulk
+from research_assistant.embedding_index import EmbeddingIndex, get_embedding_index
+from research_assistant.models import Paper as PaperData
+from research_assistant.normalization import normalize_title
+from research_assistant.paper_search import fetch_papers_async, search_papers_async
+from research_assistant.response_cache import (
+    CachedResponse,
+    etag_matches,
+    get_response_cache,
+    make_etag,
+)
+from research_assistant.rate_limit import TokenBucket
+from research_assistant.semantic_scholar_client import (
+    AsyncSemanticScholarClient,
+    SemanticScholarAPIError,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Rows fetched per round trip when streaming exports
+EXPORT_CHUNK_SIZE = 1000
+# Most ids, titles and Semantic Scholar ids accepted by one batch lookup
+BATCH_MAX_KEYS = 1000
+# Most missing titles and Semantic Scholar ids one batch lookup fetches, so a
+# single request cannot spend minutes of the shared API quota
+FETCH_MAX_KEYS = 25
+
+
+class Author(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        orm_mode = True
+
 
 class Paper(BaseModel):
     id: int
@@ -23,24 +67,478 @@ class Paper(BaseModel):
     semantic_scholar_id: Optional[str]
     created_at: Optional[datetime.datetime]
     updated_at: Optional[datetime.datetime]
+    authors: List[Author] = []
 
     class Config:
         orm_mode = True
 
 
+class SimilarPaper(BaseModel):
+    paper: Paper
+    similarity: float
+
+
+class PaperBatchRequest(BaseModel):
+    ids: List[int] = []
+    titles: List[str] = []
+    semantic_scholar_ids: List[str] = []
+    # Look papers that are not stored up on Semantic Scholar and store them
+    fetch_missing: bool = False
+
+
+class PaperBatchResponse(BaseModel):
+    # One entry per requested key, in request order, null when not found
+    ids: List[Optional[Paper]]
+    titles: List[Optional[Paper]]
+    semantic_scholar_ids: List[Optional[Paper]]
+    # Papers found on Semantic Scholar and stored by this request
+    fetched: int = 0
+    # Missing keys not looked up because the API failed or FETCH_MAX_KEYS was
+    # reached; they are null and can be requested again
+    not_fetched: int = 0
+
+
+_paper_adapter = TypeAdapter(Paper)
+_paper_list_adapter = TypeAdapter(List[Paper])
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated ``fields=`` projection against the Paper schema."""
+    if fields is None:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in Paper.model_fields]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields",
+        )
+    # Always include the id so clients can page and look papers up
+    return ["id"] + [f for f in requested if f != "id"]
+
+
 @router.get("/papers", response_model=List[Paper])
-def get_papers(db: Session = Depends(get_db)):
-    return _query_papers(db)
+async def get_papers(
+    after: Optional[int] = Query(None, description="Return papers with id > after"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    columns = _parse_fields(fields)
+
+    async def produce(params: str) -> CachedResponse:
+        if columns is None:
+            papers = await _query_papers(db, after, limit)
+            versions = [(paper.id, paper.updated_at) for paper in papers]
+            body = _paper_list_adapter.dump_json(
+                _paper_list_adapter.validate_python(papers, from_attributes=True)
+            )
+        else:
+            # The ETag needs updated_at even when it is not requested
+            extra = [] if "updated_at" in columns else ["updated_at"]
+            papers = await _query_paper_fields(db, columns + extra, after, limit)
+            versions = [(paper["id"], paper["updated_at"]) for paper in papers]
+            for paper in papers:
+                for name in extra:
+                    del paper[name]
+            body = json.dumps(
+                papers, default=_json_default, separators=(",", ":")
+            ).encode("utf-8")
+
+        headers = {}
+        if papers and len(papers) == limit:
+            headers["X-Next-Cursor"] = str(versions[-1][0])
+        return CachedResponse(body, make_etag(params, versions), headers)
+
+    params = f"after={after}&limit={limit}&fields={','.join(columns or [])}"
+    return await _cached_response("papers", params, if_none_match, produce)
+
+
+@router.post("/papers/batch", response_model=PaperBatchResponse)
+async def get_papers_batch(
+    request: PaperBatchRequest, db: AsyncSession = Depends(get_async_db)
+):
+    keys = len(request.ids) + len(request.titles) + len(request.semantic_scholar_ids)
+    if keys > BATCH_MAX_KEYS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {BATCH_MAX_KEYS} keys per batch"
+        )
+
+    title_keys = [normalize_title(title) for title in request.titles]
+    papers = await _query_papers_by_keys(
+        db, request.ids, title_keys, request.semantic_scholar_ids
+    )
+    by_id = {paper.id: paper for paper in papers}
+    by_title = {paper.normalized_title: paper for paper in papers}
+    by_s2_id = {paper.semantic_scholar_id: paper for paper in papers}
+
+    fetched = not_fetched = 0
+    if request.fetch_missing:
+        missing_titles = sorted(
+            {
+                title
+                for title, key in zip(request.titles, title_keys)
+                if key not in by_title
+            }
+        )
+        missing_s2_ids = sorted(
+            {s2_id for s2_id in request.semantic_scholar_ids if s2_id not in by_s2_id}
+        )
+        # Ids go first: they are fetched in batches, titles one search each
+        skipped = max(0, len(missing_s2_ids) + len(missing_titles) - FETCH_MAX_KEYS)
+        missing_s2_ids = missing_s2_ids[:FETCH_MAX_KEYS]
+        missing_titles = missing_titles[: FETCH_MAX_KEYS - len(missing_s2_ids)]
+        found_titles, found_s2_ids, failed = await _fetch_missing_papers(
+            db, missing_titles, missing_s2_ids
+        )
+        fetched = len(found_titles) + len(found_s2_ids)
+        not_fetched = failed + skipped
+        # Papers are stored under the title Semantic Scholar has, which fuzzy
+        # title matches do not share with the request
+        stored = await _query_papers_by_keys(
+            db, [], [*found_titles.values(), *found_s2_ids.values()], []
+        )
+        stored_by_title = {paper.normalized_title: paper for paper in stored}
+        for title, key in zip(request.titles, title_keys):
+            if title in found_titles:
+                by_title[key] = stored_by_title.get(found_titles[title])
+        for s2_id, key in found_s2_ids.items():
+            by_s2_id[s2_id] = stored_by_title.get(key)
+
+    def _validate(paper: Optional[DBPaper]) -> Optional[Paper]:
+        return (
+            None
+            if paper is None
+            else _paper_adapter.validate_python(paper, from_attributes=True)
+        )
+
+    return PaperBatchResponse(
+        ids=[_validate(by_id.get(paper_id)) for paper_id in request.ids],
+        titles=[_validate(by_title.get(key)) for key in title_keys],
+        semantic_scholar_ids=[
+            _validate(by_s2_id.get(s2_id)) for s2_id in request.semantic_scholar_ids
+        ],
+        fetched=fetched,
+        not_fetched=not_fetched,
+    )
+
+
+@router.get("/papers/export")
+async def export_papers(fields: Optional[str] = Query(None)):
+    columns = _parse_fields(fields) or [f for f in Paper.model_fields if f != "authors"]
+    if "authors" in columns:
+        raise HTTPException(status_code=400, detail="Authors cannot be exported")
+    return StreamingResponse(
+        _iter_papers_ndjson(columns), media_type="application/x-ndjson"
+    )
 
 
 @router.get("/papers/{paper_id}", response_model=Paper)
-def get_paper(paper_id: int, db: Session = Depends(get_db)):
-    return _query_paper(paper_id, db)
+async def get_paper(
+    paper_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def produce(params: str) -> CachedResponse:
+        paper = await _query_paper(paper_id, db)
+        if paper is None:
+            raise HTTPException(status_code=404, detail="Paper not found")
+        body = _paper_adapter.dump_json(
+            _paper_adapter.validate_python(paper, from_attributes=True)
+        )
+        return CachedResponse(body, make_etag(params, [(paper.id, paper.updated_at)]))
+
+    return await _cached_response(
+        "paper", str(paper_id), if_none_match, produce, paper_id=paper_id
+    )
+
+
+@router.get("/authors/{author_id}/papers", response_model=List[Paper])
+async def get_author_papers(
+    author_id: int,
+    after: Optional[int] = Query(None, description="Return papers with id > after"),
+    limit: int = Query(100, ge=1, le=1000),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def produce(params: str) -> CachedResponse:
+        stmt = (
+            select(DBPaper)
+            .join(paper_authors, paper_authors.c.paper_id == DBPaper.id)
+            .where(paper_authors.c.author_id == author_id)
+            .options(selectinload(DBPaper.authors))
+        )
+        if after is not None:
+            stmt = stmt.where(DBPaper.id > after)
+        papers = list(await db.scalars(stmt.order_by(DBPaper.id).limit(limit)))
+        # Only check whether the author exists when there is nothing to show
+        if not papers and await db.get(DBAuthor, author_id) is None:
+            raise HTTPException(status_code=404, detail="Author not found")
+
+        headers = {}
+        if len(papers) == limit:
+            headers["X-Next-Cursor"] = str(papers[-1].id)
+        body = _paper_list_adapter.dump_json(
+            _paper_list_adapter.validate_python(papers, from_attributes=True)
+        )
+        versions = [(paper.id, paper.updated_at) for paper in papers]
+        return CachedResponse(body, make_etag(params, versions), headers)
+
+    params = f"author={author_id}&after={after}&limit={limit}"
+    return await _cached_response("author_papers", params, if_none_match, produce)
+
+
+@router.get("/metrics/cache")
+async def get_cache_metrics():
+    cache = get_response_cache()
+    if cache is None:
+        raise HTTPException(status_code=404, detail="Response cache disabled")
+    return cache.stats()
+
+
+@router.get("/papers/{paper_id}/similar", response_model=List[SimilarPaper])
+async def get_similar_papers(
+    paper_id: int,
+    k: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Opened at startup; embedding and searching block, so they run in threads
+    index = await run_in_threadpool(get_embedding_index)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Similar papers not configured")
+    paper = await _query_paper(paper_id, db)
+    if paper is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+
+    matches = await run_in_threadpool(_search_similar, index, paper, k)
+    result = await db.scalars(
+        select(DBPaper)
+        .where(DBPaper.id.in_([match_id for match_id, _ in matches]))
+        .options(selectinload(DBPaper.authors))
+    )
+    papers = {similar.id: similar for similar in result}
+    return [
+        SimilarPaper(
+            paper=Paper.model_validate(papers[match_id], from_attributes=True),
+            similarity=similarity,
+        )
+        for match_id, similarity in matches
+        if match_id in papers
+    ]
+
+
+def _search_similar(
+    index: EmbeddingIndex, paper: DBPaper, k: int
+) -> List[Tuple[int, float]]:
+    index.refresh()
+    return index.search(index.paper_vector(paper), k, exclude=paper.id)
+
+
+async def _cached_response(
+    route: str,
+    params: str,
+    if_none_match: Optional[str],
+    produce: Callable[[str], Awaitable[CachedResponse]],
+    paper_id: Optional[int] = None,
+) -> Response:
+    """
+    Serve a JSON response from the response cache, producing it on a miss.
+
+    Args:
+        route: Route name, part of the cache key and ETag
+        params: Canonical query parameters of the request
+        if_none_match: ``If-None-Match`` request header
+        produce: Queries and serializes the response given the ETag key
+        paper_id: Paper a single-paper response is cached under
+
+    Returns:
+        Response: The cached or produced body, or 304 if the client's copy
+        is current
+    """
+    started = time.perf_counter()
+    cache = get_response_cache()
+    etag_key = f"{route}:{params}"
+    cached = None
+    if cache is not None:
+        key = (
+            cache.paper_key(paper_id)
+            if paper_id is not None
+            else cache.listing_key(route, params)
+        )
+        cached = cache.get(key)
+    hit = cached is not None
+    if cached is None:
+        cached = await produce(etag_key)
+        if cache is not None:
+            cache.put(key, cached)
+
+    headers = {
+        **cached.headers,
+        "ETag": cached.etag,
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    not_modified = etag_matches(if_none_match, cached.etag)
+    if not_modified:
+        response = Response(status_code=304, headers=headers)
+    else:
+        response = Response(cached.body, media_type="application/json", headers=headers)
+    if cache is not None:
+        cache.record(hit, time.perf_counter() - started, not_modified)
+    return response
+
+
+async def _query_papers_by_keys(
+    db: AsyncSession,
+    ids: List[int],
+    normalized_titles: List[str],
+    semantic_scholar_ids: List[str],
+) -> List[DBPaper]:
+    """Load the papers matching any of the keys with a single query."""
+    conditions = []
+    if ids:
+        conditions.append(DBPaper.id.in_(set(ids)))
+    if normalized_titles:
+        conditions.append(DBPaper.normalized_title.in_(set(normalized_titles)))
+    if semantic_scholar_ids:
+        conditions.append(DBPaper.semantic_scholar_id.in_(set(semantic_scholar_ids)))
+    if not conditions:
+        return []
+    result = await db.scalars(
+        select(DBPaper).where(or_(*conditions)).options(selectinload(DBPaper.authors))
+    )
+    return list(result)
+
+
+@lru_cache(maxsize=1)
+def _semantic_scholar_limiter() -> TokenBucket:
+    """Rate limiter shared by every request that calls Semantic Scholar."""
+    return TokenBucket.from_env()
+
+
+async def _fetch_missing_papers(
+    db: AsyncSession, titles: List[str], semantic_scholar_ids: List[str]
+) -> Tuple[Dict[str, str], Dict[str, str], int]:
+    """
+    Look papers up on Semantic Scholar and store the ones found.
+
+    A lookup that fails is logged and counted rather than failing the request,
+    so the papers found by the other lookups are still stored and returned.
+
+    Args:
+        db: Database session
+        titles: Titles to search for, one request each
+        semantic_scholar_ids: Semantic Scholar ids to fetch in batch requests
+
+    Returns:
+        Tuple[Dict[str, str], Dict[str, str], int]: Normalized title of the
+        paper found for each found title and for each found Semantic Scholar
+        id, and the number of titles and ids whose lookup failed
+    """
+    if not titles and not semantic_scholar_ids:
+        return {}, {}, 0
+
+    async def lookup(fetch, keys: List[str]) -> List[Optional[PaperData]]:
+        nonlocal failed
+        try:
+            return await fetch(keys, client=client)
+        except (SemanticScholarAPIError, httpx.TransportError) as e:
+            logger.warning(f"Semantic Scholar lookup of {len(keys)} keys failed: {e}")
+            failed += len(keys)
+            return [None] * len(keys)
+
+    failed = 0
+    async with AsyncSemanticScholarClient(
+        limiter=_semantic_scholar_limiter()
+    ) as client:
+        by_s2_id, *searches = await asyncio.gather(
+            lookup(fetch_papers_async, semantic_scholar_ids),
+            *(lookup(search_papers_async, [title]) for title in titles),
+        )
+    by_title = [paper for found in searches for paper in found]
+
+    papers = [paper for paper in by_s2_id + by_title if paper is not None]
+    if papers:
+        await db.run_sync(store_papers_bulk, papers)
+    found_titles, found_s2_ids = (
+        {
+            key: normalize_title(paper.title)
+            for key, paper in zip(keys, found)
+            if paper is not None
+        }
+        for keys, found in ((titles, by_title), (semantic_scholar_ids, by_s2_id))
+    )
+    return found_titles, found_s2_ids, failed
+
+
+async def _query_papers(
+    db: AsyncSession, after: Optional[int] = None, limit: int = 100
+) -> List[DBPaper]:
+    stmt = select(DBPaper).options(selectinload(DBPaper.authors))
+    if after is not None:
+        stmt = stmt.where(DBPaper.id > after)
+    result = await db.scalars(stmt.order_by(DBPaper.id).limit(limit))
+    return list(result)
+
+
+async def _query_paper_fields(
+    db: AsyncSession, columns: List[str], after: Optional[int], limit: int
+) -> List[dict]:
+    stmt = select(*(DBPaper.__table__.c[name] for name in columns if name != "authors"))
+    if after is not None:
+        stmt = stmt.where(DBPaper.id > after)
+    rows = await db.execute(stmt.order_by(DBPaper.id).limit(limit))
+    papers = [dict(row._mapping) for row in rows]
+    if "authors" in columns:
+        authors = await _query_authors(db, [paper["id"] for paper in papers])
+        for paper in papers:
+            paper["authors"] = authors.get(paper["id"], [])
+    return papers
+
+
+async def _query_authors(
+    db: AsyncSession, paper_ids: List[int]
+) -> Dict[int, List[dict]]:
+    """Load the authors of many papers with one joined query."""
+    if not paper_ids:
+        return {}
+    rows = await db.execute(
+        select(paper_authors.c.paper_id, DBAuthor.id, DBAuthor.name)
+        .join(DBAuthor, DBAuthor.id == paper_authors.c.author_id)
+        .where(paper_authors.c.paper_id.in_(paper_ids))
+    )
+    authors: Dict[int, List[dict]] = {}
+    for paper_id, author_id, name in rows:
+        authors.setdefault(paper_id, []).append({"id": author_id, "name": name})
+    return authors
+
+
+async def _iter_papers_ndjson(columns: List[str]) -> AsyncIterator[str]:
+    """
+    Stream papers as NDJSON lines using a server-side cursor.
+
+    Opens its own session because the response body is produced after the
+    request's dependencies have been torn down.
+    """
+    async with get_async_sessionmaker()() as db:
+        stmt = (
+            select(*(DBPaper.__table__.c[name] for name in columns))
+            .order_by(DBPaper.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        result = await db.stream(stmt)
+        async for partition in result.partitions():
+            yield "".join(
+                json.dumps(dict(row._mapping), default=_json_default) + "\n"
+                for row in partition
+            )
 
 
-def _query_papers(db: Session):
-    return db.query(DBPaper).all()
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
 
 
-def _query_paper(paper_id: int, db: Session):
-    return db.query(DBPaper).filter(DBPaper.id == paper_id).first()
+async def _query_paper(paper_id: int, db: AsyncSession) -> Optional[DBPaper]:
+    return await db.get(DBPaper, paper_id, options=[selectinload(DBPaper.authors)])
@@ -0,0 +1,100 @@
+"""
+Benchmark similar-paper search latency and recall on synthetic embeddings.
+
+    python -m benchmarks.bench_embedding_index --papers 1000000
+
+Vectors are drawn around random topic centres, indexed through the same
+append path the papers-stored listener uses, and queried with indexed papers'
+own vectors as ``/papers/{id}/similar`` does. TF-IDF/SVD embedding throughput
+is measured separately on synthetic titles.
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_title_matching import synthetic_titles
+from research_assistant.embedding_index import EmbeddingIndex
+from research_assistant.embeddings import TfidfSvdEmbedder
+
+
+class SyntheticEmbedder:
+    """Embeds the text "i" as row i of a precomputed matrix."""
+
+    name = "synthetic"
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.dim = vectors.shape[1]
+
+    def embed(self, texts):
+        return self.vectors[[int(text) for text in texts]]
+
+
+def synthetic_vectors(count: int, dim: int, topics: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(topics, dim)).astype(np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 100_000):
+        end = min(start + 100_000, count)
+        vectors[start:end] = centres[rng.integers(topics, size=end - start)]
+        vectors[start:end] += rng.normal(scale=0.6, size=(end - start, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--papers", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--embed-titles", type=int, default=20_000)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.embed_titles)
+    started = time.perf_counter()
+    embedder = TfidfSvdEmbedder.fit(titles[: args.embed_titles // 2])
+    fitted = time.perf_counter()
+    embedder.embed(titles)
+    embedded = time.perf_counter()
+    print(
+        f"TF-IDF/SVD: fit on {args.embed_titles // 2:,} titles in "
+        f"{fitted - started:.2f}s, embedded {len(titles) / (embedded - fitted):,.0f} "
+        f"titles/s"
+    )
+
+    vectors = synthetic_vectors(args.papers, args.dim, args.topics)
+    embedder = SyntheticEmbedder(vectors)
+    with tempfile.TemporaryDirectory() as path:
+        index = EmbeddingIndex.create(path, embedder, nprobe=args.nprobe)
+        started = time.perf_counter()
+        for start in range(0, args.papers, 100_000):
+            ids = list(range(start, min(start + 100_000, args.papers)))
+            index.add(ids, [str(i) for i in ids])
+        print(
+            f"Indexed {args.papers:,} vectors in {time.perf_counter() - started:.1f}s "
+            f"({len(index.centroids)} lists)"
+        )
+
+        rng = np.random.default_rng(1)
+        queries = rng.choice(args.papers, args.queries, replace=False)
+        latencies = []
+        recalls = []
+        for i, paper_id in enumerate(queries.tolist()):
+            started = time.perf_counter()
+            index.refresh()
+            results = index.search(index.vector(paper_id), k=10, exclude=paper_id)
+            latencies.append(time.perf_counter() - started)
+            if i < 100:
+                exact = np.argsort(-(vectors @ vectors[paper_id]))[1:11]
+                recalls.append(len({r for r, _ in results} & set(exact.tolist())) / 10)
+
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(
+            f"Search (nprobe={args.nprobe}): p50 {p50:.2f} ms, p99 {p99:.2f} ms, "
+            f"recall@10 {np.mean(recalls):.3f}"
+        )
@@ -0,0 +1,79 @@
+"""
+Benchmark the citation graph analytics on a synthetic graph.
+
+    python -m benchmarks.bench_graph_analytics --papers 200000 --references 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from research_assistant.citation_graph import CitationGraph
+from research_assistant.graph_analytics import (
+    author_centrality,
+    citation_matrix,
+    pagerank,
+    similar_nodes,
+)
+
+
+def synthetic_citations(papers: int, references: int, seed: int = 0):
+    """
+    Citing and cited node arrays where each paper cites earlier papers.
+
+    Squaring uniform offsets skews citations towards the oldest papers, giving
+    the heavy-tailed in-degrees of real citation graphs.
+    """
+    rng = np.random.default_rng(seed)
+    citing = np.repeat(np.arange(1, papers, dtype=np.int32), references)
+    cited = (citing * rng.random(len(citing)) ** 2).astype(np.int32)
+    return citing, cited
+
+
+def timed(label: str, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    print(f"{label:<28}{time.perf_counter() - started:>8.2f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--papers", type=int, default=200_000)
+    parser.add_argument("--references", type=int, default=10)
+    parser.add_argument("--similar-rows", type=int, default=20_000)
+    parser.add_argument("--authors-per-paper", type=int, default=4)
+    args = parser.parse_args()
+
+    citing, cited = synthetic_citations(args.papers, args.references)
+    print(f"{args.papers:,} papers, {len(citing):,} citations")
+    node_ids = [str(i) for i in range(args.papers)]
+
+    graph = timed("CSR graph", CitationGraph.from_edges, node_ids, citing, cited)
+    adjacency = timed("Adjacency matrix", citation_matrix, graph)
+    adjacency_t = adjacency.T.tocsr()
+    rank = timed("PageRank", pagerank, adjacency)
+    print(f"{'':<28}top paper {int(np.argmax(rank))}, rank {rank.max():.2e}")
+
+    rng = np.random.default_rng(1)
+    rows = rng.choice(args.papers, min(args.similar_rows, args.papers), replace=False)
+    candidates = np.ones(args.papers, dtype=bool)
+    for label, left, right in (
+        ("Co-citation top-k", adjacency_t, adjacency),
+        ("Bibliographic coupling top-k", adjacency, adjacency_t),
+    ):
+        degrees = np.diff(left.indptr)
+        started = time.perf_counter()
+        found = sum(1 for _ in similar_nodes(left, right, degrees, rows, candidates))
+        elapsed = time.perf_counter() - started
+        print(
+            f"{label:<28}{elapsed:>8.2f}s  {len(rows) / elapsed:,.0f} papers/s "
+            f"({found:,} with related papers)"
+        )
+
+    # Authors drawn from a pool a quarter the size of the papers, Zipf-weighted
+    links = args.papers * args.authors_per_paper
+    paper_rows = np.repeat(np.arange(args.papers), args.authors_per_paper)
+    author_ids = rng.zipf(1.5, links) % (args.papers // 4)
+    timed("Author centrality", author_centrality, paper_rows, author_ids, args.papers)
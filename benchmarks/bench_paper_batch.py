@@ -0,0 +1,142 @@
+"""
+Benchmark the memory held per paper by each in-memory representation.
+
+    python -m benchmarks.bench_paper_batch --papers 200000
+
+Papers are decoded from JSON lines, as the importers do, so every
+representation owns its strings. Compares the previous dict-backed dataclasses,
+the slotted ``Paper``/``Author`` and a columnar ``PaperBatch``, and times
+pickling, which is how parsed papers travel between loader processes.
+"""
+
+import argparse
+import gc
+import json
+import pickle
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Optional
+
+from benchmarks.bench_title_matching import synthetic_titles
+from research_assistant.models import Author, Paper
+from research_assistant.paper_batch import PaperBatch
+
+
+# The models before they were slotted
+@dataclass
+class LegacyAuthor:
+    name: str
+    affiliations: Optional[List[str]] = None
+
+
+@dataclass
+class LegacyPaper:
+    title: str
+    authors: List[LegacyAuthor]
+    abstract: Optional[str] = None
+    url: Optional[str] = None
+    venue: Optional[str] = None
+    year: Optional[int] = None
+    title_similarity: Optional[float] = None
+    citation_count: Optional[int] = None
+    reference_count: Optional[int] = None
+    is_open_access: Optional[bool] = None
+    semantic_scholar_id: Optional[str] = None
+
+
+def synthetic_records(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    first = ["Ada", "Alan", "Grace", "Barbara", "Donald", "Edsger", "Frances"]
+    last = ["Lovelace", "Turing", "Hopper", "Liskov", "Knuth", "Dijkstra", "Allen"]
+    # About as many distinct authors per paper as in Semantic Scholar
+    names = [
+        f"{rng.choice(first)} {rng.choice(last)}-{i}" for i in range(count // 2 or 1)
+    ]
+    return [
+        json.dumps(
+            {
+                "paperId": f"{rng.getrandbits(160):040x}",
+                "title": title,
+                "authors": [
+                    {"name": rng.choice(names)} for _ in range(rng.randint(1, 6))
+                ],
+                "url": f"https://www.semanticscholar.org/paper/{i}",
+                "venue": rng.choice(["NeurIPS", "ICML", "ACL", "CVPR", "Nature"]),
+                "year": rng.randint(1990, 2025),
+                "citationCount": rng.randint(0, 5000),
+                "referenceCount": rng.randint(0, 80),
+                "isOpenAccess": rng.random() < 0.5,
+            }
+        )
+        for i, title in enumerate(synthetic_titles(count, seed))
+    ]
+
+
+def build(lines: List[str], paper_cls, author_cls) -> list:
+    papers = []
+    for line in lines:
+        record = json.loads(line)
+        papers.append(
+            paper_cls(
+                title=record["title"],
+                authors=[author_cls(name=a["name"]) for a in record["authors"]],
+                url=record["url"],
+                venue=record["venue"],
+                year=record["year"],
+                citation_count=record["citationCount"],
+                reference_count=record["referenceCount"],
+                is_open_access=record["isOpenAccess"],
+                semantic_scholar_id=record["paperId"],
+            )
+        )
+    return papers
+
+
+def measure(make):
+    """Return what ``make`` built and the bytes it retains."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = make()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--papers", type=int, default=200_000)
+    args = parser.parse_args()
+
+    lines = synthetic_records(args.papers)
+    baseline = None
+    for name, make in (
+        ("dict dataclasses", lambda: build(lines, LegacyPaper, LegacyAuthor)),
+        ("slotted dataclasses", lambda: build(lines, Paper, Author)),
+        ("PaperBatch", lambda: PaperBatch.from_papers(build(lines, Paper, Author))),
+    ):
+        papers, retained, elapsed = measure(make)
+        baseline = baseline or retained
+        started = time.perf_counter()
+        payload = pickle.dumps(papers, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.loads(payload)
+        pickled = time.perf_counter() - started
+        print(
+            f"{name:20} {retained / args.papers:6.0f} bytes/paper "
+            f"({baseline / retained:4.1f}x less than dict), built in {elapsed:.2f}s, "
+            f"pickle round trip {pickled:.2f}s ({len(payload) / 2**20:.0f} MiB)"
+        )
+        del papers, payload
+
+    batch = PaperBatch.from_papers(build(lines, Paper, Author))
+    started = time.perf_counter()
+    for view in batch:
+        view.title, view.year, view.authors
+    print(
+        f"Reading title, year and authors through views: "
+        f"{args.papers / (time.perf_counter() - started):,.0f} papers/s"
+    )
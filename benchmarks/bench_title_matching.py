@@ -0,0 +1,81 @@
+"""
+Benchmark title similarity against the previous difflib.SequenceMatcher approach.
+
+    python -m benchmarks.bench_title_matching --titles 20000
+"""
+
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+from typing import List
+
+from research_assistant.title_matching import TitleMatcher, title_similarity
+
+
+def synthetic_titles(count: int, seed: int = 0, vocabulary: int = 5000) -> List[str]:
+    """Random titles over a Zipf-like vocabulary of pseudo-words."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+        for _ in range(vocabulary)
+    ]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    return [
+        " ".join(rng.choices(words, weights, k=rng.randint(5, 12))).capitalize()
+        for _ in range(count)
+    ]
+
+
+def perturb(title: str, rng: random.Random) -> str:
+    """Introduce a typo and change punctuation/case, like a hand-typed CSV entry."""
+    position = rng.randrange(len(title))
+    title = title[:position] + title[position + 1 :]
+    return title.upper().replace(" ", " - ", 1)
+
+
+def sequence_matcher_similarity(title1: str, title2: str) -> float:
+    return SequenceMatcher(None, title1.lower(), title2.lower()).ratio()
+
+
+def rate(fn, pairs) -> float:
+    started = time.perf_counter()
+    for a, b in pairs:
+        fn(a, b)
+    return len(pairs) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=20000)
+    parser.add_argument("--pairs", type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    corpus = synthetic_titles(args.titles)
+    pairs = [(rng.choice(corpus), rng.choice(corpus)) for _ in range(args.pairs)]
+
+    for label, fn in [
+        ("SequenceMatcher", sequence_matcher_similarity),
+        ("title_similarity (cold)", title_similarity),
+        ("title_similarity (cached)", title_similarity),
+    ]:
+        print(f"{label + ':':<27}{rate(fn, pairs):>12,.0f} comparisons/s")
+
+    started = time.perf_counter()
+    matcher = TitleMatcher(corpus)
+    print(f"Indexed {len(corpus):,} titles in {time.perf_counter() - started:.2f}s")
+
+    queries = [
+        perturb(title, rng) for title in rng.sample(corpus, min(2000, len(corpus)))
+    ]
+    started = time.perf_counter()
+    results = matcher.match_many(queries)
+    elapsed = time.perf_counter() - started
+    found = sum(1 for result in results if result is not None)
+    print(
+        f"Matched {len(queries):,} perturbed titles ({found:,} found) "
+        f"in {elapsed:.2f}s: {len(queries) / elapsed:,.0f} titles/s, "
+        f"{len(queries) * len(corpus) / elapsed:,.0f} comparisons/s"
+    )
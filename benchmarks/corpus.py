@@ -0,0 +1,156 @@
+"""
+Synthetic paper corpora for the benchmark suite.
+
+Records are generated from a seed and shaped like Semantic Scholar API
+responses. The corpus of n papers is a prefix of every larger one, so a
+database can be grown from 1k to 1M papers between benchmark rounds by
+loading only the papers it is missing:
+
+    python -m benchmarks.corpus --papers 100000 --output corpus.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+from typing import Iterator, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from research_assistant.dataset_loader import load_dataset
+from research_assistant.db.models import DBPaper
+
+VENUES = ["NeurIPS", "ICML", "ICLR", "ACL", "EMNLP", "CVPR", "KDD", "Nature", None]
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Barbara", "Donald", "Edsger", "Frances"]
+LAST_NAMES = ["Lovelace", "Turing", "Hopper", "Liskov", "Knuth", "Dijkstra", "Allen"]
+# Large enough that a million titles rarely collide
+VOCABULARY = 20_000
+
+
+def _words(rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+        for _ in range(VOCABULARY)
+    ]
+
+
+def synthetic_records(start: int, stop: int, seed: int = 0) -> Iterator[dict]:
+    """
+    Yield papers ``start`` to ``stop`` of the corpus as API records.
+
+    Titles are unique after normalization and drawn, like abstracts, from a
+    Zipf-like vocabulary of pseudo-words. The author pool grows with the
+    corpus, about one author per two papers.
+
+    Args:
+        start: Index of the first paper
+        stop: Index after the last paper
+        seed: Corpus seed
+
+    Yields:
+        dict: Paper record with camelCase Graph API keys
+    """
+    rng = random.Random(seed)
+    words = _words(rng)
+    cum_weights = []
+    total = 0.0
+    for rank in range(VOCABULARY):
+        total += 1 / (rank + 1)
+        cum_weights.append(total)
+
+    seen = set()
+    index = 0
+    while index < stop:
+        title = " ".join(
+            rng.choices(words, cum_weights=cum_weights, k=rng.randint(5, 12))
+        ).capitalize()
+        if title.lower() in seen:
+            continue
+        seen.add(title.lower())
+        abstract = None
+        if rng.random() < 0.7:
+            abstract = " ".join(
+                rng.choices(words, cum_weights=cum_weights, k=rng.randint(20, 40))
+            )
+        authors = [rng.randrange(index // 2 + 1) for _ in range(rng.randint(1, 6))]
+        record = {
+            "paperId": f"bench-{seed}-{index}",
+            "title": title,
+            "abstract": abstract,
+            "authors": [
+                {
+                    "name": f"{FIRST_NAMES[a % 7]} {LAST_NAMES[a // 7 % 7]} {a}",
+                }
+                for a in authors
+            ],
+            "url": f"https://www.semanticscholar.org/paper/bench-{seed}-{index}",
+            "venue": rng.choice(VENUES),
+            "year": rng.randint(1990, 2025),
+            "citationCount": int(rng.paretovariate(1.2)) - 1,
+            "referenceCount": rng.randint(0, 80),
+            "isOpenAccess": rng.random() < 0.4,
+        }
+        if index >= start:
+            yield record
+        index += 1
+
+
+def synthetic_titles(count: int, seed: int = 0) -> List[str]:
+    """Return the titles of the first ``count`` papers of the corpus."""
+    return [record["title"] for record in synthetic_records(0, count, seed)]
+
+
+def write_records(path: str, start: int, stop: int, seed: int = 0) -> None:
+    """Write papers ``start`` to ``stop`` of the corpus as JSON lines."""
+    with open(path, "w", encoding="utf-8") as f:
+        for record in synthetic_records(start, stop, seed):
+            f.write(json.dumps(record) + "\n")
+
+
+def write_csv(path: str, titles: List[str]) -> None:
+    """Write titles as an import CSV with a ``Title`` column."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Title", "Year"])
+        writer.writerows((title, 2020) for title in titles)
+
+
+def populate(db: Session, papers: int, seed: int = 0) -> int:
+    """
+    Grow the database to the first ``papers`` papers of the corpus.
+
+    The database must hold nothing but a prefix of the same corpus; papers it
+    already has are not loaded again.
+
+    Args:
+        db: Database session
+        papers: Corpus size
+        seed: Corpus seed
+
+    Returns:
+        int: Papers loaded
+    """
+    stored = db.scalar(select(func.count()).select_from(DBPaper))
+    if stored >= papers:
+        return 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "corpus.jsonl")
+        write_records(path, stored, papers, seed)
+        # Rebuilding the indexes only pays off for large loads
+        stats = load_dataset(db, [path], defer_indexes=papers - stored > 100_000)
+    return stats.papers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--papers", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="JSON lines file to write")
+    args = parser.parse_args()
+
+    write_records(args.output, 0, args.papers, args.seed)
+    print(f"Wrote {args.papers} papers to {args.output}")
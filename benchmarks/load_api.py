@@ -0,0 +1,81 @@
+"""
+Concurrent HTTP load generator for the papers API.
+
+Start the API (for example ``uvicorn main:app --workers 1``), optionally pointing
+it at SQLite with ``ASYNC_DATABASE_URL=sqlite+aiosqlite:///bench.db``, then run:
+
+    python -m benchmarks.load_api http://127.0.0.1:8000/papers/1 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Sequence, Union
+
+import httpx
+
+
+async def run_load(
+    url: Union[str, Sequence[str]], requests: int, concurrency: int
+) -> List[float]:
+    """
+    Issue ``requests`` GETs against ``url`` with ``concurrency`` in flight.
+
+    Args:
+        url: URL to request, or URLs to request in turn
+        requests: Total number of requests
+        concurrency: Number of concurrent clients
+
+    Returns:
+        List[float]: Latency of each successful request in seconds
+    """
+    urls = [url] if isinstance(url, str) else list(url)
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=concurrency), timeout=60
+    ) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            for i in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(urls[i % len(urls)])
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    if errors:
+        print(f"{errors} requests failed")
+    return latencies
+
+
+def summarize(latencies: List[float], elapsed: float) -> str:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return (
+        f"{len(latencies)} requests in {elapsed:.2f}s: "
+        f"{len(latencies) / elapsed:.0f} req/s, "
+        f"p50 {quantiles[49] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    latencies = asyncio.run(run_load(args.url, args.requests, args.concurrency))
+    print(summarize(latencies, time.perf_counter() - started))
@@ -1,6 +1,19 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
 from api.papers import router as papers_router
+from research_assistant.embedding_index import get_embedding_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open, or build, the embedding index before the first similar-papers request
+    await run_in_threadpool(get_embedding_index)
+    yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(papers_router)
@@ -6,9 +6,10 @@ using various academic APIs and data sources.
 """
 
 from research_assistant.models import Author, Paper
+from research_assistant.paper_batch import PaperBatch
 from research_assistant.paper_search import search_paper
 
 __version__ = "0.1.0"
 __author__ = "Research Assistant Team"
 
-__all__ = ["Author", "Paper", "search_paper"]
+__all__ = ["Author", "Paper", "PaperBatch", "search_paper"]
@@ -0,0 +1,418 @@
+"""
+Offline author disambiguation by co-author overlap.
+
+Authors are blocked on surname and first initial ("john smith", "j smith" and
+"j a smith" share the block "smith j"). Within a block, two authors with
+compatible given names ("j" is compatible with "john", "john" is not with
+"jane") are merged when their co-authors overlap enough and they never appear
+on the same paper.
+
+Co-authors are compared through their own blocks, so a co-author listed under
+different spellings still counts as shared. The overlaps are set intersections
+computed as sparse matrix products over groups of whole blocks: with ``C`` the
+binary author x co-author-block matrix, ``C[rows] @ C[rows].T`` counts the
+shared co-authors of every pair of authors in those rows at once.
+
+Merged authors hand their papers to the author with the most complete name
+and are deleted.
+"""
+
+import argparse
+import logging
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from research_assistant.db.config import get_db
+from research_assistant.db.models import DBAuthor, paper_authors
+from research_assistant.db.service import BULK_BATCH_SIZE, _chunks, _insert
+
+logger = logging.getLogger(__name__)
+
+# Jaccard similarity of co-author blocks needed to merge two authors
+MIN_OVERLAP = 0.3
+# Co-authors two authors must share, so single coincidences do not merge them
+MIN_SHARED_COAUTHORS = 2
+# Papers with more authors than this are ignored when collecting co-authors
+MAX_AUTHORS_PER_PAPER = 50
+# Authors whose blocks are intersected in one sparse product
+GROUP_SIZE = 4096
+
+
+def parse_name(normalized_name: str) -> Tuple[str, List[str]]:
+    """
+    Split a normalized author name into surname and given names.
+
+    Args:
+        normalized_name: Name normalized by ``normalize_author_name``
+
+    Returns:
+        Tuple[str, List[str]]: Surname and given-name tokens
+    """
+    tokens = normalized_name.split()
+    return (tokens[-1], tokens[:-1]) if tokens else ("", [])
+
+
+def block_key(normalized_name: str) -> Optional[str]:
+    """Surname and first initial of a name, None when it has no given name."""
+    surname, given = parse_name(normalized_name)
+    return f"{surname} {given[0][0]}" if given else None
+
+
+def names_compatible(a: str, b: str) -> bool:
+    """
+    Whether two normalized names could belong to the same person.
+
+    Given names are compared in order; each pair must be equal or an initial
+    of the other. Extra trailing given names are allowed.
+    """
+    surname_a, given_a = parse_name(a)
+    surname_b, given_b = parse_name(b)
+    if surname_a != surname_b:
+        return False
+    for x, y in zip(given_a, given_b):
+        if x != y and not (
+            (len(x) == 1 and y.startswith(x)) or (len(y) == 1 and x.startswith(y))
+        ):
+            return False
+    return True
+
+
+def _completeness(name: str) -> Tuple[int, int]:
+    _, given = parse_name(name)
+    return sum(len(token) > 1 for token in given), len(given)
+
+
+@dataclass
+class AuthorGraph:
+    """Authors with their papers and co-author blocks as sparse matrices."""
+
+    author_ids: np.ndarray
+    names: List[str]
+    blocks: np.ndarray
+    # Binary author x paper incidence
+    papers: sparse.csr_matrix
+    # Binary author x co-author-block incidence, without the author's own block
+    coauthors: sparse.csr_matrix
+
+
+def _coauthor_matrix(
+    papers: sparse.csr_matrix, blocks: np.ndarray, num_blocks: int
+) -> sparse.csr_matrix:
+    by_paper = papers.T.tocsr()
+    small = np.diff(by_paper.indptr) <= MAX_AUTHORS_PER_PAPER
+    by_paper = sparse.diags(small.astype(np.float32)) @ by_paper
+    has_block = blocks >= 0
+    membership = sparse.csr_matrix(
+        (
+            np.ones(int(has_block.sum()), dtype=np.float32),
+            (np.flatnonzero(has_block), blocks[has_block]),
+        ),
+        shape=(len(blocks), num_blocks),
+    )
+    coauthors = (papers @ (by_paper @ membership)).tocsr()
+    # An author is in their own block on every paper; that says nothing
+    rows = np.repeat(np.arange(coauthors.shape[0]), np.diff(coauthors.indptr))
+    coauthors.data = (coauthors.indices != blocks[rows]).astype(np.float32)
+    coauthors.eliminate_zeros()
+    return coauthors
+
+
+def load_author_graph(db: Session) -> AuthorGraph:
+    """
+    Load authors, their paper links and co-author blocks.
+
+    Args:
+        db: Database session
+
+    Returns:
+        AuthorGraph: Author matrices with rows in author id order
+    """
+    authors = db.execute(
+        select(DBAuthor.id, DBAuthor.normalized_name).order_by(DBAuthor.id)
+    ).all()
+    author_ids = np.array([author_id for author_id, _ in authors], dtype=np.int64)
+    names = [name or "" for _, name in authors]
+
+    block_index: Dict[str, int] = {}
+    blocks = np.array(
+        [
+            -1 if key is None else block_index.setdefault(key, len(block_index))
+            for key in map(block_key, names)
+        ],
+        dtype=np.int64,
+    )
+
+    rows = array("q")
+    paper_ids = array("q")
+    row_of = {int(author_id): row for row, author_id in enumerate(author_ids)}
+    for paper_id, author_id in db.execute(
+        select(paper_authors.c.paper_id, paper_authors.c.author_id).execution_options(
+            yield_per=BULK_BATCH_SIZE * 10
+        )
+    ):
+        rows.append(row_of[author_id])
+        paper_ids.append(paper_id)
+    _, paper_columns = np.unique(
+        np.frombuffer(paper_ids, dtype=np.int64), return_inverse=True
+    )
+    papers = sparse.csr_matrix(
+        (
+            np.ones(len(rows), dtype=np.float32),
+            (np.frombuffer(rows, dtype=np.int64), paper_columns),
+        ),
+        shape=(len(authors), int(paper_columns.max()) + 1 if len(rows) else 0),
+    )
+    papers.data[:] = 1
+    return AuthorGraph(
+        author_ids,
+        names,
+        blocks,
+        papers,
+        _coauthor_matrix(papers, blocks, len(block_index)),
+    )
+
+
+def candidate_pairs(
+    graph: AuthorGraph,
+    min_overlap: float = MIN_OVERLAP,
+    min_shared: int = MIN_SHARED_COAUTHORS,
+    group_size: int = GROUP_SIZE,
+) -> List[Tuple[float, int, int]]:
+    """
+    Find pairs of authors in the same block whose co-authors overlap enough.
+
+    Args:
+        graph: Author graph
+        min_overlap: Minimum Jaccard similarity of co-author blocks
+        min_shared: Minimum number of shared co-author blocks
+        group_size: Authors intersected in one sparse product; whole blocks
+            are always kept together
+
+    Returns:
+        List[Tuple[float, int, int]]: Similarity and rows of each pair with
+        compatible names and no paper in common
+    """
+    order = np.argsort(graph.blocks, kind="stable")
+    order = order[graph.blocks[order] >= 0]
+    sorted_blocks = graph.blocks[order]
+    # Blocks with more than one author, as [start, end) ranges of `order`
+    starts = np.flatnonzero(np.r_[True, sorted_blocks[1:] != sorted_blocks[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    multi = ends - starts > 1
+    starts, ends = starts[multi], ends[multi]
+
+    sizes = np.diff(graph.coauthors.indptr)
+    pairs: List[Tuple[float, int, int]] = []
+    group_start = 0
+    while group_start < len(starts):
+        group_end = group_start + 1
+        while (
+            group_end < len(starts)
+            and ends[group_end] - starts[group_start] <= group_size
+        ):
+            group_end += 1
+        rows = np.concatenate(
+            [
+                order[start:end]
+                for start, end in zip(
+                    starts[group_start:group_end], ends[group_start:group_end]
+                )
+            ]
+        )
+        group_start = group_end
+
+        block = graph.coauthors[rows]
+        shared = sparse.triu(block @ block.T, k=1).tocoo()
+        i, j = rows[shared.row], rows[shared.col]
+        same_block = graph.blocks[i] == graph.blocks[j]
+        counts = shared.data
+        jaccard = counts / (sizes[i] + sizes[j] - counts)
+        keep = same_block & (counts >= min_shared) & (jaccard >= min_overlap)
+        i, j, jaccard = i[keep], j[keep], jaccard[keep]
+        if not len(i):
+            continue
+        # Authors listed on the same paper are different people
+        together = np.asarray(
+            graph.papers[i].multiply(graph.papers[j]).sum(axis=1)
+        ).ravel()
+        for a, b, score, both in zip(i, j, jaccard, together):
+            if not both and names_compatible(graph.names[a], graph.names[b]):
+                pairs.append((float(score), int(a), int(b)))
+    return pairs
+
+
+def find_author_merges(
+    graph: AuthorGraph,
+    min_overlap: float = MIN_OVERLAP,
+    min_shared: int = MIN_SHARED_COAUTHORS,
+) -> Dict[int, int]:
+    """
+    Cluster name variants of the same author.
+
+    Pairs are merged most similar first, and two clusters are only joined when
+    every name in one is compatible with every name in the other and no paper
+    lists authors of both, so "j smith" cannot join "john smith" and
+    "jane smith" together. An author matching
+    several incompatible names, like that "j smith", is ambiguous and left alone.
+
+    Args:
+        graph: Author graph
+        min_overlap: Minimum Jaccard similarity of co-author blocks
+        min_shared: Minimum number of shared co-author blocks
+
+    Returns:
+        Dict[int, int]: Author id to merge away -> author id to keep
+    """
+    parent: Dict[int, int] = {}
+    members: Dict[int, List[int]] = {}
+
+    def find(row: int) -> int:
+        while parent.get(row, row) != row:
+            row = parent[row]
+        return row
+
+    pairs = candidate_pairs(graph, min_overlap, min_shared)
+    partners: Dict[int, List[int]] = {}
+    for _, a, b in pairs:
+        partners.setdefault(a, []).append(b)
+        partners.setdefault(b, []).append(a)
+    ambiguous = {
+        row
+        for row, others in partners.items()
+        if any(
+            not names_compatible(graph.names[x], graph.names[y])
+            for i, x in enumerate(others)
+            for y in others[i + 1 :]
+        )
+    }
+
+    for _, a, b in sorted(pairs, reverse=True):
+        if a in ambiguous or b in ambiguous:
+            continue
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        cluster_a = members.get(root_a, [root_a])
+        cluster_b = members.get(root_b, [root_b])
+        # Authors listed on the same paper must stay apart after merging too
+        shared_papers = set(graph.papers[cluster_a].indices) & set(
+            graph.papers[cluster_b].indices
+        )
+        if not shared_papers and all(
+            names_compatible(graph.names[x], graph.names[y])
+            for x in cluster_a
+            for y in cluster_b
+        ):
+            parent[root_b] = root_a
+            members[root_a] = cluster_a + cluster_b
+            members.pop(root_b, None)
+
+    paper_counts = np.diff(graph.papers.indptr)
+    merges: Dict[int, int] = {}
+    for cluster in members.values():
+        keep = max(
+            cluster,
+            key=lambda row: (
+                _completeness(graph.names[row]),
+                paper_counts[row],
+                -graph.author_ids[row],
+            ),
+        )
+        for row in cluster:
+            if row != keep:
+                merges[int(graph.author_ids[row])] = int(graph.author_ids[keep])
+    return merges
+
+
+def merge_authors(db: Session, merges: Dict[int, int]) -> int:
+    """
+    Move the papers of merged authors to the authors they merge into.
+
+    Args:
+        db: Database session
+        merges: Author id to merge away -> author id to keep
+
+    Returns:
+        int: Number of authors deleted
+    """
+    for chunk in _chunks(list(merges), BULK_BATCH_SIZE):
+        links = db.execute(
+            select(paper_authors.c.paper_id, paper_authors.c.author_id).where(
+                paper_authors.c.author_id.in_(chunk)
+            )
+        ).all()
+        if links:
+            db.execute(
+                _insert(db, paper_authors)
+                .values(
+                    [
+                        {"paper_id": paper_id, "author_id": merges[author_id]}
+                        for paper_id, author_id in links
+                    ]
+                )
+                .on_conflict_do_nothing()
+            )
+        db.execute(delete(paper_authors).where(paper_authors.c.author_id.in_(chunk)))
+        db.execute(delete(DBAuthor).where(DBAuthor.id.in_(chunk)))
+    db.commit()
+    return len(merges)
+
+
+def disambiguate_authors(
+    db: Session,
+    min_overlap: float = MIN_OVERLAP,
+    min_shared: int = MIN_SHARED_COAUTHORS,
+    dry_run: bool = False,
+) -> Dict[int, int]:
+    """
+    Merge author name variants with overlapping co-authors.
+
+    Args:
+        db: Database session
+        min_overlap: Minimum Jaccard similarity of co-author blocks
+        min_shared: Minimum number of shared co-author blocks
+        dry_run: Only find the merges
+
+    Returns:
+        Dict[int, int]: Author id merged away -> author id kept
+    """
+    graph = load_author_graph(db)
+    logger.info(
+        f"Loaded {len(graph.author_ids)} authors with {graph.papers.nnz} paper links"
+    )
+    merges = find_author_merges(graph, min_overlap, min_shared)
+    if not dry_run:
+        merge_authors(db, merges)
+    return merges
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge author name variants that share co-authors"
+    )
+    parser.add_argument("--min-overlap", type=float, default=MIN_OVERLAP)
+    parser.add_argument("--min-shared", type=int, default=MIN_SHARED_COAUTHORS)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the merges without applying them"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = next(get_db())
+    try:
+        merges = disambiguate_authors(
+            db, args.min_overlap, args.min_shared, dry_run=args.dry_run
+        )
+        if args.dry_run:
+            names = dict(db.execute(select(DBAuthor.id, DBAuthor.name)).all())
+            for merged, kept in merges.items():
+                print(f"{names[merged]} ({merged}) -> {names[kept]} ({kept})")
+        print(f"{'Would merge' if args.dry_run else 'Merged'} {len(merges)} authors")
+    finally:
+        db.close()
@@ -0,0 +1,391 @@
+"""
+Citation graph crawling and in-memory adjacency.
+
+The crawler fetches the references and citations of stored papers through the
+Semantic Scholar batch endpoint, up to 500 papers per request with a bounded
+number of requests in flight, and expands breadth-first up to a depth limit.
+Papers crawled by an earlier run are not fetched again; their stored edges are
+used to expand the next level instead.
+
+Graph queries run on :class:`CitationGraph`, which loads every edge once into
+compressed sparse row (CSR) arrays so following a hop is an array slice rather
+than a SQL query.
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+from array import array
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from research_assistant.db.citations import (
+    Edge,
+    crawled_paper_ids,
+    iter_citation_edges,
+    store_crawl_results,
+    stored_neighbor_ids,
+    stored_semantic_scholar_ids,
+)
+from research_assistant.db.config import get_db
+from research_assistant.db.service import _chunks
+from research_assistant.rate_limit import TokenBucket
+from research_assistant.semantic_scholar_client import (
+    BATCH_LIMIT,
+    AsyncSemanticScholarClient,
+)
+from research_assistant.title_reader import open_text
+
+logger = logging.getLogger(__name__)
+
+# Nested fields return the neighbours' ids only. The API truncates very long
+# citation lists in batch responses.
+CRAWL_FIELDS = ["paperId", "references.paperId", "citations.paperId"]
+
+
+@dataclass
+class CrawlStats:
+    """Counts of a citation crawl."""
+
+    fetched: int = 0
+    not_found: int = 0
+    # Already crawled by an earlier run and expanded from stored edges
+    skipped: int = 0
+    edges: int = 0
+    depth: int = 0
+
+
+def _record_edges(record: dict) -> List[Edge]:
+    paper_id = record["paperId"]
+    edges = [
+        (paper_id, reference["paperId"])
+        for reference in record.get("references") or []
+        if reference.get("paperId")
+    ]
+    edges.extend(
+        (citation["paperId"], paper_id)
+        for citation in record.get("citations") or []
+        if citation.get("paperId")
+    )
+    return edges
+
+
+async def _fetch_batches(
+    client: AsyncSemanticScholarClient,
+    paper_ids: Sequence[str],
+    batch_size: int,
+    max_concurrency: int,
+) -> AsyncIterator[Tuple[List[str], List[str], List[Edge]]]:
+    """
+    Fetch the edges of papers with at most ``max_concurrency`` batches in flight.
+
+    Yields:
+        Tuple: Ids found, ids not found and the edges of one batch, in
+        completion order
+    """
+
+    async def fetch(batch: Sequence[str]):
+        records = await client.get_papers(batch, fields=CRAWL_FIELDS)
+        found, not_found, edges = [], [], []
+        for paper_id, record in zip(batch, records):
+            if record is None:
+                not_found.append(paper_id)
+                continue
+            found.append(paper_id)
+            edges.extend(_record_edges(record))
+        return found, not_found, edges
+
+    batches = iter(_chunks(paper_ids, batch_size))
+    pending: Set[asyncio.Future] = set()
+
+    def submit() -> None:
+        for batch in batches:
+            pending.add(asyncio.ensure_future(fetch(batch)))
+            if len(pending) >= max_concurrency:
+                return
+
+    submit()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                yield task.result()
+            submit()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def crawl_citations(
+    db: Session,
+    seed_ids: Iterable[str],
+    client: Optional[AsyncSemanticScholarClient] = None,
+    max_depth: int = 1,
+    batch_size: int = BATCH_LIMIT,
+    max_concurrency: int = 4,
+) -> CrawlStats:
+    """
+    Fetch and store the citation edges around the seed papers.
+
+    Each batch's edges are committed as it arrives, so an interrupted crawl
+    resumes where it stopped when run again.
+
+    Args:
+        db: Database session
+        seed_ids: Semantic Scholar ids to start from
+        client: Client to use; if omitted, one limited to the configured API
+            quota is created and closed
+        max_depth: 1 fetches the seeds' edges, 2 also their neighbours', etc.
+        batch_size: Papers per batch request, at most ``BATCH_LIMIT``
+        max_concurrency: Batch requests in flight
+
+    Returns:
+        CrawlStats: Counts of the crawl
+    """
+    owns_client = client is None
+    if owns_client:
+        client = AsyncSemanticScholarClient(
+            max_concurrency=max_concurrency, limiter=TokenBucket.from_env()
+        )
+
+    stats = CrawlStats()
+    visited: Set[str] = set()
+    frontier = list(dict.fromkeys(seed_ids))
+    try:
+        for depth in range(max_depth):
+            if not frontier:
+                break
+            visited.update(frontier)
+            expand = depth + 1 < max_depth
+
+            crawled = crawled_paper_ids(db, frontier)
+            stats.skipped += len(crawled)
+            neighbors = stored_neighbor_ids(db, list(crawled)) if expand else set()
+
+            to_fetch = [paper_id for paper_id in frontier if paper_id not in crawled]
+            async for found, not_found, edges in _fetch_batches(
+                client, to_fetch, batch_size, max_concurrency
+            ):
+                store_crawl_results(db, edges, found, not_found)
+                stats.fetched += len(found)
+                stats.not_found += len(not_found)
+                stats.edges += len(edges)
+                if expand:
+                    neighbors.update(paper_id for edge in edges for paper_id in edge)
+
+            logger.info(
+                f"Depth {depth + 1}: fetched {len(to_fetch)} papers, "
+                f"skipped {len(crawled)} already crawled"
+            )
+            stats.depth = depth + 1
+            frontier = sorted(neighbors - visited)
+    finally:
+        if owns_client:
+            await client.aclose()
+    return stats
+
+
+def _csr(
+    sources: np.ndarray, targets: np.ndarray, num_nodes: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``(indptr, indices)`` arrays of the edges grouped by source."""
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+    indices = targets[np.argsort(sources, kind="stable")].astype(np.int32)
+    return indptr, indices
+
+
+@dataclass
+class CitationGraph:
+    """
+    Citation graph in compressed sparse row form.
+
+    Node ``i`` is the paper ``node_ids[i]``. Its references are
+    ``reference_indices[reference_indptr[i]:reference_indptr[i + 1]]``, and its
+    citations are laid out the same way in the ``citation_*`` arrays.
+    """
+
+    node_ids: List[str]
+    index: Dict[str, int]
+    reference_indptr: np.ndarray
+    reference_indices: np.ndarray
+    citation_indptr: np.ndarray
+    citation_indices: np.ndarray
+
+    @classmethod
+    def from_edges(
+        cls, node_ids: List[str], citing: np.ndarray, cited: np.ndarray
+    ) -> "CitationGraph":
+        """
+        Build the graph from edge arrays.
+
+        Args:
+            node_ids: Semantic Scholar id of each node
+            citing: Node index of the citing paper of each edge
+            cited: Node index of the cited paper of each edge
+        """
+        num_nodes = len(node_ids)
+        return cls(
+            node_ids,
+            {paper_id: i for i, paper_id in enumerate(node_ids)},
+            *_csr(citing, cited, num_nodes),
+            *_csr(cited, citing, num_nodes),
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.reference_indices)
+
+    def _slice(self, indptr: np.ndarray, indices: np.ndarray, node: int) -> np.ndarray:
+        return indices[indptr[node] : indptr[node + 1]]
+
+    def references(self, paper_id: str) -> List[str]:
+        """Return the ids of the papers ``paper_id`` cites."""
+        node = self.index.get(paper_id)
+        if node is None:
+            return []
+        nodes = self._slice(self.reference_indptr, self.reference_indices, node)
+        return [self.node_ids[i] for i in nodes]
+
+    def citations(self, paper_id: str) -> List[str]:
+        """Return the ids of the papers citing ``paper_id``."""
+        node = self.index.get(paper_id)
+        if node is None:
+            return []
+        nodes = self._slice(self.citation_indptr, self.citation_indices, node)
+        return [self.node_ids[i] for i in nodes]
+
+    def neighborhood(
+        self, paper_id: str, hops: int = 1, direction: str = "both"
+    ) -> Set[str]:
+        """
+        Return the papers within ``hops`` citation hops of a paper.
+
+        Args:
+            paper_id: Semantic Scholar id
+            hops: Maximum number of hops
+            direction: "references", "citations" or "both"
+
+        Returns:
+            Set[str]: Ids of the papers reached, excluding ``paper_id`` itself
+        """
+        start = self.index.get(paper_id)
+        if start is None:
+            return set()
+        adjacency = []
+        if direction in ("references", "both"):
+            adjacency.append((self.reference_indptr, self.reference_indices))
+        if direction in ("citations", "both"):
+            adjacency.append((self.citation_indptr, self.citation_indices))
+
+        seen = np.zeros(self.num_nodes, dtype=bool)
+        seen[start] = True
+        frontier = np.array([start])
+        for _ in range(hops):
+            parts = [
+                self._slice(indptr, indices, node)
+                for indptr, indices in adjacency
+                for node in frontier
+            ]
+            reached = np.unique(np.concatenate(parts)) if parts else frontier[:0]
+            frontier = reached[~seen[reached]]
+            if not frontier.size:
+                break
+            seen[frontier] = True
+        seen[start] = False
+        return {self.node_ids[i] for i in np.flatnonzero(seen)}
+
+
+def _graph_from_pairs(pairs: Iterable[Tuple[str, str]]) -> CitationGraph:
+    index: Dict[str, int] = {}
+    citing = array("i")
+    cited = array("i")
+    for citing_id, cited_id in pairs:
+        citing.append(index.setdefault(citing_id, len(index)))
+        cited.append(index.setdefault(cited_id, len(index)))
+    return CitationGraph.from_edges(
+        list(index),
+        np.frombuffer(citing, dtype=np.int32),
+        np.frombuffer(cited, dtype=np.int32),
+    )
+
+
+def load_citation_graph(db: Session) -> CitationGraph:
+    """
+    Load every stored citation edge into a :class:`CitationGraph`.
+
+    Args:
+        db: Database session
+
+    Returns:
+        CitationGraph: The stored graph
+    """
+    return _graph_from_pairs(iter_citation_edges(db))
+
+
+def load_edge_list(
+    path: str, citing_column: str = "citing_id", cited_column: str = "cited_id"
+) -> CitationGraph:
+    """
+    Load a citation graph from an edge-list file, e.g. a converted dataset dump.
+
+    Args:
+        path: CSV file (``.tsv`` for tab-separated), optionally .gz or .zst
+            compressed, or "-" for stdin
+        citing_column: Header of the citing paper id column
+        cited_column: Header of the cited paper id column
+
+    Returns:
+        CitationGraph: The graph of the file's edges
+    """
+    with open_text(path) as f:
+        reader = csv.reader(f, delimiter="\t" if ".tsv" in path else ",")
+        header = next(reader, [])
+        if citing_column not in header or cited_column not in header:
+            raise ValueError(
+                f"{path} needs {citing_column!r} and {cited_column!r} columns"
+            )
+        citing, cited = header.index(citing_column), header.index(cited_column)
+        return _graph_from_pairs(
+            (row[citing], row[cited]) for row in reader if row[citing] and row[cited]
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Crawl the citation graph around the stored papers"
+    )
+    parser.add_argument(
+        "--seed", action="append", help="Crawl from this paper id instead"
+    )
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = next(get_db())
+    try:
+        seeds = args.seed or stored_semantic_scholar_ids(db)
+        stats = asyncio.run(
+            crawl_citations(
+                db, seeds, max_depth=args.depth, max_concurrency=args.concurrency
+            )
+        )
+        print(
+            f"Fetched {stats.fetched} papers ({stats.not_found} not found, "
+            f"{stats.skipped} already crawled) and {stats.edges} edges "
+            f"over {stats.depth} levels"
+        )
+        graph = load_citation_graph(db)
+        print(f"Citation graph: {graph.num_nodes} papers, {graph.num_edges} edges")
+    finally:
+        db.close()
@@ -0,0 +1,614 @@
+"""
+Offline bulk loader for Semantic Scholar dataset dumps.
+
+Streams the JSONL files of the Semantic Scholar ``papers`` dataset (plain,
+``.gz`` or ``.zst``), keeps the records matching a venue, year or title filter
+and loads them without touching the API:
+
+- Lines are parsed and filtered in chunks, optionally in a process pool, into
+  columnar :class:`PaperBatch` chunks that are cheap to hand between processes.
+- On PostgreSQL each batch is copied into temporary staging tables with
+  ``COPY`` and merged into ``papers``, ``authors`` and ``paper_authors`` with a
+  few set-based ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` statements.
+  Secondary indexes and the ``paper_authors`` foreign keys are dropped for the
+  duration of the load and rebuilt once at the end; the unique indexes the
+  merge relies on are kept.
+- Other databases fall back to :func:`store_papers_bulk`.
+
+Dropping the indexes degrades every other query on the tables, so stop the API
+and importers during a deferred load, or pass ``--keep-indexes``. The
+statements that rebuild them are written to a restore file before anything is
+dropped; if a load dies before rebuilding them, run::
+
+    python -m research_assistant.dataset_loader --restore-indexes
+
+Papers are matched on their normalized title and authors on their normalized
+name, like every other write path. The Postgres path bypasses the
+papers-stored listeners, so rebuild the embedding and near-duplicate indexes
+after a load.
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from research_assistant.db.config import get_db
+from research_assistant.db.models import DBAuthor, DBPaper, paper_authors
+from research_assistant.db.service import AuthorKeyCache, store_papers_bulk
+from research_assistant.models import Author, Paper
+from research_assistant.normalization import normalize_author_name, normalize_title
+from research_assistant.paper_batch import PaperBatch
+from research_assistant.title_reader import bounded_map, iter_title_chunks, open_text
+
+logger = logging.getLogger(__name__)
+
+# Records parsed per chunk and papers written per staging batch
+DEFAULT_BATCH_SIZE = 50_000
+# Tables whose non-unique indexes are rebuilt after a load
+LOADED_TABLES = ("papers", "authors", "paper_authors")
+# Where the statements rebuilding deferred indexes are kept until they ran
+DEFERRED_INDEXES_PATH = "deferred_indexes.json"
+
+_PAPER_COLUMNS = (
+    "title",
+    "normalized_title",
+    "abstract",
+    "url",
+    "venue",
+    "year",
+    "citation_count",
+    "reference_count",
+    "is_open_access",
+    "semantic_scholar_id",
+)
+_LINK_COLUMNS = ("normalized_title", "name", "normalized_name")
+
+
+@dataclass(frozen=True)
+class DatasetFilter:
+    """Which dataset records to load; an empty filter keeps every paper."""
+
+    # Normalized venue names
+    venues: FrozenSet[str] = frozenset()
+    min_year: Optional[int] = None
+    max_year: Optional[int] = None
+    # Normalized titles
+    titles: FrozenSet[str] = frozenset()
+
+    def matches(self, paper: Paper) -> bool:
+        if self.venues and normalize_title(paper.venue or "") not in self.venues:
+            return False
+        if self.min_year is not None and (paper.year or 0) < self.min_year:
+            return False
+        if self.max_year is not None and (
+            paper.year is None or paper.year > self.max_year
+        ):
+            return False
+        return not self.titles or normalize_title(paper.title) in self.titles
+
+
+@dataclass
+class LoadStats:
+    """Counts of a dataset load."""
+
+    records: int = 0
+    matched: int = 0
+    papers: int = 0
+    authors: int = 0
+    links: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def report(self) -> str:
+        elapsed = time.monotonic() - self.started
+        return (
+            f"{self.records} records read, {self.matched} matched, "
+            f"{self.papers} papers, {self.authors} authors and {self.links} "
+            f"links stored in {elapsed:.0f}s "
+            f"({self.records / elapsed if elapsed else 0:.0f} records/s)"
+        )
+
+
+def record_to_paper(record: dict) -> Optional[Paper]:
+    """
+    Map a dataset or Graph API paper record to a Paper.
+
+    Dataset records use lowercase keys and have no ``paperId``; they are
+    given ``CorpusId:<id>``, which the Graph API accepts as a paper id.
+
+    Args:
+        record: Decoded JSON record
+
+    Returns:
+        Optional[Paper]: The paper, or None for records without a title
+    """
+    title = (record.get("title") or "").strip()
+    if not title:
+        return None
+
+    def value(*keys):
+        return next((record[k] for k in keys if record.get(k) is not None), None)
+
+    corpus_id = value("corpusid", "corpusId")
+    semantic_scholar_id = value("paperId") or (
+        f"CorpusId:{corpus_id}" if corpus_id is not None else None
+    )
+    return Paper(
+        title=title,
+        authors=[
+            Author(name=author["name"])
+            for author in record.get("authors") or []
+            if (author.get("name") or "").strip()
+        ],
+        abstract=value("abstract"),
+        url=value("url"),
+        venue=value("venue"),
+        year=value("year"),
+        citation_count=value("citationcount", "citationCount"),
+        reference_count=value("referencecount", "referenceCount"),
+        is_open_access=value("isopenaccess", "isOpenAccess"),
+        semantic_scholar_id=semantic_scholar_id,
+    )
+
+
+def parse_records(lines: List[str], dataset_filter: DatasetFilter) -> PaperBatch:
+    """Decode JSONL lines and return the papers matching the filter."""
+    papers = []
+    for line in lines:
+        if line.strip():
+            paper = record_to_paper(json.loads(line))
+            if paper is not None and dataset_filter.matches(paper):
+                papers.append(paper)
+    return PaperBatch.from_papers(papers)
+
+
+# Filter of a pool worker, sent once by the initializer rather than per chunk
+_worker_filter = DatasetFilter()
+
+
+def _set_worker_filter(dataset_filter: DatasetFilter) -> None:
+    global _worker_filter
+    _worker_filter = dataset_filter
+
+
+def _parse_in_worker(lines: List[str]) -> Tuple[int, PaperBatch]:
+    return len(lines), parse_records(lines, _worker_filter)
+
+
+def iter_line_chunks(paths: Sequence[str], size: int) -> Iterator[List[str]]:
+    """Read the lines of several files in chunks of ``size``."""
+    for path in paths:
+        with open_text(path) as f:
+            chunk: List[str] = []
+            for line in f:
+                chunk.append(line)
+                if len(chunk) >= size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+
+def read_dataset(
+    paths: Sequence[str],
+    dataset_filter: DatasetFilter = DatasetFilter(),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 0,
+) -> Iterator[Tuple[int, PaperBatch]]:
+    """
+    Stream the matching papers of dataset files.
+
+    Args:
+        paths: JSONL files, optionally .gz or .zst compressed
+        dataset_filter: Records to keep
+        batch_size: Lines parsed per chunk
+        workers: Parse chunks in this many processes; 0 or 1 parses in the
+            calling process
+
+    Yields:
+        Tuple[int, PaperBatch]: Lines read and matching papers of each chunk
+    """
+    chunks = iter_line_chunks(paths, batch_size)
+    if workers > 1:
+        with ProcessPoolExecutor(
+            workers, initializer=_set_worker_filter, initargs=(dataset_filter,)
+        ) as pool:
+            yield from bounded_map(pool, _parse_in_worker, chunks, workers * 2)
+    else:
+        for lines in chunks:
+            yield len(lines), parse_records(lines, dataset_filter)
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable) -> None:
+    """COPY rows into a table in PostgreSQL's text format."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(map(_copy_value, row)))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def _create_staging_tables(db: Session) -> None:
+    db.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS staging_papers ("
+            "title varchar(512), normalized_title varchar(512), abstract text, "
+            "url varchar(512), venue varchar(255), year integer, "
+            "citation_count integer, reference_count integer, "
+            "is_open_access boolean, semantic_scholar_id varchar(100)) "
+            "ON COMMIT DELETE ROWS"
+        )
+    )
+    db.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS staging_paper_authors ("
+            "normalized_title varchar(512), name varchar(255), "
+            "normalized_name varchar(255)) ON COMMIT DELETE ROWS"
+        )
+    )
+    db.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS staging_new_papers ("
+            "id integer, normalized_title varchar(512)) ON COMMIT DELETE ROWS"
+        )
+    )
+
+
+def _copy_batch(db: Session, papers: PaperBatch) -> Tuple[int, int, int]:
+    """
+    Load a batch of papers through the staging tables in one transaction.
+
+    The staging tables are created in the same transaction: the session may
+    be handed a new connection after every commit, e.g. once the pool
+    recycles the previous one, and temporary tables die with their connection.
+
+    Returns:
+        Tuple[int, int, int]: New papers, authors and paper-author links
+    """
+    papers_by_title = {}
+    for paper in papers.to_papers():
+        papers_by_title.setdefault(normalize_title(paper.title), paper)
+
+    _create_staging_tables(db)
+    cursor = db.connection().connection.cursor()
+    _copy_rows(
+        cursor,
+        "staging_papers",
+        _PAPER_COLUMNS,
+        (
+            (
+                paper.title[:512],
+                key,
+                (paper.abstract or None) and paper.abstract[:5000],
+                (paper.url or None) and paper.url[:512],
+                (paper.venue or None) and paper.venue[:255],
+                paper.year,
+                paper.citation_count,
+                paper.reference_count,
+                paper.is_open_access,
+                paper.semantic_scholar_id,
+            )
+            for key, paper in papers_by_title.items()
+            if len(key) <= 512
+        ),
+    )
+    _copy_rows(
+        cursor,
+        "staging_paper_authors",
+        _LINK_COLUMNS,
+        (
+            (key, author.name[:255], normalize_author_name(author.name)[:255])
+            for key, paper in papers_by_title.items()
+            if len(key) <= 512
+            for author in paper.authors
+        ),
+    )
+
+    new_papers = db.execute(
+        text(
+            f"""
+            WITH inserted AS (
+                INSERT INTO papers ({', '.join(_PAPER_COLUMNS)}, created_at, updated_at)
+                SELECT {', '.join(_PAPER_COLUMNS)},
+                    timezone('utc', now()), timezone('utc', now())
+                FROM staging_papers
+                ON CONFLICT DO NOTHING
+                RETURNING id, normalized_title
+            )
+            INSERT INTO staging_new_papers SELECT id, normalized_title FROM inserted
+            """
+        )
+    ).rowcount
+    # Temporary tables have no statistics until analyzed, which leads the
+    # planner into nested loops over the staged links
+    db.execute(text("ANALYZE staging_paper_authors, staging_new_papers"))
+    new_authors = db.execute(
+        text(
+            """
+            INSERT INTO authors (name, normalized_name, created_at, updated_at)
+            SELECT DISTINCT ON (l.normalized_name) l.name, l.normalized_name,
+                timezone('utc', now()), timezone('utc', now())
+            FROM staging_paper_authors l
+            JOIN staging_new_papers p ON p.normalized_title = l.normalized_title
+            ORDER BY l.normalized_name
+            ON CONFLICT DO NOTHING
+            """
+        )
+    ).rowcount
+    new_links = db.execute(
+        text(
+            """
+            INSERT INTO paper_authors (paper_id, author_id)
+            SELECT DISTINCT p.id, a.id
+            FROM staging_paper_authors l
+            JOIN staging_new_papers p ON p.normalized_title = l.normalized_title
+            JOIN authors a ON a.normalized_name = l.normalized_name
+            ON CONFLICT DO NOTHING
+            """
+        )
+    ).rowcount
+    db.commit()
+    return new_papers, new_authors, new_links
+
+
+def _row_counts(db: Session) -> Tuple[int, int, int]:
+    return tuple(
+        db.scalar(select(func.count()).select_from(table))
+        for table in (DBPaper.__table__, DBAuthor.__table__, paper_authors)
+    )
+
+
+def drop_deferred_indexes(db: Session, path: str = DEFERRED_INDEXES_PATH) -> None:
+    """
+    Drop the non-unique indexes and foreign keys of the loaded tables.
+
+    Links are only ever inserted from joins against ``papers`` and ``authors``,
+    so checking their foreign keys row by row is wasted work; re-adding the
+    constraints validates them with a single join instead.
+
+    The definitions are written to ``path`` before anything is dropped, so
+    :func:`restore_deferred_indexes` can rebuild them even if the load dies.
+
+    Args:
+        db: Database session
+        path: Restore file
+
+    Raises:
+        RuntimeError: If ``path`` exists, i.e. a previous load was not restored
+    """
+    if os.path.exists(path):
+        raise RuntimeError(
+            f"{path} lists indexes of an unfinished load; "
+            "run with --restore-indexes first"
+        )
+    indexes = db.execute(
+        text(
+            """
+            SELECT i.indexname, i.indexdef FROM pg_indexes i
+            WHERE i.schemaname = current_schema()
+            AND i.tablename = ANY(:tables)
+            AND i.indexdef NOT LIKE 'CREATE UNIQUE INDEX%'
+            AND i.indexname NOT IN (SELECT conname FROM pg_constraint)
+            """
+        ),
+        {"tables": list(LOADED_TABLES)},
+    ).all()
+    foreign_keys = db.execute(
+        text(
+            """
+            SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid)
+            FROM pg_constraint c
+            WHERE c.contype = 'f'
+            AND c.conrelid::regclass::text = ANY(:tables)
+            """
+        ),
+        {"tables": list(LOADED_TABLES)},
+    ).all()
+    deferred = {
+        "indexes": [definition for _, definition in indexes],
+        "foreign_keys": [list(foreign_key) for foreign_key in foreign_keys],
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(deferred, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    for table, name, _ in foreign_keys:
+        db.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    for name, _ in indexes:
+        db.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+    db.commit()
+    logger.info(f"Deferred until the load finishes: {deferred}")
+
+
+def restore_deferred_indexes(db: Session, path: str = DEFERRED_INDEXES_PATH) -> int:
+    """
+    Rebuild the indexes and foreign keys listed by :func:`drop_deferred_indexes`.
+
+    Indexes and constraints that already exist are left alone, so this can be
+    rerun after a failed restore. The file is removed once everything is back.
+
+    Args:
+        db: Database session
+        path: Restore file
+
+    Returns:
+        int: Indexes and constraints rebuilt, 0 if there is no restore file
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        deferred = json.load(f)
+    statements = [
+        definition.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1)
+        for definition in deferred["indexes"]
+    ]
+    existing = set(db.scalars(text("SELECT conname FROM pg_constraint")))
+    statements += [
+        f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'
+        for table, name, definition in deferred["foreign_keys"]
+        if name not in existing
+    ]
+    for statement in statements:
+        logger.info(f"Rebuilding: {statement}")
+        db.execute(text(statement))
+    db.execute(text(f"ANALYZE {', '.join(LOADED_TABLES)}"))
+    db.commit()
+    os.remove(path)
+    return len(statements)
+
+
+def load_dataset(
+    db: Session,
+    paths: Sequence[str],
+    dataset_filter: DatasetFilter = DatasetFilter(),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 0,
+    defer_indexes: bool = True,
+    restore_path: str = DEFERRED_INDEXES_PATH,
+) -> LoadStats:
+    """
+    Load the matching papers of dataset files into the database.
+
+    Args:
+        db: Database session
+        paths: JSONL files, optionally .gz or .zst compressed
+        dataset_filter: Records to keep
+        batch_size: Lines parsed per chunk, and papers per staging batch
+        workers: Processes parsing records
+        defer_indexes: On PostgreSQL, drop secondary indexes and foreign keys
+            during the load and rebuild them at the end; nothing else should
+            use the database meanwhile
+        restore_path: File listing the deferred indexes until they are rebuilt
+
+    Returns:
+        LoadStats: Counts of the load
+    """
+    stats = LoadStats()
+    postgres = db.get_bind().dialect.name == "postgresql"
+    deferred = postgres and defer_indexes
+    if deferred:
+        drop_deferred_indexes(db, restore_path)
+    author_cache = AuthorKeyCache()
+
+    def flush(batch: PaperBatch) -> None:
+        if postgres:
+            papers, authors, links = _copy_batch(db, batch)
+        else:
+            before = _row_counts(db)
+            store_papers_bulk(db, batch, author_cache)
+            papers, authors, links = (
+                after - earlier for after, earlier in zip(_row_counts(db), before)
+            )
+        stats.papers += papers
+        stats.authors += authors
+        stats.links += links
+
+    try:
+        pending: List[PaperBatch] = []
+        pending_papers = 0
+        for lines, papers in read_dataset(paths, dataset_filter, batch_size, workers):
+            stats.records += lines
+            stats.matched += len(papers)
+            pending.append(papers)
+            pending_papers += len(papers)
+            if pending_papers >= batch_size:
+                flush(PaperBatch.concat(pending))
+                pending, pending_papers = [], 0
+                logger.info(stats.report())
+        if pending_papers:
+            flush(PaperBatch.concat(pending))
+    finally:
+        if deferred:
+            db.rollback()
+            restore_deferred_indexes(db, restore_path)
+    return stats
+
+
+def load_title_filter(path: str) -> FrozenSet[str]:
+    """Normalized titles of a CSV file's Title column."""
+    return frozenset(
+        normalize_title(title) for chunk in iter_title_chunks(path) for title in chunk
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load Semantic Scholar dataset files into the database"
+    )
+    parser.add_argument("paths", nargs="*", help="papers dataset JSONL files")
+    parser.add_argument("--venue", action="append", default=[], help="Venue to keep")
+    parser.add_argument("--min-year", type=int)
+    parser.add_argument("--max-year", type=int)
+    parser.add_argument("--titles", help="CSV file whose Title column lists papers")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument(
+        "--keep-indexes",
+        action="store_true",
+        help="Maintain indexes and foreign keys during the load instead of rebuilding",
+    )
+    parser.add_argument(
+        "--restore-indexes",
+        action="store_true",
+        help="Rebuild the indexes and foreign keys a failed load left dropped",
+    )
+    parser.add_argument(
+        "--restore-file",
+        default=DEFERRED_INDEXES_PATH,
+        help="Where the definitions of dropped indexes are kept during a load",
+    )
+    args = parser.parse_args()
+    if not args.paths and not args.restore_indexes:
+        parser.error("the following arguments are required: paths")
+
+    logging.basicConfig(level=logging.INFO)
+    dataset_filter = DatasetFilter(
+        venues=frozenset(normalize_title(venue) for venue in args.venue),
+        min_year=args.min_year,
+        max_year=args.max_year,
+        titles=load_title_filter(args.titles) if args.titles else frozenset(),
+    )
+    db = next(get_db())
+    try:
+        if args.restore_indexes:
+            rebuilt = restore_deferred_indexes(db, args.restore_file)
+            print(f"Rebuilt {rebuilt} indexes and constraints")
+        else:
+            stats = load_dataset(
+                db,
+                args.paths,
+                dataset_filter,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                defer_indexes=not args.keep_indexes,
+                restore_path=args.restore_file,
+            )
+            print(stats.report())
+    finally:
+        db.close()
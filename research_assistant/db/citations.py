@@ -0,0 +1,126 @@
+"""
+Storage of the citation graph.
+
+Edges are kept in ``paper_citations`` keyed on Semantic Scholar paper ids, and
+every paper whose references and citations were fetched is recorded in
+``citation_crawls`` so later crawls don't fetch it again.
+"""
+
+from typing import Iterable, Iterator, List, Sequence, Set, Tuple
+
+from sqlalchemy import Row, select, union
+from sqlalchemy.orm import Session
+
+from research_assistant.db.models import DBCitationCrawl, DBPaper, DBPaperCitation
+from research_assistant.db.service import BULK_BATCH_SIZE, _chunks, _insert
+
+# (citing paper id, cited paper id)
+Edge = Tuple[str, str]
+
+
+def store_crawl_results(
+    db: Session,
+    edges: Iterable[Edge],
+    found: Sequence[str],
+    not_found: Sequence[str] = (),
+) -> None:
+    """
+    Store fetched edges and mark their papers as crawled, in one transaction.
+
+    Args:
+        db: Database session
+        edges: Citation edges; edges already stored are ignored
+        found: Ids of the papers whose edges were fetched
+        not_found: Ids the API did not know, recorded so they are not retried
+    """
+    edges = list(dict.fromkeys(edges))
+    for chunk in _chunks(edges, BULK_BATCH_SIZE):
+        db.execute(
+            _insert(db, DBPaperCitation.__table__)
+            .values([{"citing_id": c, "cited_id": d} for c, d in chunk])
+            .on_conflict_do_nothing()
+        )
+
+    crawls = [{"semantic_scholar_id": i, "found": True} for i in found] + [
+        {"semantic_scholar_id": i, "found": False} for i in not_found
+    ]
+    for chunk in _chunks(crawls, BULK_BATCH_SIZE):
+        db.execute(
+            _insert(db, DBCitationCrawl.__table__)
+            .values(list(chunk))
+            .on_conflict_do_nothing()
+        )
+    db.commit()
+
+
+def crawled_paper_ids(db: Session, paper_ids: Sequence[str]) -> Set[str]:
+    """Return which of the given Semantic Scholar ids were already crawled."""
+    crawled: Set[str] = set()
+    for chunk in _chunks(paper_ids, BULK_BATCH_SIZE):
+        crawled.update(
+            db.scalars(
+                select(DBCitationCrawl.semantic_scholar_id).where(
+                    DBCitationCrawl.semantic_scholar_id.in_(chunk)
+                )
+            )
+        )
+    return crawled
+
+
+def stored_neighbor_ids(db: Session, paper_ids: Sequence[str]) -> Set[str]:
+    """
+    Return the ids cited by or citing the given papers, from stored edges.
+
+    Args:
+        db: Database session
+        paper_ids: Semantic Scholar paper ids
+
+    Returns:
+        Set[str]: Ids of their references and citations
+    """
+    neighbors: Set[str] = set()
+    for chunk in _chunks(paper_ids, BULK_BATCH_SIZE):
+        neighbors.update(
+            db.scalars(
+                union(
+                    select(DBPaperCitation.cited_id).where(
+                        DBPaperCitation.citing_id.in_(chunk)
+                    ),
+                    select(DBPaperCitation.citing_id).where(
+                        DBPaperCitation.cited_id.in_(chunk)
+                    ),
+                )
+            )
+        )
+    return neighbors
+
+
+def stored_semantic_scholar_ids(db: Session) -> List[str]:
+    """Return the Semantic Scholar ids of the stored papers."""
+    return list(
+        db.scalars(
+            select(DBPaper.semantic_scholar_id)
+            .where(DBPaper.semantic_scholar_id.is_not(None))
+            .order_by(DBPaper.id)
+        )
+    )
+
+
+def iter_citation_edges(
+    db: Session, chunk_size: int = BULK_BATCH_SIZE * 10
+) -> Iterator[Row]:
+    """
+    Stream every stored edge with a server-side cursor.
+
+    Args:
+        db: Database session
+        chunk_size: Rows fetched per round trip
+
+    Yields:
+        Row: ``(citing_id, cited_id)`` rows
+    """
+    yield from db.execute(
+        select(DBPaperCitation.citing_id, DBPaperCitation.cited_id).execution_options(
+            yield_per=chunk_size
+        )
+    )
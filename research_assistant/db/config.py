@@ -3,10 +3,17 @@ Database configuration and connection management.
 """
 
 import os
-from typing import Generator
+from functools import lru_cache
+from typing import AsyncGenerator, Generator
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 # Load environment variables
@@ -19,11 +26,37 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "research_assistant")
 
-# Create database URL
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+# Create database URLs, either of which can be overridden wholesale
+DATABASE_URL = (
+    os.getenv("DATABASE_URL")
+    or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+ASYNC_DATABASE_URL = (
+    os.getenv("ASYNC_DATABASE_URL")
+    or f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+
+def _engine_options(url: str) -> dict:
+    """Pool options for an engine URL; SQLite manages its own pooling."""
+    if url.startswith("sqlite"):
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
 
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -41,3 +74,40 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """
+    Get the shared async engine, created on first use.
+
+    Returns:
+        AsyncEngine: Engine for ASYNC_DATABASE_URL
+    """
+    return create_async_engine(
+        ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL)
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """
+    Get the sessionmaker bound to the shared async engine.
+
+    Returns:
+        async_sessionmaker[AsyncSession]: Async session factory
+    """
+    return async_sessionmaker(
+        get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get an async database session.
+
+    Yields:
+        AsyncSession: Async database session
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,247 @@
+"""
+Durable journal of import jobs.
+
+Every title of an import is recorded in ``import_job_items`` with its state and
+number of search attempts, and state changes are committed as the import goes.
+A crashed or interrupted import resumes by picking up the items that are not
+finished yet instead of re-reading its CSV and re-checking every title.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.orm import Session
+
+from research_assistant.db.models import DBImportItem, DBImportJob
+from research_assistant.db.service import (
+    BULK_BATCH_SIZE,
+    _chunks,
+    _insert,
+    find_paper_ids,
+)
+
+# Item states
+PENDING = "pending"
+SEARCHED = "searched"
+STORED = "stored"
+SKIPPED = "skipped"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+# Items in these states still need work
+UNFINISHED_STATES = (PENDING, SEARCHED, ERROR)
+FAILED_STATES = (NOT_FOUND, ERROR)
+
+# Search attempts before an errored title is given up on
+MAX_ATTEMPTS = 3
+
+# Error messages are truncated to the journal column's length
+ERROR_LENGTH = 1000
+
+
+def start_import_job(
+    db: Session, source: str, batches: Iterable[Sequence[Tuple[str, str]]]
+) -> DBImportJob:
+    """
+    Resume the unfinished import job for ``source`` or start a new one.
+
+    A new job journals every distinct title: titles already in the database
+    are recorded as skipped, using one lookup per chunk, and the rest as
+    pending. When resuming a job whose titles were all journaled, ``batches``
+    is not consumed at all.
+
+    Args:
+        db: Database session
+        source: Identifies the input, e.g. the CSV path
+        batches: Batches of (title, normalized title) pairs to import
+
+    Returns:
+        DBImportJob: The resumed or new job
+    """
+    job = db.scalars(
+        select(DBImportJob)
+        .where(DBImportJob.source == source, DBImportJob.status != "completed")
+        .order_by(DBImportJob.id.desc())
+        .limit(1)
+    ).first()
+    if job is None:
+        job = DBImportJob(source=source, status="enqueuing")
+        db.add(job)
+        db.commit()
+
+    if job.status == "enqueuing":
+        # Re-enqueueing after a crash is safe: (job_id, normalized_title) is unique
+        for batch in batches:
+            for chunk in _chunks(batch, BULK_BATCH_SIZE):
+                _enqueue(db, job, chunk)
+        job.status = "running"
+        db.commit()
+
+    return job
+
+
+def _enqueue(db: Session, job: DBImportJob, pairs: Sequence[Tuple[str, str]]) -> None:
+    titles: Dict[str, str] = {}
+    for title, normalized in pairs:
+        titles.setdefault(normalized, title)
+    paper_ids = find_paper_ids(db, list(titles))
+    db.execute(
+        _insert(db, DBImportItem.__table__)
+        .values(
+            [
+                {
+                    "job_id": job.id,
+                    "title": title,
+                    "normalized_title": normalized,
+                    "state": SKIPPED if normalized in paper_ids else PENDING,
+                    "attempts": 0,
+                    "paper_id": paper_ids.get(normalized),
+                }
+                for normalized, title in titles.items()
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+    db.commit()
+
+
+def unfinished_items(
+    db: Session,
+    job: DBImportJob,
+    max_attempts: int = MAX_ATTEMPTS,
+    chunk_size: int = BULK_BATCH_SIZE,
+) -> Iterator[List[Row]]:
+    """
+    Iterate over the job's items that still need work, in chunks.
+
+    Uses keyset pagination on the item id, so items updated while iterating are
+    not returned twice.
+
+    Args:
+        db: Database session
+        job: Import job
+        max_attempts: Errored items with this many attempts are skipped
+        chunk_size: Items per chunk
+
+    Yields:
+        List[Row]: ``(id, title, normalized_title, attempts)`` rows
+    """
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(
+                DBImportItem.id,
+                DBImportItem.title,
+                DBImportItem.normalized_title,
+                DBImportItem.attempts,
+            )
+            .where(
+                DBImportItem.job_id == job.id,
+                DBImportItem.id > last_id,
+                DBImportItem.state.in_(UNFINISHED_STATES),
+                DBImportItem.attempts < max_attempts,
+            )
+            .order_by(DBImportItem.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def record_states(db: Session, updates: Sequence[dict]) -> None:
+    """
+    Record item state changes and commit them as a checkpoint.
+
+    Args:
+        db: Database session
+        updates: Dicts with the item ``id`` and the columns to set, e.g.
+            ``state``, ``attempts``, ``error`` and ``paper_id``
+    """
+    updates = [
+        {**values, "error": values["error"][:ERROR_LENGTH]}
+        if values.get("error")
+        else values
+        for values in updates
+    ]
+    for chunk in _chunks(updates, BULK_BATCH_SIZE):
+        db.execute(update(DBImportItem), chunk)
+    db.commit()
+
+
+def finish_import_job(
+    db: Session, job: DBImportJob, max_attempts: int = MAX_ATTEMPTS
+) -> Dict[str, int]:
+    """
+    Mark the job completed if no item needs more work.
+
+    Args:
+        db: Database session
+        job: Import job
+        max_attempts: Attempts after which errored items count as finished
+
+    Returns:
+        Dict[str, int]: Number of items in each state
+    """
+    if next(unfinished_items(db, job, max_attempts, chunk_size=1), None) is None:
+        job.status = "completed"
+        db.commit()
+    return job_counts(db, job)
+
+
+def job_counts(db: Session, job: DBImportJob) -> Dict[str, int]:
+    """Return the number of the job's items in each state."""
+    return dict(
+        db.execute(
+            select(DBImportItem.state, func.count())
+            .where(DBImportItem.job_id == job.id)
+            .group_by(DBImportItem.state)
+        ).all()
+    )
+
+
+def latest_import_job(db: Session) -> Optional[DBImportJob]:
+    """Return the most recently started import job, if any."""
+    return db.scalars(
+        select(DBImportJob).order_by(DBImportJob.id.desc()).limit(1)
+    ).first()
+
+
+def failed_titles(db: Session, job: DBImportJob) -> List[str]:
+    """Return the titles of the job that were not found or failed."""
+    return list(
+        db.scalars(
+            select(DBImportItem.title)
+            .where(
+                DBImportItem.job_id == job.id,
+                DBImportItem.state.in_(FAILED_STATES),
+            )
+            .order_by(DBImportItem.id)
+        )
+    )
+
+
+def reset_failed_items(db: Session, job: DBImportJob) -> int:
+    """
+    Queue the job's not-found and failed titles to be searched again.
+
+    Args:
+        db: Database session
+        job: Import job
+
+    Returns:
+        int: Number of items reset
+    """
+    result = db.execute(
+        update(DBImportItem)
+        .where(
+            DBImportItem.job_id == job.id,
+            DBImportItem.state.in_(FAILED_STATES),
+        )
+        .values(state=PENDING, attempts=0, error=None)
+    )
+    if result.rowcount:
+        job.status = "running"
+    db.commit()
+    return result.rowcount
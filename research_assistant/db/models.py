@@ -8,14 +8,26 @@ from typing import List
 from sqlalchemy import (
     Boolean,
     Column,
+    DDL,
     DateTime,
     ForeignKey,
     Integer,
     String,
     Table,
     Float,
+    Index,
+    UniqueConstraint,
+    event,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    mapped_column,
+    relationship,
+    validates,
+)
+
+from research_assistant.normalization import normalize_author_name, normalize_title
 
 
 class Base(DeclarativeBase):
@@ -30,6 +42,8 @@ paper_authors = Table(
     Base.metadata,
     Column("paper_id", Integer, ForeignKey("papers.id"), primary_key=True),
     Column("author_id", Integer, ForeignKey("authors.id"), primary_key=True),
+    # The primary key only serves lookups by paper
+    Index("ix_paper_authors_author_id", "author_id"),
 )
 
 
@@ -39,7 +53,11 @@ class DBAuthor(Base):
     __tablename__ = "authors"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(255))
+    name: Mapped[str] = mapped_column(String(255), index=True)
+    # Diacritic, case and initial-spacing folded name that authors are matched on
+    normalized_name: Mapped[str | None] = mapped_column(
+        String(255), nullable=True, unique=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -50,6 +68,11 @@ class DBAuthor(Base):
         secondary=paper_authors, back_populates="authors"
     )
 
+    @validates("name")
+    def _set_normalized_name(self, key: str, name: str) -> str:
+        self.normalized_name = normalize_author_name(name)
+        return name
+
     def __repr__(self) -> str:
         return f"<Author {self.name}>"
 
@@ -61,6 +84,10 @@ class DBPaper(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(512))
+    # Case, punctuation and whitespace folded title used for existence checks
+    normalized_title: Mapped[str | None] = mapped_column(
+        String(512), nullable=True, unique=True, index=True
+    )
     abstract: Mapped[str | None] = mapped_column(String(5000), nullable=True)
     url: Mapped[str | None] = mapped_column(String(512), nullable=True)
     venue: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -71,6 +98,10 @@ class DBPaper(Base):
     semantic_scholar_id: Mapped[str | None] = mapped_column(
         String(100), nullable=True, unique=True
     )
+    # When citation counts and open access status were last fetched again
+    metadata_refreshed_at: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -81,5 +112,144 @@ class DBPaper(Base):
         secondary=paper_authors, back_populates="papers"
     )
 
+    @validates("title")
+    def _set_normalized_title(self, key: str, title: str) -> str:
+        self.normalized_title = normalize_title(title)
+        return title
+
     def __repr__(self) -> str:
         return f"<Paper {self.title}>"
+
+
+# Postgres-only full-text search schema of the papers table, added by migration
+# 8b2e4d1a9c57 and queried through research_assistant.search. It is not mapped
+# on DBPaper: SQLite cannot create it and loading papers never needs the
+# tsvector. create_all() runs the same DDL on Postgres, and alembic/env.py keeps
+# autogenerate from proposing to drop it.
+POSTGRES_ONLY_SCHEMA = frozenset(
+    {"search_vector", "ix_papers_search_vector", "ix_papers_title_trgm"}
+)
+
+for _statement in (
+    # Weighted document: title matches (A) rank above abstract matches (B)
+    "ALTER TABLE papers ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(abstract, '')), 'B')) STORED",
+    "CREATE INDEX ix_papers_search_vector ON papers USING gin (search_vector)",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX ix_papers_title_trgm ON papers USING gin (title gin_trgm_ops)",
+):
+    event.listen(
+        DBPaper.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+
+
+class DBImportJob(Base):
+    """Database model for an import run over one CSV file."""
+
+    __tablename__ = "import_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    source: Mapped[str] = mapped_column(String(1024), index=True)
+    # "enqueuing" until every title is journaled, then "running", then "completed"
+    status: Mapped[str] = mapped_column(String(20), default="enqueuing")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<ImportJob {self.id} {self.source} {self.status}>"
+
+
+class DBImportItem(Base):
+    """Database model for the journaled state of one title in an import job."""
+
+    __tablename__ = "import_job_items"
+    __table_args__ = (
+        UniqueConstraint("job_id", "normalized_title"),
+        # Serves resuming: a job's unfinished items in id order
+        Index("ix_import_job_items_job_id_state", "job_id", "state", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("import_jobs.id"))
+    title: Mapped[str] = mapped_column(String(512))
+    normalized_title: Mapped[str] = mapped_column(String(512))
+    # One of the states in research_assistant.db.journal
+    state: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    paper_id: Mapped[int | None] = mapped_column(ForeignKey("papers.id"), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<ImportItem {self.title} {self.state}>"
+
+
+class DBPaperCitation(Base):
+    """Database model for a citation edge: ``citing_id`` cites ``cited_id``."""
+
+    __tablename__ = "paper_citations"
+
+    # Semantic Scholar paper ids rather than foreign keys: most neighbours of a
+    # stored paper are not stored themselves
+    citing_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    cited_id: Mapped[str] = mapped_column(String(100), primary_key=True, index=True)
+
+    def __repr__(self) -> str:
+        return f"<PaperCitation {self.citing_id} -> {self.cited_id}>"
+
+
+class DBCitationCrawl(Base):
+    """Database model for a paper whose references and citations were fetched."""
+
+    __tablename__ = "citation_crawls"
+
+    semantic_scholar_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # False when the API did not know the paper
+    found: Mapped[bool] = mapped_column(Boolean, default=True)
+    crawled_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<CitationCrawl {self.semantic_scholar_id}>"
+
+
+class DBPaperMetrics(Base):
+    """Database model for the citation graph metrics of a paper."""
+
+    __tablename__ = "paper_metrics"
+
+    paper_id: Mapped[int] = mapped_column(ForeignKey("papers.id"), primary_key=True)
+    # None for papers without a Semantic Scholar id, which have no graph node
+    pagerank: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Citing and cited papers in the local citation graph
+    in_degree: Mapped[int] = mapped_column(Integer, default=0)
+    out_degree: Mapped[int] = mapped_column(Integer, default=0)
+    # Highest co-authorship centrality among the paper's authors
+    author_centrality: Mapped[float | None] = mapped_column(Float, nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<PaperMetrics {self.paper_id} {self.pagerank}>"
+
+
+class DBPaperSimilarity(Base):
+    """Database model for a stored paper's most related stored papers."""
+
+    __tablename__ = "paper_similarities"
+
+    paper_id: Mapped[int] = mapped_column(ForeignKey("papers.id"), primary_key=True)
+    # "co_citation" or "coupling"
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    similar_paper_id: Mapped[int] = mapped_column(
+        ForeignKey("papers.id"), primary_key=True
+    )
+    score: Mapped[float] = mapped_column(Float)
+
+    def __repr__(self) -> str:
+        return f"<PaperSimilarity {self.paper_id} {self.kind} {self.similar_paper_id}>"
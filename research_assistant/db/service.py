@@ -2,17 +2,101 @@
 Database service layer for paper and author operations.
 """
 
-from typing import Optional
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+from sqlalchemy import Table, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from research_assistant.db.models import DBAuthor, DBPaper
+from research_assistant.db.models import DBAuthor, DBPaper, paper_authors
 from research_assistant.models import Paper
+from research_assistant.normalization import normalize_author_name, normalize_title
+from research_assistant.paper_batch import PaperBatch
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT statement in bulk writes
+BULK_BATCH_SIZE = 1000
+# Author keys remembered by an AuthorKeyCache before it starts over
+AUTHOR_CACHE_SIZE = 1_000_000
+
+# Called with the ids and dataclasses of newly stored papers after they commit
+PapersStoredListener = Callable[[List[int], List[Paper]], None]
+_papers_stored_listeners: List[PapersStoredListener] = []
+
+
+def add_papers_stored_listener(listener: PapersStoredListener) -> None:
+    """
+    Call ``listener(paper_ids, papers)`` whenever new papers are stored.
+
+    Papers that already existed are not passed. A failing listener is logged
+    and does not affect the stored papers.
+
+    Args:
+        listener: Callable taking the new paper ids and their Paper dataclasses
+    """
+    if listener not in _papers_stored_listeners:
+        _papers_stored_listeners.append(listener)
+
+
+def remove_papers_stored_listener(listener: PapersStoredListener) -> None:
+    """Stop calling a listener added with :func:`add_papers_stored_listener`."""
+    if listener in _papers_stored_listeners:
+        _papers_stored_listeners.remove(listener)
+
+
+def _papers_stored(paper_ids: List[int], papers: List[Paper]) -> None:
+    if not paper_ids:
+        return
+    for listener in list(_papers_stored_listeners):
+        try:
+            listener(paper_ids, papers)
+        except Exception:
+            logger.exception(f"Papers-stored listener {listener!r} failed")
+
+
+class AuthorKeyCache:
+    """
+    Author ids by normalized name, reused across bulk writes.
+
+    Bulk imports keep one cache for the whole run so authors seen in earlier
+    batches are not looked up again. Entries stay valid as long as authors are
+    not merged or deleted while the cache is in use; clear it after a rollback,
+    since it may hold authors inserted by the rolled-back transaction.
+    """
+
+    def __init__(self, max_entries: int = AUTHOR_CACHE_SIZE):
+        """
+        Args:
+            max_entries: Keys remembered before the cache is cleared
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._ids: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[int]:
+        author_id = self._ids.get(key)
+        if author_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return author_id
+
+    def update(self, ids: Iterable[Tuple[str, int]]) -> None:
+        ids = dict(ids)
+        if len(self._ids) + len(ids) > self.max_entries:
+            self._ids.clear()
+        self._ids.update(ids)
+
+    def clear(self) -> None:
+        self._ids.clear()
 
 
 def get_or_create_author(db: Session, name: str) -> DBAuthor:
     """
-    Get an existing author or create a new one.
+    Get the author matching a name's normalized key or create a new one.
 
     Args:
         db: Database session
@@ -21,12 +105,7 @@ def get_or_create_author(db: Session, name: str) -> DBAuthor:
     Returns:
         DBAuthor: Author database model
     """
-    author = db.query(DBAuthor).filter(DBAuthor.name == name).first()
-    if not author:
-        author = DBAuthor(name=name)
-        db.add(author)
-        db.flush()  # Get the ID without committing
-    return author
+    return db.get(DBAuthor, _upsert_authors(db, [name])[name])
 
 
 def store_paper(
@@ -38,13 +117,18 @@ def store_paper(
     Args:
         db: Database session
         paper: Paper dataclass instance
-        semantic_scholar_id: Optional Semantic Scholar paper ID
+        semantic_scholar_id: Semantic Scholar paper ID, defaults to the paper's
 
     Returns:
         DBPaper: Stored paper database model
     """
-    # Check if paper already exists by title
-    existing_paper = db.query(DBPaper).filter(DBPaper.title == paper.title).first()
+    semantic_scholar_id = semantic_scholar_id or paper.semantic_scholar_id
+
+    # Check if paper already exists by normalized title or Semantic Scholar id
+    conditions = [DBPaper.normalized_title == normalize_title(paper.title)]
+    if semantic_scholar_id:
+        conditions.append(DBPaper.semantic_scholar_id == semantic_scholar_id)
+    existing_paper = db.query(DBPaper).filter(or_(*conditions)).first()
     if existing_paper:
         return existing_paper
 
@@ -61,13 +145,200 @@ def store_paper(
         semantic_scholar_id=semantic_scholar_id,
     )
 
-    # Add authors
-    for author in paper.authors:
-        db_author = get_or_create_author(db, author.name)
-        db_paper.authors.append(db_author)
+    # Add authors, resolving all of them with a few set-based statements
+    author_ids = _upsert_authors(db, dict.fromkeys(a.name for a in paper.authors))
+    authors = {
+        author.id: author
+        for author in db.scalars(
+            select(DBAuthor).where(DBAuthor.id.in_(set(author_ids.values())))
+        )
+    }
+    for author_id in dict.fromkeys(author_ids[a.name] for a in paper.authors):
+        db_paper.authors.append(authors[author_id])
 
     db.add(db_paper)
     db.commit()
     db.refresh(db_paper)
 
+    _papers_stored([db_paper.id], [paper])
     return db_paper
+
+
+def _insert(db: Session, table: Table):
+    """Return an INSERT for the session's dialect that supports ON CONFLICT."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+def _chunks(items: Sequence, size: int) -> Iterable[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _upsert_authors(
+    db: Session, names: Iterable[str], cache: Optional[AuthorKeyCache] = None
+) -> Dict[str, int]:
+    """
+    Resolve author names to ids by normalized key, inserting the missing ones.
+
+    Names sharing a key resolve to the same author; a new author keeps the
+    first spelling seen.
+
+    Args:
+        db: Database session
+        names: Distinct author names
+        cache: Author key cache to consult and fill, e.g. one per import run
+
+    Returns:
+        Dict[str, int]: Author id by name
+    """
+    cache = cache if cache is not None else AuthorKeyCache()
+    keys = {name: normalize_author_name(name) for name in names}
+    spellings: Dict[str, str] = {}
+    for name, key in keys.items():
+        spellings.setdefault(key, name)
+    author_ids = {key: cache.get(key) for key in spellings}
+
+    def lookup(missing: List[str]) -> None:
+        for chunk in _chunks(missing, BULK_BATCH_SIZE):
+            found = db.execute(
+                select(DBAuthor.normalized_name, DBAuthor.id).where(
+                    DBAuthor.normalized_name.in_(chunk)
+                )
+            ).all()
+            author_ids.update(found)
+            cache.update(found)
+
+    lookup([key for key, author_id in author_ids.items() if author_id is None])
+    missing = [
+        {"name": spellings[key], "normalized_name": key}
+        for key, author_id in author_ids.items()
+        if author_id is None
+    ]
+    for chunk in _chunks(missing, BULK_BATCH_SIZE):
+        inserted = db.execute(
+            _insert(db, DBAuthor.__table__)
+            .values(chunk)
+            .on_conflict_do_nothing()
+            .returning(DBAuthor.normalized_name, DBAuthor.id)
+        ).all()
+        author_ids.update(inserted)
+        cache.update(inserted)
+    # Keys inserted concurrently by another writer lost the conflict above
+    lookup([key for key, author_id in author_ids.items() if author_id is None])
+    return {name: author_ids[key] for name, key in keys.items()}
+
+
+def find_paper_ids(
+    db: Session, normalized_titles: Sequence[str], chunk_size: int = BULK_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    Look up stored papers by normalized title.
+
+    Issues one indexed query per ``chunk_size`` titles.
+
+    Args:
+        db: Database session
+        normalized_titles: Distinct normalized titles
+        chunk_size: Maximum number of titles per query
+
+    Returns:
+        Dict[str, int]: Paper id by normalized title, for the titles that exist
+    """
+    paper_ids: Dict[str, int] = {}
+    for chunk in _chunks(normalized_titles, chunk_size):
+        paper_ids.update(
+            db.execute(
+                select(DBPaper.normalized_title, DBPaper.id).where(
+                    DBPaper.normalized_title.in_(chunk)
+                )
+            ).all()
+        )
+    return paper_ids
+
+
+def _paper_row(paper: Paper) -> dict:
+    return {
+        "title": paper.title,
+        "normalized_title": normalize_title(paper.title),
+        "abstract": paper.abstract,
+        "url": paper.url,
+        "venue": paper.venue,
+        "year": paper.year,
+        "citation_count": paper.citation_count,
+        "reference_count": paper.reference_count,
+        "is_open_access": paper.is_open_access,
+        "semantic_scholar_id": paper.semantic_scholar_id,
+    }
+
+
+def store_papers_bulk(
+    db: Session,
+    papers: Union[Sequence[Paper], PaperBatch],
+    author_cache: Optional[AuthorKeyCache] = None,
+) -> List[Optional[int]]:
+    """
+    Store many papers and their authors with a handful of multi-row statements.
+
+    Papers already stored (by normalized title) are left untouched. Authors are
+    deduplicated by normalized name and resolved with one lookup per chunk of
+    keys missing from ``author_cache``, and papers,
+    authors and paper-author links are written with
+    ``INSERT ... ON CONFLICT DO NOTHING``. Everything is committed in a single
+    transaction.
+
+    Args:
+        db: Database session
+        papers: Paper dataclass instances, or a PaperBatch whose views are
+            passed on to the papers-stored listeners
+        author_cache: Author key cache shared with earlier calls, if any
+
+    Returns:
+        List[Optional[int]]: Paper id for each input paper, in input order. None
+        when a paper was skipped because its Semantic Scholar id already belongs
+        to a differently titled paper.
+    """
+    keys = [normalize_title(paper.title) for paper in papers]
+    by_key: Dict[str, Paper] = {}
+    for key, paper in zip(keys, papers):
+        by_key.setdefault(key, paper)
+    distinct_keys = list(by_key)
+
+    paper_ids = find_paper_ids(db, distinct_keys)
+
+    new_keys = [key for key in distinct_keys if key not in paper_ids]
+    new_ids: Dict[str, int] = {}
+    for chunk in _chunks(new_keys, BULK_BATCH_SIZE):
+        new_ids.update(
+            db.execute(
+                _insert(db, DBPaper.__table__)
+                .values([_paper_row(by_key[key]) for key in chunk])
+                .on_conflict_do_nothing()
+                .returning(DBPaper.normalized_title, DBPaper.id)
+            ).all()
+        )
+    paper_ids.update(new_ids)
+
+    author_ids = _upsert_authors(
+        db,
+        dict.fromkeys(author.name for key in new_ids for author in by_key[key].authors),
+        author_cache,
+    )
+    links = list(
+        {
+            (paper_id, author_ids[author.name]): None
+            for key, paper_id in new_ids.items()
+            for author in by_key[key].authors
+        }
+    )
+    for chunk in _chunks(links, BULK_BATCH_SIZE):
+        db.execute(
+            _insert(db, paper_authors)
+            .values([{"paper_id": p, "author_id": a} for p, a in chunk])
+            .on_conflict_do_nothing()
+        )
+
+    db.commit()
+    _papers_stored(list(new_ids.values()), [by_key[key] for key in new_ids])
+    return [paper_ids.get(key) for key in keys]
@@ -0,0 +1,535 @@
+"""
+Nearest-neighbour search over paper embeddings.
+
+The embeddings of every stored paper's title and abstract live in a
+memory-mapped float32 matrix on disk, next to the paper ids. Small indexes are
+searched exactly. Once an index reaches ``IVF_MIN_SIZE`` papers, a spherical
+k-means clusters the vectors into about ``sqrt(n)`` inverted lists (IVF), and
+a search only scores the vectors of the ``nprobe`` lists whose centroids are
+closest to the query.
+
+Papers stored by the importer after the index was built are embedded, appended
+to the matrix and assigned to their nearest list as they are stored. The index
+has a single writer: only the import process subscribes it to stored papers
+(:func:`subscribe_embedding_index`). Processes that only read the index, like
+the API, pick up the appended vectors on their next search; papers they store
+themselves are indexed by the next rebuild.
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from research_assistant.db.config import get_db
+from research_assistant.db.models import DBPaper
+from research_assistant.db.service import add_papers_stored_listener
+from research_assistant.embeddings import (
+    DEFAULT_DIM,
+    SentenceTransformerEmbedder,
+    TfidfSvdEmbedder,
+    paper_text,
+)
+from research_assistant.models import Paper
+
+logger = logging.getLogger(__name__)
+
+# Below this many vectors every search is exact
+IVF_MIN_SIZE = 10_000
+# Inverted lists scored per search
+NPROBE = 8
+KMEANS_ITERATIONS = 10
+# Training vectors sampled per inverted list
+KMEANS_SAMPLE_PER_LIST = 32
+# Vectors appended since the lists were built before they are rebuilt
+LIST_REBUILD_SIZE = 65_536
+# Growth since the last clustering after which the vectors are clustered again
+RECLUSTER_GROWTH = 4
+# Papers sampled to fit the TF-IDF/SVD embedder
+FIT_SAMPLE = 50_000
+# Papers embedded per chunk while building
+BUILD_CHUNK_SIZE = 10_000
+INITIAL_CAPACITY = 1024
+
+INDEX_FILE = "index.json"
+EMBEDDER_FILE = "embedder.npz"
+CENTROIDS_FILE = "centroids.npy"
+# Parallel arrays of ``capacity`` rows, the first ``count`` of which are used
+ARRAYS = {
+    "vectors": np.float32,
+    "ids": np.int64,
+    # Inverted list of each vector, -1 before the index is clustered
+    "assignments": np.int32,
+}
+
+
+def _spherical_kmeans(
+    vectors: np.ndarray, num_lists: int, iterations: int, seed: int = 0
+) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), num_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Empty clusters keep their previous centroid
+        filled = norms[:, 0] > 0
+        centroids[filled] = sums[filled] / norms[filled]
+    return centroids
+
+
+class EmbeddingIndex:
+    """
+    Memory-mapped embedding matrix with an inverted-file (IVF) search index.
+
+    Create one with :meth:`create` or :func:`build_embedding_index` and open
+    it with :meth:`open`. Safe to share between threads; only one process may
+    add papers.
+    """
+
+    def __init__(self, path: str, embedder, nprobe: int = NPROBE):
+        """
+        Args:
+            path: Index directory
+            embedder: Embedder the index was built with
+            nprobe: Inverted lists scored per search
+        """
+        self.path = Path(path)
+        self.embedder = embedder
+        self.nprobe = nprobe
+        self.count = 0
+        self.capacity = 0
+        self.centroids: Optional[np.ndarray] = None
+        self._arrays = {}
+        # Positions sorted by inverted list, covering the first _lists_size vectors
+        self._list_order = np.zeros(0, dtype=np.int64)
+        self._list_offsets = np.zeros(1, dtype=np.int64)
+        self._lists_size = 0
+        self._ivf_version = 0
+        # Number of vectors when the index was last clustered
+        self._clustered_size = 0
+        self._index_mtime = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def create(cls, path: str, embedder, **kwargs) -> "EmbeddingIndex":
+        """
+        Create an empty index directory, replacing any index there.
+
+        Args:
+            path: Index directory
+            embedder: Embedder used for every paper and query
+            **kwargs: EmbeddingIndex options
+        """
+        index = cls(path, embedder, **kwargs)
+        index.path.mkdir(parents=True, exist_ok=True)
+        (index.path / CENTROIDS_FILE).unlink(missing_ok=True)
+        if isinstance(embedder, TfidfSvdEmbedder):
+            embedder.save(str(index.path / EMBEDDER_FILE))
+        index._allocate(INITIAL_CAPACITY)
+        index._write_state()
+        return index
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> "EmbeddingIndex":
+        """
+        Open an index created by :meth:`create`.
+
+        Args:
+            path: Index directory
+            **kwargs: EmbeddingIndex options
+        """
+        state = json.loads((Path(path) / INDEX_FILE).read_text())
+        if state["embedder"] == TfidfSvdEmbedder.name:
+            embedder = TfidfSvdEmbedder.load(str(Path(path) / EMBEDDER_FILE))
+        else:
+            embedder = SentenceTransformerEmbedder(state["embedder"].split(":", 1)[1])
+        index = cls(path, embedder, **kwargs)
+        index.refresh()
+        return index
+
+    def _file(self, name: str) -> Path:
+        return self.path / f"{name}.npy"
+
+    def _allocate(self, capacity: int) -> None:
+        """Move the arrays to files of ``capacity`` rows."""
+        for name, dtype in ARRAYS.items():
+            shape = (capacity, self.embedder.dim) if name == "vectors" else (capacity,)
+            temporary = self.path / f"{name}.tmp.npy"
+            array = open_memmap(str(temporary), mode="w+", dtype=dtype, shape=shape)
+            if name in self._arrays:
+                array[: self.count] = self._arrays[name][: self.count]
+            array.flush()
+            del array
+            os.replace(temporary, self._file(name))
+        self.capacity = capacity
+        self._open_arrays()
+
+    def _open_arrays(self) -> None:
+        self._arrays = {
+            name: open_memmap(str(self._file(name)), mode="r+") for name in ARRAYS
+        }
+
+    def _write_state(self) -> None:
+        """Publish the vector count, after the vectors themselves are flushed."""
+        for array in self._arrays.values():
+            array.flush()
+        state = {
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "count": self.count,
+            "capacity": self.capacity,
+            "ivf_version": self._ivf_version,
+            "clustered_size": self._clustered_size,
+        }
+        temporary = self.path / f"{INDEX_FILE}.tmp"
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, self.path / INDEX_FILE)
+        self._index_mtime = (self.path / INDEX_FILE).stat().st_mtime_ns
+
+    def refresh(self) -> None:
+        """Pick up vectors appended by another process since the last call."""
+        mtime = (self.path / INDEX_FILE).stat().st_mtime_ns
+        if mtime == self._index_mtime:
+            return
+        with self._lock:
+            state = json.loads((self.path / INDEX_FILE).read_text())
+            if state["capacity"] != self.capacity or not self._arrays:
+                self.capacity = state["capacity"]
+                self._open_arrays()
+            self.count = state["count"]
+            self._clustered_size = state["clustered_size"]
+            if state["ivf_version"] != self._ivf_version or self.centroids is None:
+                self._ivf_version = state["ivf_version"]
+                centroids = self.path / CENTROIDS_FILE
+                self.centroids = np.load(centroids) if centroids.exists() else None
+                self._build_lists()
+            self._index_mtime = mtime
+
+    def _build_lists(self) -> None:
+        if self.centroids is None:
+            return
+        assignments = self._arrays["assignments"][: self.count]
+        self._list_order = np.argsort(assignments, kind="stable")
+        self._list_offsets = np.searchsorted(
+            assignments[self._list_order], np.arange(len(self.centroids) + 1)
+        )
+        self._lists_size = self.count
+
+    def _train(self) -> None:
+        """Cluster the vectors into inverted lists and assign every vector."""
+        vectors = self._arrays["vectors"]
+        num_lists = max(1, int(math.sqrt(self.count)))
+        rng = np.random.default_rng(self._ivf_version)
+        sample_size = min(self.count, num_lists * KMEANS_SAMPLE_PER_LIST)
+        sample = vectors[np.sort(rng.choice(self.count, sample_size, replace=False))]
+        self.centroids = _spherical_kmeans(sample, num_lists, KMEANS_ITERATIONS)
+        for start in range(0, self.count, BUILD_CHUNK_SIZE):
+            chunk = vectors[start : start + BUILD_CHUNK_SIZE]
+            self._arrays["assignments"][start : start + len(chunk)] = np.argmax(
+                chunk @ self.centroids.T, axis=1
+            )
+        np.save(self.path / CENTROIDS_FILE, self.centroids)
+        self._ivf_version += 1
+        self._clustered_size = self.count
+        self._build_lists()
+        logger.info(f"Clustered {self.count} embeddings into {num_lists} lists")
+
+    def add(self, paper_ids: Sequence[int], texts: Sequence[str]) -> int:
+        """
+        Embed and index papers. Papers already indexed are skipped.
+
+        Args:
+            paper_ids: Database ids of the papers
+            texts: Text of each paper, see :func:`paper_text`
+
+        Returns:
+            int: Number of papers added
+        """
+        with self._lock:
+            indexed = set(
+                self._arrays["ids"][: self.count][
+                    np.isin(self._arrays["ids"][: self.count], paper_ids)
+                ].tolist()
+            )
+        new = {}
+        for paper_id, text in zip(paper_ids, texts):
+            if paper_id not in indexed:
+                new.setdefault(paper_id, text)
+        if not new:
+            return 0
+        vectors = self.embedder.embed(list(new.values()))
+
+        with self._lock:
+            start, end = self.count, self.count + len(new)
+            if end > self.capacity:
+                self._allocate(max(end, self.capacity * 2))
+            self._arrays["vectors"][start:end] = vectors
+            self._arrays["ids"][start:end] = list(new)
+            self._arrays["assignments"][start:end] = (
+                np.argmax(vectors @ self.centroids.T, axis=1)
+                if self.centroids is not None
+                else -1
+            )
+            self.count = end
+            if self.count >= max(IVF_MIN_SIZE, self._clustered_size * RECLUSTER_GROWTH):
+                self._train()
+            elif self.count - self._lists_size >= LIST_REBUILD_SIZE:
+                self._build_lists()
+            self._write_state()
+        return len(new)
+
+    def add_papers(self, paper_ids: Sequence[int], papers: Sequence[Paper]) -> None:
+        """Index newly stored papers; registered as a papers-stored listener."""
+        self.add(paper_ids, [paper_text(p.title, p.abstract) for p in papers])
+
+    def vector(self, paper_id: int) -> Optional[np.ndarray]:
+        """Return the indexed embedding of a paper, if it is indexed."""
+        ids = self._arrays["ids"][: self.count]
+        positions = np.flatnonzero(ids == paper_id)
+        return self._arrays["vectors"][positions[0]].copy() if len(positions) else None
+
+    def paper_vector(self, paper) -> np.ndarray:
+        """
+        Return a paper's indexed embedding, or embed it if it is not indexed.
+
+        Args:
+            paper: A DBPaper
+        """
+        vector = self.vector(paper.id)
+        if vector is None:
+            vector = self.embedder.embed([paper_text(paper.title, paper.abstract)])[0]
+        return vector
+
+    def search(
+        self, vector: np.ndarray, k: int = 10, exclude: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the indexed papers most similar to an embedding.
+
+        Args:
+            vector: Unit query embedding
+            k: Number of papers to return
+            exclude: Paper id to leave out, e.g. the query paper itself
+
+        Returns:
+            List[Tuple[int, float]]: Paper ids and cosine similarities, most
+            similar first
+        """
+        with self._lock:
+            count = self.count
+            vectors, ids = self._arrays["vectors"], self._arrays["ids"]
+            assignments = self._arrays["assignments"]
+            centroids = self.centroids
+            order, offsets, lists_size = (
+                self._list_order,
+                self._list_offsets,
+                self._lists_size,
+            )
+
+        if centroids is None or count < IVF_MIN_SIZE:
+            positions = np.arange(count)
+            scores = vectors[:count] @ vector
+        else:
+            probes = np.argsort(-(centroids @ vector))[: self.nprobe]
+            tail = lists_size + np.flatnonzero(
+                np.isin(assignments[lists_size:count], probes)
+            )
+            positions = np.sort(
+                np.concatenate(
+                    [order[offsets[c] : offsets[c + 1]] for c in probes] + [tail]
+                )
+            )
+            scores = vectors[positions] @ vector
+
+        # One extra in case the excluded paper is among the best
+        top = min(k + 1, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top] if top else []
+        best = sorted(best, key=lambda i: -scores[i])
+        results = [
+            (int(ids[positions[i]]), float(scores[i]))
+            for i in best
+            if ids[positions[i]] != exclude
+        ]
+        return results[:k]
+
+
+def _paper_rows(
+    db: Session, chunk_size: int
+) -> Iterable[Tuple[int, str, Optional[str]]]:
+    return db.execute(
+        select(DBPaper.id, DBPaper.title, DBPaper.abstract)
+        .order_by(DBPaper.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+
+def build_embedding_index(
+    db: Session,
+    path: str,
+    model_name: Optional[str] = None,
+    dim: int = DEFAULT_DIM,
+    fit_sample: int = FIT_SAMPLE,
+) -> EmbeddingIndex:
+    """
+    Embed every stored paper into a new index.
+
+    Args:
+        db: Database session
+        path: Index directory, replaced if it exists
+        model_name: sentence-transformers model to use instead of TF-IDF/SVD
+        dim: TF-IDF/SVD embedding dimensions
+        fit_sample: Papers sampled to fit the TF-IDF/SVD embedder
+
+    Returns:
+        EmbeddingIndex: Index of all papers
+    """
+    if model_name:
+        embedder = SentenceTransformerEmbedder(model_name)
+    else:
+        # Reservoir sample, so fitting sees the whole table in one pass
+        rng = random.Random(0)
+        sample: List[str] = []
+        for seen, (_, title, abstract) in enumerate(_paper_rows(db, BUILD_CHUNK_SIZE)):
+            if len(sample) < fit_sample:
+                sample.append(paper_text(title, abstract))
+            elif (slot := rng.randrange(seen + 1)) < fit_sample:
+                sample[slot] = paper_text(title, abstract)
+        embedder = TfidfSvdEmbedder.fit(sample, dim=dim)
+
+    index = EmbeddingIndex.create(path, embedder)
+    chunk: List[Tuple[int, str, Optional[str]]] = []
+    for row in _paper_rows(db, BUILD_CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) == BUILD_CHUNK_SIZE:
+            index.add([r[0] for r in chunk], [paper_text(r[1], r[2]) for r in chunk])
+            chunk = []
+    if chunk:
+        index.add([r[0] for r in chunk], [paper_text(r[1], r[2]) for r in chunk])
+    logger.info(f"Embedded {len(index)} papers into {path}")
+    return index
+
+
+@lru_cache(maxsize=1)
+def get_embedding_index() -> Optional[EmbeddingIndex]:
+    """
+    Return the process-wide index configured by ``EMBEDDING_INDEX_PATH``.
+
+    The index is opened from that directory, or built from the database on
+    first use with the ``EMBEDDING_MODEL`` sentence-transformers model if set,
+    TF-IDF/SVD otherwise. Building can take minutes, so servers should call
+    this at startup rather than on a request.
+
+    Returns:
+        Optional[EmbeddingIndex]: Shared index, or None if disabled
+    """
+    path = os.getenv("EMBEDDING_INDEX_PATH")
+    if not path:
+        return None
+    if (Path(path) / INDEX_FILE).exists():
+        index = EmbeddingIndex.open(path)
+    else:
+        db = next(get_db())
+        try:
+            index = build_embedding_index(db, path, os.getenv("EMBEDDING_MODEL"))
+        finally:
+            db.close()
+    return index
+
+
+def subscribe_embedding_index() -> Optional[EmbeddingIndex]:
+    """
+    Add the papers this process stores to the configured index from now on.
+
+    Only the import process should call this: the index has one writer, and
+    two processes appending to it would overwrite each other's rows.
+
+    Returns:
+        Optional[EmbeddingIndex]: Shared index, or None if disabled
+    """
+    index = get_embedding_index()
+    if index is not None:
+        add_papers_stored_listener(index.add_papers)
+    return index
+
+
+def similar_papers(
+    query: Union[int, str],
+    k: int = 10,
+    db: Optional[Session] = None,
+    index: Optional[EmbeddingIndex] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Find the papers most similar to a stored paper or to free text.
+
+    Args:
+        query: Paper id, or text to embed
+        k: Number of papers to return
+        db: Database session, used to read a paper that is not indexed yet
+        index: Index to search, defaults to the configured one
+
+    Returns:
+        List[Tuple[int, float]]: Paper ids and cosine similarities, most
+        similar first; empty for an unknown paper id
+    """
+    index = index or get_embedding_index()
+    if index is None:
+        raise RuntimeError("No embedding index configured, set EMBEDDING_INDEX_PATH")
+    index.refresh()
+
+    if isinstance(query, str):
+        return index.search(index.embedder.embed([query])[0], k)
+
+    vector = index.vector(query)
+    if vector is None:
+        paper = db.get(DBPaper, query) if db is not None else None
+        if paper is None:
+            return []
+        vector = index.paper_vector(paper)
+    return index.search(vector, k, exclude=query)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query the embedding index")
+    parser.add_argument("--path", default=os.getenv("EMBEDDING_INDEX_PATH"))
+    parser.add_argument("--build", action="store_true", help="Rebuild the index")
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL"))
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("query", nargs="?", help="Paper id or text to search for")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("--path or EMBEDDING_INDEX_PATH is required")
+
+    logging.basicConfig(level=logging.INFO)
+    db = next(get_db())
+    try:
+        if args.build:
+            index = build_embedding_index(db, args.path, args.model, args.dim)
+        else:
+            index = EmbeddingIndex.open(args.path)
+        print(f"{len(index)} papers indexed in {args.path}")
+        if args.query:
+            query = int(args.query) if args.query.isdigit() else args.query
+            for paper_id, similarity in similar_papers(query, args.k, db, index):
+                paper = db.get(DBPaper, paper_id)
+                print(f"{similarity:.3f}  [{paper_id}] {paper.title if paper else ''}")
+    finally:
+        db.close()
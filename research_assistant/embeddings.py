@@ -0,0 +1,199 @@
+"""
+Local, CPU-only text embeddings for papers.
+
+The default :class:`TfidfSvdEmbedder` fits TF-IDF weights over a sample of the
+stored papers and reduces them to a few hundred dimensions with a truncated SVD
+(latent semantic analysis), using nothing beyond NumPy and SciPy. If the
+optional ``sentence-transformers`` package is installed, a local transformer
+model can be used instead with :class:`SentenceTransformerEmbedder`.
+
+Every embedder returns L2-normalized float32 rows, so a dot product is the
+cosine similarity.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import svds
+
+from research_assistant.normalization import normalize_title
+
+DEFAULT_DIM = 128
+# Most frequent terms of the fitting sample kept in the vocabulary
+MAX_FEATURES = 30_000
+# Terms must appear in at least this many fitting documents
+MIN_DF = 2
+
+
+def paper_text(title: Optional[str], abstract: Optional[str]) -> str:
+    """Text embedded for a paper: its title followed by its abstract."""
+    return f"{title or ''}. {abstract or ''}"
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized words of a text with their adjacent-word bigrams."""
+    words = [word for word in normalize_title(text).split() if len(word) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class TfidfSvdEmbedder:
+    """Latent semantic analysis embeddings: TF-IDF reduced by a truncated SVD."""
+
+    name = "tfidf-svd"
+
+    def __init__(
+        self, vocabulary: Dict[str, int], idf: np.ndarray, components: np.ndarray
+    ):
+        """
+        Args:
+            vocabulary: Column of each term
+            idf: Inverse document frequency of each term
+            components: ``(terms, dim)`` projection onto the SVD components
+        """
+        self.vocabulary = vocabulary
+        self.idf = idf.astype(np.float32)
+        self.components = components.astype(np.float32)
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        dim: int = DEFAULT_DIM,
+        max_features: int = MAX_FEATURES,
+        min_df: int = MIN_DF,
+    ) -> "TfidfSvdEmbedder":
+        """
+        Fit the vocabulary, IDF weights and projection on sample texts.
+
+        Args:
+            texts: Sample of the texts to embed
+            dim: Embedding dimensions; fewer for very small samples
+            max_features: Maximum vocabulary size
+            min_df: Minimum document frequency of a term
+
+        Returns:
+            TfidfSvdEmbedder: The fitted embedder
+        """
+        documents = [Counter(tokenize(text)) for text in texts]
+        df = Counter(term for counts in documents for term in counts)
+        terms = [
+            term for term, count in df.most_common(max_features) if count >= min_df
+        ]
+        if not terms:
+            # Too few documents to find shared terms; keep every term
+            terms = [term for term, _ in df.most_common(max_features)]
+        vocabulary = {term: column for column, term in enumerate(sorted(terms))}
+        idf = np.array(
+            [
+                math.log((1 + len(documents)) / (1 + df[term])) + 1
+                for term in sorted(terms)
+            ],
+            dtype=np.float32,
+        )
+
+        embedder = cls(vocabulary, idf, np.zeros((len(vocabulary), 0)))
+        tfidf = embedder._tfidf(documents)
+        dim = min(dim, min(tfidf.shape) - 1)
+        if dim < 1:
+            components = np.eye(len(vocabulary), 1, dtype=np.float32)
+        else:
+            # svds returns the components in increasing singular value order
+            _, _, vt = svds(tfidf, k=dim, random_state=0)
+            components = vt[::-1].T
+        embedder.components = components.astype(np.float32)
+        return embedder
+
+    def _tfidf(self, documents: Sequence[Counter]) -> sparse.csr_matrix:
+        rows, columns, values = [], [], []
+        for row, counts in enumerate(documents):
+            for term, count in counts.items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(1 + math.log(count))
+        tfidf = sparse.csr_matrix(
+            (np.array(values, dtype=np.float32), (rows, columns)),
+            shape=(len(documents), len(self.vocabulary)),
+        )
+        tfidf = tfidf.multiply(self.idf[np.newaxis, :]).tocsr()
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ tfidf
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: ``(len(texts), dim)`` float32 unit rows; all zeros for
+            texts without any known term
+        """
+        tfidf = self._tfidf([Counter(tokenize(text)) for text in texts])
+        vectors = np.asarray(tfidf @ self.components, dtype=np.float32)
+        return _normalize_rows(vectors.reshape(len(texts), self.dim))
+
+    def save(self, path: str) -> None:
+        """Write the embedder to a ``.npz`` file."""
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        # Write through a file object so numpy does not append ".npz"
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                terms=np.array(terms, dtype=str),
+                idf=self.idf,
+                components=self.components,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfSvdEmbedder":
+        """Read an embedder written by :meth:`save`."""
+        with np.load(path) as data:
+            vocabulary = {term: i for i, term in enumerate(data["terms"].tolist())}
+            return cls(vocabulary, data["idf"], data["components"])
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a local sentence-transformers model, run on the CPU."""
+
+    def __init__(self, model_name: str):
+        """
+        Args:
+            model_name: Model name or local path, e.g. "all-MiniLM-L6-v2"
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "Transformer embeddings require the sentence-transformers package"
+            ) from e
+        self.model_name = model_name
+        self.name = f"sentence-transformers:{model_name}"
+        self._model = SentenceTransformer(model_name, device="cpu")
+
+    @property
+    def dim(self) -> int:
+        return self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into ``(len(texts), dim)`` float32 unit rows."""
+        return np.asarray(
+            self._model.encode(list(texts), normalize_embeddings=True),
+            dtype=np.float32,
+        ).reshape(len(texts), self.dim)
@@ -1,39 +1,304 @@
+"""
+Find the papers of a CSV file that are not in the database.
+
+The normalized titles of every stored paper are loaded once, streamed from a
+server-side cursor or read from a prebuilt title set file or a columnar
+snapshot, and the CSV's missing titles are their set difference. An optional
+fuzzy pass matches the leftovers against the stored titles in a process pool
+and reports the closest local match of each.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
 from research_assistant.db.config import get_db
-from research_assistant.import_papers import read_papers_from_csv
-from research_assistant.paper_search import check_paper_exists
+from research_assistant.db.models import DBPaper
+from research_assistant.snapshot import Snapshot
+from research_assistant.title_matching import SIMILARITY_THRESHOLD, TitleMatcher
+from research_assistant.title_reader import bounded_map, read_title_batches
+
+# Rows fetched per round trip when streaming the papers table
+STREAM_CHUNK_SIZE = 10_000
+# Titles matched per task in the fuzzy pass
+FUZZY_CHUNK_SIZE = 500
+
+
+@dataclass
+class LocalTitles:
+    """Ids, titles and normalized titles of the stored papers."""
+
+    ids: List[int]
+    titles: List[str]
+    positions: Dict[str, int]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterator[Tuple[int, str, Optional[str]]]) -> "LocalTitles":
+        local = cls(ids=[], titles=[], positions={})
+        for paper_id, title, normalized in rows:
+            if normalized is not None:
+                local.positions.setdefault(normalized, len(local.ids))
+            local.ids.append(paper_id)
+            local.titles.append(title)
+        return local
+
+
+def load_local_titles(db: Session, chunk_size: int = STREAM_CHUNK_SIZE) -> LocalTitles:
+    """
+    Load the titles of every stored paper with a server-side cursor.
+
+    Args:
+        db: Database session
+        chunk_size: Rows fetched per round trip
+
+    Returns:
+        LocalTitles: Stored paper titles
+    """
+    rows = db.execute(
+        select(DBPaper.id, DBPaper.title, DBPaper.normalized_title)
+        .order_by(DBPaper.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    return LocalTitles.from_rows(iter(rows))
+
+
+def load_snapshot_titles(path: str) -> LocalTitles:
+    """
+    Read stored paper titles from a snapshot written by
+    :func:`research_assistant.snapshot.export_snapshot`.
+
+    Args:
+        path: Snapshot directory
+
+    Returns:
+        LocalTitles: Stored paper titles
+    """
+    return LocalTitles.from_rows(Snapshot.open(path).rows("title", "normalized_title"))
+
+
+def save_title_set(local: LocalTitles, path: str) -> None:
+    """
+    Write stored paper titles to a gzipped TSV file for later runs.
+
+    Args:
+        local: Stored paper titles
+        path: Destination file
+    """
+    normalized_by_position = {
+        position: key for key, position in local.positions.items()
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        for position, (paper_id, title) in enumerate(zip(local.ids, local.titles)):
+            writer.writerow([paper_id, normalized_by_position.get(position, ""), title])
 
 
-def find_missing_papers(csv_path: str) -> list[str]:
+def load_title_set(path: str) -> LocalTitles:
+    """
+    Read stored paper titles written by :func:`save_title_set`.
+
+    Args:
+        path: Title set file
+
+    Returns:
+        LocalTitles: Stored paper titles
+    """
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        return LocalTitles.from_rows(
+            (int(paper_id), title, normalized or None)
+            for paper_id, normalized, title in csv.reader(f, delimiter="\t")
+        )
+
+
+def find_missing_papers(
+    csv_path: str, local: Optional[LocalTitles] = None
+) -> list[str]:
     """
     Read through a CSV file and find papers that are not in the database.
 
     Args:
-        csv_path: Path to the CSV file
+        csv_path: Path to the CSV file, optionally compressed, or "-" for stdin
+        local: Stored paper titles, loaded from the database if not given
 
     Returns:
         list[str]: List of paper titles that are not in the database
     """
-    db = next(get_db())
-    missing_papers = []
+    if local is None:
+        db = next(get_db())
+        try:
+            local = load_local_titles(db)
+        finally:
+            db.close()
+
+    return [
+        title
+        for batch in read_title_batches(csv_path)
+        for title, normalized in batch
+        if normalized not in local.positions
+    ]
+
+
+@dataclass
+class MissingPaper:
+    """A title missing from the database and its closest stored title."""
+
+    title: str
+    closest_id: Optional[int] = None
+    closest_title: Optional[str] = None
+    similarity: Optional[float] = None
+    # "missing", or "near_match" when the closest title passes the threshold
+    status: str = "missing"
+
+
+# Matcher inherited by forked fuzzy-pass workers, or built by _init_matcher
+_matcher: Optional[TitleMatcher] = None
+
+
+def _init_matcher(titles: List[str]) -> None:
+    global _matcher
+    _matcher = TitleMatcher(titles)
+    _matcher.freeze()
+
+
+def _closest_matches(titles: List[str]) -> List[Optional[Tuple[int, float]]]:
+    return _matcher.match_many(titles, threshold=0.0)
+
+
+def match_missing_papers(
+    titles: Sequence[str],
+    local: LocalTitles,
+    workers: int = 0,
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> List[MissingPaper]:
+    """
+    Find the closest stored title of each missing title.
+
+    Args:
+        titles: Titles missing from the database
+        local: Stored paper titles
+        workers: Match in this many processes; 0 or 1 matches in this process
+        threshold: Similarity at which a title counts as a near match
+
+    Returns:
+        List[MissingPaper]: One record per title, in order
+    """
+    chunks = [
+        list(titles[start : start + FUZZY_CHUNK_SIZE])
+        for start in range(0, len(titles), FUZZY_CHUNK_SIZE)
+    ]
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # Build the index once; forked workers share it copy-on-write
+        _init_matcher(local.titles)
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            matches = list(bounded_map(pool, _closest_matches, chunks, workers * 2))
+    elif workers > 1:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_matcher, initargs=(local.titles,)
+        ) as pool:
+            matches = list(bounded_map(pool, _closest_matches, chunks, workers * 2))
+    else:
+        _init_matcher(local.titles)
+        matches = [_closest_matches(chunk) for chunk in chunks]
 
-    try:
-        for paper_info in read_papers_from_csv(csv_path):
-            title = paper_info["Title"]
-            existing_paper = check_paper_exists(db, title)
+    records = []
+    for title, match in zip(titles, (m for chunk in matches for m in chunk)):
+        if match is None:
+            records.append(MissingPaper(title))
+            continue
+        position, similarity = match
+        records.append(
+            MissingPaper(
+                title=title,
+                closest_id=local.ids[position],
+                closest_title=local.titles[position],
+                similarity=round(similarity, 4),
+                status="near_match" if similarity >= threshold else "missing",
+            )
+        )
+    return records
 
-            if not existing_paper:
-                missing_papers.append(title)
 
-    finally:
-        db.close()
+def write_report(records: List[MissingPaper], path: str) -> None:
+    """
+    Write missing papers to a ``.json`` file, or CSV for any other extension.
 
-    return missing_papers
+    Args:
+        records: Missing papers
+        path: Destination file
+    """
+    rows = [asdict(record) for record in records]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump(rows, f, indent=2)
+            return
+        writer = csv.DictWriter(f, fieldnames=list(MissingPaper.__dataclass_fields__))
+        writer.writeheader()
+        writer.writerows(rows)
 
 
 if __name__ == "__main__":
-    csv_path = Path(__file__).parent.parent / "data" / "dl4h_papers.csv"
-    missing_papers = find_missing_papers(str(csv_path))
-    print(f"Found {len(missing_papers)} missing papers")
-    for paper in missing_papers:
-        print(paper)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "csv_path",
+        nargs="?",
+        default=str(Path(__file__).parent.parent / "data" / "dl4h_papers.csv"),
+    )
+    parser.add_argument("--title-set", help="Read stored titles from this file")
+    parser.add_argument("--snapshot", help="Read stored titles from this snapshot")
+    parser.add_argument(
+        "--save-title-set", help="Write the stored titles to this file for later runs"
+    )
+    parser.add_argument(
+        "--fuzzy", action="store_true", help="Find the closest stored title of each"
+    )
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--output", help="Write a .csv or .json report")
+    args = parser.parse_args()
+
+    if args.title_set:
+        local = load_title_set(args.title_set)
+    elif args.snapshot:
+        local = load_snapshot_titles(args.snapshot)
+    else:
+        db = next(get_db())
+        try:
+            local = load_local_titles(db)
+        finally:
+            db.close()
+    if args.save_title_set:
+        save_title_set(local, args.save_title_set)
+
+    missing_papers = find_missing_papers(args.csv_path, local)
+    if args.fuzzy:
+        records = match_missing_papers(missing_papers, local, workers=args.workers)
+    else:
+        records = [MissingPaper(title) for title in missing_papers]
+
+    if args.output:
+        write_report(records, args.output)
+        print(f"Wrote {len(records)} missing papers to {args.output}")
+    else:
+        print(f"Found {len(missing_papers)} missing papers")
+        for record in records:
+            if record.closest_title is None:
+                print(record.title)
+            else:
+                print(
+                    f"{record.title}  ->  [{record.closest_id}] "
+                    f"{record.closest_title} ({record.similarity:.0%}, {record.status})"
+                )
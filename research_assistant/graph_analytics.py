@@ -0,0 +1,338 @@
+"""
+Batch citation graph analytics on sparse matrices.
+
+The citation graph is loaded into a SciPy CSR adjacency matrix (``A[i, j]`` is
+1 when paper ``i`` cites paper ``j``) and the paper-author links into a sparse
+incidence matrix, then:
+
+- PageRank is computed by power iteration over the adjacency matrix.
+- Co-citation (``AᵀA``: cited together) and bibliographic coupling (``AAᵀ``:
+  sharing references) are computed in blocks of rows, keeping the top-k most
+  similar stored papers of each stored paper by cosine similarity, so the full
+  product is never materialized.
+- Author centrality is the PageRank of the weighted co-authorship graph.
+
+The results replace the ``paper_metrics`` and ``paper_similarities`` tables.
+"""
+
+import argparse
+import logging
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from research_assistant.citation_graph import (
+    CitationGraph,
+    load_citation_graph,
+    load_edge_list,
+)
+from research_assistant.db.config import get_db
+from research_assistant.db.models import (
+    DBPaper,
+    DBPaperMetrics,
+    DBPaperSimilarity,
+    paper_authors,
+)
+from research_assistant.db.service import BULK_BATCH_SIZE, _chunks
+
+logger = logging.getLogger(__name__)
+
+DAMPING = 0.85
+# Most related papers kept per paper and kind
+TOP_K = 10
+# Rows of the similarity product computed at once
+BLOCK_SIZE = 1024
+
+
+def citation_matrix(graph: CitationGraph, num_nodes: Optional[int] = None):
+    """
+    Return the graph's adjacency matrix, reusing its CSR arrays.
+
+    Args:
+        graph: Citation graph
+        num_nodes: Matrix size, at least ``graph.num_nodes``; the extra nodes
+            have no edges
+
+    Returns:
+        sparse.csr_matrix: ``A[i, j] == 1`` when node ``i`` cites node ``j``
+    """
+    num_nodes = num_nodes or graph.num_nodes
+    indptr = np.concatenate(
+        [
+            graph.reference_indptr,
+            np.full(num_nodes - graph.num_nodes, graph.reference_indptr[-1]),
+        ]
+    )
+    matrix = sparse.csr_matrix(
+        (
+            np.ones(graph.num_edges, dtype=np.float32),
+            graph.reference_indices,
+            indptr,
+        ),
+        shape=(num_nodes, num_nodes),
+    )
+    # Duplicate edges in an edge list count once
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def pagerank(
+    matrix, damping: float = DAMPING, tol: float = 1e-6, max_iter: int = 100
+) -> np.ndarray:
+    """
+    Compute PageRank by power iteration.
+
+    The rank of nodes without out-links is spread evenly over all nodes.
+
+    Args:
+        matrix: Square sparse matrix, ``matrix[i, j]`` the weight of the link i -> j
+        damping: Probability of following a link rather than jumping
+        tol: Convergence threshold per node on the L1 change between iterations
+        max_iter: Maximum number of iterations
+
+    Returns:
+        np.ndarray: Rank of each node, summing to 1
+    """
+    num_nodes = matrix.shape[0]
+    if num_nodes == 0:
+        return np.zeros(0)
+    out_weight = np.asarray(matrix.sum(axis=1), dtype=np.float64).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(num_nodes), where=~dangling)
+    # Transposed transition matrix: rank flows along the links
+    transition = (sparse.diags(inverse) @ matrix).T.tocsr()
+
+    rank = np.full(num_nodes, 1.0 / num_nodes)
+    for _ in range(max_iter):
+        previous = rank
+        rank = damping * (transition @ rank + previous[dangling].sum() / num_nodes)
+        rank += (1 - damping) / num_nodes
+        if np.abs(rank - previous).sum() < num_nodes * tol:
+            break
+    return rank
+
+
+def similar_nodes(
+    left,
+    right,
+    degrees: np.ndarray,
+    rows: np.ndarray,
+    candidates: np.ndarray,
+    top_k: int = TOP_K,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Find the most similar nodes of each row of ``left @ right``, block by block.
+
+    Co-citation is ``similar_nodes(A.T, A, in_degrees, ...)`` and bibliographic
+    coupling ``similar_nodes(A, A.T, out_degrees, ...)``. Shared neighbour counts
+    are turned into cosine similarities with ``degrees``.
+
+    Args:
+        left: CSR matrix whose ``rows`` are multiplied
+        right: CSR matrix
+        degrees: Neighbour count of each node
+        rows: Nodes to find similar nodes for
+        candidates: Boolean mask of the nodes that may be returned
+        top_k: Most similar nodes kept per row
+        block_size: Rows multiplied at once
+
+    Yields:
+        Tuple[int, np.ndarray, np.ndarray]: Node, similar nodes and their
+        similarities in decreasing order, for rows with any similar node
+    """
+    for start in range(0, len(rows), block_size):
+        block = rows[start : start + block_size]
+        counts = (left[block] @ right).tocsr()
+        for i, node in enumerate(block):
+            lo, hi = counts.indptr[i], counts.indptr[i + 1]
+            nodes = counts.indices[lo:hi]
+            keep = candidates[nodes] & (nodes != node)
+            nodes = nodes[keep]
+            if not nodes.size:
+                continue
+            scores = counts.data[lo:hi][keep] / np.sqrt(degrees[node] * degrees[nodes])
+            if nodes.size > top_k:
+                top = np.argpartition(-scores, top_k)[:top_k]
+                nodes, scores = nodes[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            yield int(node), nodes[order], scores[order]
+
+
+def author_centrality(
+    paper_rows: np.ndarray, author_ids: np.ndarray, num_papers: int
+) -> np.ndarray:
+    """
+    Score each paper by the co-authorship centrality of its best-connected author.
+
+    Authors are linked with a weight equal to the number of papers they wrote
+    together, and an author's centrality is their PageRank in that graph.
+
+    Args:
+        paper_rows: Paper index of each paper-author link
+        author_ids: Author id of each link
+        num_papers: Number of papers
+
+    Returns:
+        np.ndarray: Highest author centrality of each paper, NaN for papers
+        without authors
+    """
+    centrality = np.full(num_papers, np.nan)
+    if not len(author_ids):
+        return centrality
+    _, author_columns = np.unique(author_ids, return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(paper_rows), dtype=np.float32), (paper_rows, author_columns)),
+        shape=(num_papers, author_columns.max() + 1),
+    )
+    incidence.data[:] = 1
+    coauthors = (incidence.T @ incidence).tocsr()
+    coauthors.setdiag(0)
+    coauthors.eliminate_zeros()
+
+    author_rank = pagerank(coauthors)
+    best = incidence.multiply(author_rank[np.newaxis, :]).tocsr().max(axis=1)
+    has_authors = np.diff(incidence.indptr) > 0
+    centrality[has_authors] = best.toarray().ravel()[has_authors]
+    return centrality
+
+
+def _paper_author_links(
+    db: Session, paper_rows: Dict[int, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    rows = array("q")
+    authors = array("q")
+    for paper_id, author_id in db.execute(
+        select(paper_authors.c.paper_id, paper_authors.c.author_id).execution_options(
+            yield_per=BULK_BATCH_SIZE * 10
+        )
+    ):
+        rows.append(paper_rows[paper_id])
+        authors.append(author_id)
+    return np.frombuffer(rows, dtype=np.int64), np.frombuffer(authors, dtype=np.int64)
+
+
+def compute_paper_metrics(
+    db: Session,
+    graph: Optional[CitationGraph] = None,
+    top_k: int = TOP_K,
+    damping: float = DAMPING,
+) -> Dict[str, int]:
+    """
+    Compute the graph metrics of every stored paper and replace the stored ones.
+
+    Args:
+        db: Database session
+        graph: Citation graph, defaults to the stored edges
+        top_k: Most related papers stored per paper and kind
+        damping: PageRank damping factor
+
+    Returns:
+        Dict[str, int]: Number of rows written per table
+    """
+    if graph is None:
+        graph = load_citation_graph(db)
+    papers = db.execute(
+        select(DBPaper.id, DBPaper.semantic_scholar_id).order_by(DBPaper.id)
+    ).all()
+    paper_ids = np.array([paper_id for paper_id, _ in papers], dtype=np.int64)
+
+    # Stored papers missing from the edges still get a node of their own
+    index = dict(graph.index)
+    paper_nodes = np.array(
+        [index.setdefault(s2_id, len(index)) if s2_id else -1 for _, s2_id in papers],
+        dtype=np.int64,
+    )
+    adjacency = citation_matrix(graph, len(index))
+    adjacency_t = adjacency.T.tocsr()
+    out_degree = np.diff(adjacency.indptr)
+    in_degree = np.diff(adjacency_t.indptr)
+    rank = pagerank(adjacency, damping)
+    logger.info(
+        f"PageRank over {adjacency.shape[0]} papers and {adjacency.nnz} citations"
+    )
+
+    has_node = paper_nodes >= 0
+    stored = np.zeros(len(index), dtype=bool)
+    stored[paper_nodes[has_node]] = True
+    node_papers = np.full(len(index), -1, dtype=np.int64)
+    node_papers[paper_nodes[has_node]] = paper_ids[has_node]
+
+    centrality = author_centrality(
+        *_paper_author_links(db, {int(p): i for i, p in enumerate(paper_ids)}),
+        len(paper_ids),
+    )
+
+    now = datetime.utcnow()
+    metrics = []
+    for i, paper_id in enumerate(paper_ids.tolist()):
+        node = paper_nodes[i]
+        metrics.append(
+            {
+                "paper_id": paper_id,
+                "pagerank": float(rank[node]) if node >= 0 else None,
+                "in_degree": int(in_degree[node]) if node >= 0 else 0,
+                "out_degree": int(out_degree[node]) if node >= 0 else 0,
+                "author_centrality": (
+                    None if np.isnan(centrality[i]) else float(centrality[i])
+                ),
+                "computed_at": now,
+            }
+        )
+
+    similarities = []
+    rows = np.flatnonzero(stored)
+    for kind, left, right, degrees in (
+        ("co_citation", adjacency_t, adjacency, in_degree),
+        ("coupling", adjacency, adjacency_t, out_degree),
+    ):
+        for node, nodes, scores in similar_nodes(
+            left, right, degrees, rows, stored, top_k
+        ):
+            similarities.extend(
+                {
+                    "paper_id": int(node_papers[node]),
+                    "kind": kind,
+                    "similar_paper_id": int(similar),
+                    "score": float(score),
+                }
+                for similar, score in zip(node_papers[nodes], scores)
+            )
+
+    db.execute(delete(DBPaperSimilarity))
+    db.execute(delete(DBPaperMetrics))
+    for chunk in _chunks(metrics, BULK_BATCH_SIZE):
+        db.execute(insert(DBPaperMetrics), list(chunk))
+    for chunk in _chunks(similarities, BULK_BATCH_SIZE):
+        db.execute(insert(DBPaperSimilarity), list(chunk))
+    db.commit()
+    return {"paper_metrics": len(metrics), "paper_similarities": len(similarities)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute PageRank, related papers and author centrality"
+    )
+    parser.add_argument(
+        "--edges", help="Read citations from this edge-list file instead"
+    )
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = next(get_db())
+    try:
+        graph = load_edge_list(args.edges) if args.edges else None
+        counts = compute_paper_metrics(db, graph, top_k=args.top_k)
+        print(
+            f"Wrote metrics for {counts['paper_metrics']} papers and "
+            f"{counts['paper_similarities']} related papers"
+        )
+    finally:
+        db.close()
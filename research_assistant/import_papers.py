@@ -2,14 +2,55 @@
 Script to import papers from CSV file and store them in the database.
 """
 
+import argparse
 import csv
+import hashlib
+import os
+import queue
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 import time
-from typing import Generator, Optional
+from typing import Dict, Generator, List, Optional, Tuple
+
+from sqlalchemy import Row
+from sqlalchemy.orm import Session
 
 from research_assistant.db.config import get_db
-from research_assistant.db.service import store_paper
-from research_assistant.paper_search import check_paper_exists, search_paper
+from research_assistant.db.journal import (
+    ERROR,
+    NOT_FOUND,
+    SEARCHED,
+    SKIPPED,
+    STORED,
+    failed_titles,
+    finish_import_job,
+    record_states,
+    start_import_job,
+    unfinished_items,
+)
+from research_assistant.db.models import DBImportJob
+from research_assistant.db.service import (
+    AuthorKeyCache,
+    find_paper_ids,
+    store_paper,
+    store_papers_bulk,
+)
+from research_assistant.embedding_index import subscribe_embedding_index
+from research_assistant.models import Paper
+from research_assistant.near_duplicates import (
+    NearDuplicateIndex,
+    confirmed_duplicate,
+    get_near_duplicate_index,
+)
+from research_assistant.paper_search import search_paper
+from research_assistant.rate_limit import TokenBucket
+from research_assistant.search_cache import get_search_cache
+from research_assistant.title_reader import open_text, read_title_batches
+
+FAILED_PAPERS_PATH = Path(__file__).parent.parent / "data" / "failed_papers.csv"
 
 
 def read_papers_from_csv(csv_path: str) -> Generator[dict, None, None]:
@@ -17,90 +58,536 @@ def read_papers_from_csv(csv_path: str) -> Generator[dict, None, None]:
     Read papers from CSV file.
 
     Args:
-        csv_path: Path to the CSV file
+        csv_path: Path to the CSV file, optionally compressed, or "-" for stdin
 
     Yields:
         dict: Paper information from CSV
     """
-    with open(csv_path, "r", encoding="utf-8") as f:
+    with open_text(csv_path) as f:
         reader = csv.DictReader(f)
         for row in reader:
             if row.get("Title"):  # Skip empty rows
                 yield row
 
 
-def import_papers(csv_path: str) -> None:
+def import_papers(csv_path: str, parse_workers: int = 0) -> None:
     """
     Import papers from CSV file and store them in the database.
 
+    Progress is journaled, so running the import again for the same CSV after a
+    crash resumes with the titles that were not finished.
+
     Args:
-        csv_path: Path to the CSV file
+        csv_path: Path to the CSV file, optionally compressed, or "-" for stdin
+        parse_workers: Processes used to normalize titles while reading the CSV
     """
     db = next(get_db())
+    try:
+        job = _start_job(db, csv_path, parse_workers)
+        import_job(db, job)
+    finally:
+        db.close()
+
+
+def import_job(db: Session, job: DBImportJob) -> None:
+    """
+    Search and store the unfinished titles of a journaled import job.
+
+    Args:
+        db: Database session
+        job: Import job to work through
+    """
+    limiter = TokenBucket.from_env()
+    index = get_near_duplicate_index()
+    # The importer is the embedding index's only writer
+    subscribe_embedding_index()
     try:
         total_papers = 0
         stored_papers = 0
-        not_found_papers = []
 
-        for paper_info in read_papers_from_csv(csv_path):
-            total_papers += 1
-            title = paper_info["Title"]
-            print(f"\nProcessing paper {total_papers}: {title}")
+        for items in unfinished_items(db, job):
+            # Check the whole chunk against the database with one query
+            existing_ids = find_paper_ids(db, [item.normalized_title for item in items])
+            for item in items:
+                total_papers += 1
+                title = item.title
+                print(f"\nProcessing paper {total_papers}: {title}")
 
-            # Check if paper already exists in database
-            existing_paper = check_paper_exists(db, title)
-            if existing_paper:
-                print(f"✗ Paper already exists in database: {title}")
-                continue
+                # Check if paper already exists in database
+                existing_id = existing_ids.get(item.normalized_title)
+                if existing_id is not None:
+                    print(f"✗ Paper already exists in database: {title}")
+                    _record(db, item, SKIPPED, paper_id=existing_id)
+                    continue
 
-            try:
-                # Search for paper
-                paper = search_paper(title)
-            except Exception as e:
-                print(f"✗ Error searching for paper: {e}")
-                not_found_papers.append((title, "Search error"))
-                continue
+                attempts = item.attempts + 1
+                try:
+                    # Wait for the API quota instead of sleeping a fixed interval
+                    paper = search_paper(title, limiter=limiter)
+                except Exception as e:
+                    print(f"✗ Error searching for paper: {e}")
+                    _record(
+                        db, item, ERROR, attempts=attempts, error=f"Search error: {e}"
+                    )
+                    continue
+
+                if not paper:
+                    print("✗ Paper not found in Semantic Scholar")
+                    _record(db, item, NOT_FOUND, attempts=attempts)
+                    continue
 
-            # Sleep for 10 seconds to avoid hitting API rate limits
-            print("Waiting 10 seconds before next request...")
-            time.sleep(5)
+                _record(db, item, SEARCHED, attempts=attempts)
+                duplicate_id = confirmed_duplicate(db, index, paper)
+                if duplicate_id is not None:
+                    print(f"✗ Paper is a duplicate of paper {duplicate_id}: {title}")
+                    _record(db, item, SKIPPED, paper_id=duplicate_id)
+                    continue
 
-            if paper:
                 try:
                     db_paper = store_paper(db, paper)
-                    stored_papers += 1
-                    print(f"✓ Stored paper with ID: {db_paper.id}")
-                    print(
-                        f"  Authors: {', '.join(author.name for author in db_paper.authors)}"
-                    )
                 except Exception as e:
+                    db.rollback()
                     print(f"✗ Error storing paper: {e}")
-                    not_found_papers.append((title, "Storage error"))
-            else:
-                print("✗ Paper not found in Semantic Scholar")
-                not_found_papers.append((title, "Not found"))
+                    _record(db, item, ERROR, error=f"Storage error: {e}")
+                    continue
+
+                stored_papers += 1
+                _record(db, item, STORED, paper_id=db_paper.id)
+                if index is not None:
+                    index.add(db_paper.id, db_paper.title, db_paper.abstract)
+                print(f"✓ Stored paper with ID: {db_paper.id}")
+                print(
+                    f"  Authors: {', '.join(author.name for author in paper.authors)}"
+                )
+
+        counts = finish_import_job(db, job)
 
         # Print summary
         print("\nImport Summary:")
         print(f"Total papers processed: {total_papers}")
         print(f"Successfully stored: {stored_papers}")
-        print(f"Failed: {len(not_found_papers)}")
-
-        if not_found_papers:
-            # Write failed paper titles to failed_papers.csv with a column "Title"
-            csv_path = Path(__file__).parent.parent / "data" / "failed_papers.csv"
-            with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=["Title"])
-                writer.writeheader()
-                for title, _ in not_found_papers:
-                    writer.writerow({"Title": title})
-            print(f"\nFailed papers have been written to {csv_path}")
+        print(f"Job {job.id} ({job.status}): {_format_counts(counts)}")
+        _print_cache_stats()
+
+        failed = failed_titles(db, job)
+        if failed:
+            _write_failed_papers(failed)
 
+    finally:
+        if index is not None:
+            index.save()
+
+
+def _start_job(db: Session, csv_path: str, parse_workers: int = 0) -> DBImportJob:
+    """
+    Resume the unfinished import job for a CSV or start a new one.
+
+    Files are keyed by their resolved path. Stdin is spooled to a temporary file
+    and keyed by a hash of its content, so piping the same data again resumes
+    its job while different data starts a new one.
+    """
+    if csv_path != "-":
+        return start_import_job(
+            db,
+            str(Path(csv_path).resolve()),
+            read_title_batches(csv_path, workers=parse_workers),
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stdin.csv")
+        digest = hashlib.sha256()
+        with open(path, "wb") as f:
+            for chunk in iter(lambda: sys.stdin.buffer.read(1 << 20), b""):
+                digest.update(chunk)
+                f.write(chunk)
+        return start_import_job(
+            db,
+            f"<stdin:{digest.hexdigest()}>",
+            read_title_batches(path, workers=parse_workers),
+        )
+
+
+def _record(db: Session, item: Row, state: str, **values) -> None:
+    """Checkpoint the new state of a single journal item."""
+    record_states(db, [{"id": item.id, "state": state, **values}])
+
+
+def _format_counts(counts: Dict[str, int]) -> str:
+    return ", ".join(f"{count} {state}" for state, count in sorted(counts.items()))
+
+
+def _print_cache_stats() -> None:
+    """Print search cache counters so re-runs can confirm they skipped the API."""
+    cache = get_search_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"Search cache: {stats['hits']} hits, {stats['negative_hits']} "
+            f"negative hits, {stats['misses']} misses"
+        )
+
+
+def _write_failed_papers(titles: List[str]) -> None:
+    """
+    Write failed paper titles to failed_papers.csv with a column "Title".
+
+    The journal is the source of truth for failures; the CSV is kept for
+    inspection and for tools that read it.
+
+    Args:
+        titles: Titles that were not found or failed
+    """
+    with open(FAILED_PAPERS_PATH, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=["Title"])
+        writer.writeheader()
+        for title in titles:
+            writer.writerow({"Title": title})
+    print(f"\nFailed papers have been written to {FAILED_PAPERS_PATH}")
+
+
+@dataclass
+class ImportStats:
+    """Progress counters for a pipelined import."""
+
+    total: int = 0
+    skipped: int = 0
+    searched: int = 0
+    stored: int = 0
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def search_rate(self) -> float:
+        """Remote searches completed per second."""
+        elapsed = self.elapsed
+        return self.searched / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        return (
+            f"[{self.elapsed:7.1f}s] read {self.total}, skipped {self.skipped}, "
+            f"searched {self.searched} ({self.search_rate:.2f}/s), "
+            f"stored {self.stored}, failed {len(self.failed)}"
+        )
+
+
+# Marks the end of a queue in the import pipeline
+_DONE = object()
+
+
+def _search_worker(
+    items: "queue.Queue", results: "queue.Queue", limiter: TokenBucket
+) -> None:
+    """
+    Search stage: take journal items and search their titles, sharing the rate
+    limiter.
+    """
+    while True:
+        item = items.get()
+        if item is _DONE:
+            return
+        try:
+            results.put((item, search_paper(item.title, limiter=limiter), None))
+        except Exception as e:
+            results.put((item, None, e))
+
+
+def _store_batch(
+    db,
+    batch: List[Tuple[Row, Paper]],
+    stats: ImportStats,
+    index: Optional[NearDuplicateIndex] = None,
+    author_cache: Optional[AuthorKeyCache] = None,
+) -> None:
+    """
+    Store a batch in one transaction, falling back to one paper at a time.
+    Papers the near-duplicate index confirms are already stored are skipped.
+    """
+    updates = []
+    unique = []
+    for item, paper in batch:
+        duplicate_id = confirmed_duplicate(db, index, paper)
+        if duplicate_id is None:
+            unique.append((item, paper))
+            continue
+        stats.skipped += 1
+        updates.append({"id": item.id, "state": SKIPPED, "paper_id": duplicate_id})
+    batch = unique
+    if not batch:
+        record_states(db, updates)
+        return
+
+    try:
+        ids = store_papers_bulk(db, [paper for _, paper in batch], author_cache)
+    except Exception as e:
+        db.rollback()
+        if author_cache is not None:
+            author_cache.clear()
+        print(f"✗ Error storing batch of {len(batch)} papers, retrying one by one: {e}")
+    else:
+        for (item, paper), paper_id in zip(batch, ids):
+            if paper_id is None:
+                stats.failed.append((item.title, "Storage error"))
+                updates.append(
+                    {"id": item.id, "state": ERROR, "error": "Storage error"}
+                )
+            else:
+                stats.stored += 1
+                updates.append({"id": item.id, "state": STORED, "paper_id": paper_id})
+                if index is not None:
+                    index.add(paper_id, paper.title, paper.abstract)
+        record_states(db, updates)
+        return
+
+    for item, paper in batch:
+        try:
+            db_paper = store_paper(db, paper)
+        except Exception as e:
+            db.rollback()
+            print(f"✗ Error storing paper {item.title!r}: {e}")
+            stats.failed.append((item.title, "Storage error"))
+            updates.append(
+                {"id": item.id, "state": ERROR, "error": f"Storage error: {e}"}
+            )
+            continue
+        stats.stored += 1
+        updates.append({"id": item.id, "state": STORED, "paper_id": db_paper.id})
+        if index is not None:
+            index.add(db_paper.id, db_paper.title, db_paper.abstract)
+    record_states(db, updates)
+
+
+def _record_write_error(
+    db: Session,
+    updates: List[dict],
+    batch: List[Tuple[Row, Paper]],
+    stats: ImportStats,
+    error: Exception,
+) -> None:
+    """
+    Journal the results of a batch the writer failed on, marking its found
+    papers as errors so they are searched again when the import resumes;
+    ``store_paper`` dedupes any that were stored before the failure.
+    """
+    failed = {item.id for item, _ in batch}
+    stats.failed.extend((item.title, "Storage error") for item, _ in batch)
+    updates = [
+        (
+            {"id": update["id"], "state": ERROR, "error": f"Storage error: {error}"}
+            if update["id"] in failed
+            else update
+        )
+        for update in updates
+    ]
+    try:
+        record_states(db, updates)
+    except Exception as e:
+        # The items stay unfinished in the journal and are retried on resume
+        db.rollback()
+        print(f"✗ Error journaling {len(updates)} results: {e}")
+
+
+def _write_worker(
+    results: "queue.Queue",
+    stats: ImportStats,
+    batch_size: int,
+    report_every: float,
+    index: Optional[NearDuplicateIndex] = None,
+) -> None:
+    """Writer stage: drain search results in batches, journal them and store them."""
+    db = next(get_db())
+    author_cache = AuthorKeyCache()
+    last_report = time.monotonic()
+    try:
+        done = False
+        while not done:
+            batch: List[Tuple[Row, Paper]] = []
+            updates: List[dict] = []
+            result = results.get()
+            while True:
+                if result is _DONE:
+                    done = True
+                    break
+                item, paper, error = result
+                stats.searched += 1
+                attempts = item.attempts + 1
+                if error is not None:
+                    print(f"✗ Error searching for paper {item.title!r}: {error}")
+                    stats.failed.append((item.title, "Search error"))
+                    updates.append(
+                        {
+                            "id": item.id,
+                            "state": ERROR,
+                            "attempts": attempts,
+                            "error": f"Search error: {error}",
+                        }
+                    )
+                elif paper is None:
+                    stats.failed.append((item.title, "Not found"))
+                    updates.append(
+                        {"id": item.id, "state": NOT_FOUND, "attempts": attempts}
+                    )
+                else:
+                    batch.append((item, paper))
+                    updates.append(
+                        {"id": item.id, "state": SEARCHED, "attempts": attempts}
+                    )
+                if len(batch) >= batch_size:
+                    break
+                try:
+                    result = results.get_nowait()
+                except queue.Empty:
+                    break
+
+            try:
+                if updates:
+                    record_states(db, updates)
+                if batch:
+                    _store_batch(db, batch, stats, index, author_cache)
+            except Exception as e:
+                # Keep draining, or the searchers block on the full results queue
+                db.rollback()
+                author_cache.clear()
+                print(f"✗ Error writing {len(updates)} results: {e}")
+                _record_write_error(db, updates, batch, stats, e)
+
+            if time.monotonic() - last_report >= report_every:
+                print(stats.report())
+                last_report = time.monotonic()
+    finally:
+        db.close()
+
+
+def import_papers_pipelined(
+    csv_path: str,
+    workers: int = 4,
+    limiter: Optional[TokenBucket] = None,
+    batch_size: int = 50,
+    report_every: float = 10.0,
+    parse_workers: int = 0,
+) -> ImportStats:
+    """
+    Import papers from a CSV file using a concurrent, rate-limited pipeline.
+
+    The CSV's titles are journaled first; running the import again for the same
+    CSV resumes with the titles that were not finished. Titles already in the
+    database are skipped by the reader. The remaining titles are searched by a
+    bounded pool of workers that share a token bucket, so the remote API is
+    kept at its quota instead of idling behind a fixed sleep. A single writer
+    stores results in batches as they arrive, skipping papers the
+    near-duplicate index confirms are already stored.
+
+    Args:
+        csv_path: Path to the CSV file, optionally compressed, or "-" for stdin
+        workers: Number of concurrent search workers
+        limiter: Rate limiter shared by the workers, defaults to the configured quota
+        batch_size: Maximum number of papers stored per writer batch
+        report_every: Seconds between progress reports
+        parse_workers: Processes used to normalize titles while reading the CSV
+
+    Returns:
+        ImportStats: Final import counters
+    """
+    limiter = limiter or TokenBucket.from_env()
+    index = get_near_duplicate_index()
+    # The importer is the embedding index's only writer
+    subscribe_embedding_index()
+    stats = ImportStats()
+    items: queue.Queue = queue.Queue(maxsize=workers * 2)
+    results: queue.Queue = queue.Queue(maxsize=batch_size * 2)
+
+    db = next(get_db())
+    try:
+        job = _start_job(db, csv_path, parse_workers)
+
+        searchers = [
+            threading.Thread(
+                target=_search_worker, args=(items, results, limiter), daemon=True
+            )
+            for _ in range(workers)
+        ]
+        writer = threading.Thread(
+            target=_write_worker,
+            args=(results, stats, batch_size, report_every, index),
+            daemon=True,
+        )
+        for thread in searchers + [writer]:
+            thread.start()
+
+        try:
+            for chunk in unfinished_items(db, job):
+                existing_ids = find_paper_ids(
+                    db, [item.normalized_title for item in chunk]
+                )
+                skipped = []
+                for item in chunk:
+                    stats.total += 1
+                    paper_id = existing_ids.get(item.normalized_title)
+                    if paper_id is not None:
+                        stats.skipped += 1
+                        skipped.append(
+                            {"id": item.id, "state": SKIPPED, "paper_id": paper_id}
+                        )
+                        continue
+                    items.put(item)
+                if skipped:
+                    record_states(db, skipped)
+        finally:
+            for _ in searchers:
+                items.put(_DONE)
+            for thread in searchers:
+                thread.join()
+            results.put(_DONE)
+            writer.join()
+            if index is not None:
+                index.save()
+
+        counts = finish_import_job(db, job)
+        failed = failed_titles(db, job)
     finally:
         db.close()
 
+    print("\nImport Summary:")
+    print(stats.report())
+    print(f"Job {job.id} ({job.status}): {_format_counts(counts)}")
+    _print_cache_stats()
+    if failed:
+        _write_failed_papers(failed)
+
+    return stats
+
 
 if __name__ == "__main__":
-    # Get the absolute path to the CSV file
-    csv_path = Path(__file__).parent.parent / "data" / "dl4h_papers.csv"
-    import_papers(str(csv_path))
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "csv_path",
+        nargs="?",
+        default=str(Path(__file__).parent.parent / "data" / "dl4h_papers.csv"),
+        help=(
+            "CSV file with a Title column, optionally .gz/.zst compressed, "
+            "or - for stdin"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Run the pipelined importer with this many search workers",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Normalize titles in this many processes while reading the CSV",
+    )
+    args = parser.parse_args()
+
+    if args.workers:
+        import_papers_pipelined(
+            args.csv_path, workers=args.workers, parse_workers=args.parse_workers
+        )
+    else:
+        import_papers(args.csv_path, parse_workers=args.parse_workers)
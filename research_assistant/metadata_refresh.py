@@ -0,0 +1,298 @@
+"""
+Incremental refresh of citation counts and open access status.
+
+``citation_count``, ``reference_count`` and ``is_open_access`` change after a
+paper is imported. The refresh job picks papers whose metadata is older than a
+freshness SLA, oldest first, fetches them by Semantic Scholar id through the
+batch endpoint (up to 500 ids per request, a few requests in flight) and
+writes back only the rows and fields that changed, grouped into one
+``UPDATE ... FROM (VALUES ...)`` per set of changed fields.
+
+Every fetched paper has its ``metadata_refreshed_at`` stamped whether it
+changed or not, so it is not picked again until it goes stale; ``updated_at``
+is bumped only for changed papers, so their API ETags change and no others do.
+Cached API responses keep the old counts until they expire.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, Integer, func, or_, select, update, values
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import column
+
+from research_assistant.db.config import get_db
+from research_assistant.db.models import DBPaper
+from research_assistant.db.service import BULK_BATCH_SIZE, _chunks
+from research_assistant.rate_limit import TokenBucket
+from research_assistant.semantic_scholar_client import (
+    BATCH_LIMIT,
+    AsyncSemanticScholarClient,
+)
+
+logger = logging.getLogger(__name__)
+
+# Refreshed columns and the Graph API fields they are read from
+REFRESH_FIELDS = {
+    "citation_count": "citationCount",
+    "reference_count": "referenceCount",
+    "is_open_access": "isOpenAccess",
+}
+_COLUMN_TYPES = {
+    "citation_count": Integer,
+    "reference_count": Integer,
+    "is_open_access": Boolean,
+}
+# Papers whose metadata was fetched longer ago than this are stale
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+
+@dataclass
+class RefreshStats:
+    """Counts of a refresh run."""
+
+    checked: int = 0
+    updated: int = 0
+    not_found: int = 0
+
+
+def _stale_condition(cutoff: datetime):
+    return DBPaper.semantic_scholar_id.is_not(None) & or_(
+        DBPaper.metadata_refreshed_at.is_(None),
+        DBPaper.metadata_refreshed_at < cutoff,
+    )
+
+
+def select_stale_papers(
+    db: Session, cutoff: datetime, limit: int
+) -> List[Tuple[int, str, Optional[int], Optional[int], Optional[bool]]]:
+    """
+    Return the papers most overdue for a refresh, never refreshed ones first.
+
+    Returns:
+        List[Tuple]: ``(id, semantic_scholar_id, citation_count,
+        reference_count, is_open_access)`` rows
+    """
+    return [
+        tuple(row)
+        for row in db.execute(
+            select(
+                DBPaper.id,
+                DBPaper.semantic_scholar_id,
+                DBPaper.citation_count,
+                DBPaper.reference_count,
+                DBPaper.is_open_access,
+            )
+            .where(_stale_condition(cutoff))
+            .order_by(DBPaper.metadata_refreshed_at.nulls_first(), DBPaper.id)
+            .limit(limit)
+        )
+    ]
+
+
+def staleness(db: Session, max_age: timedelta = DEFAULT_MAX_AGE) -> Tuple[int, int]:
+    """
+    Return how many papers violate the freshness SLA and the age of the
+    oldest refresh in seconds (0 when every paper is fresh).
+    """
+    now = datetime.utcnow()
+    stale, oldest = db.execute(
+        select(
+            func.count(),
+            func.min(func.coalesce(DBPaper.metadata_refreshed_at, DBPaper.created_at)),
+        ).where(_stale_condition(now - max_age))
+    ).one()
+    return stale, int((now - oldest).total_seconds()) if oldest else 0
+
+
+def _changed_fields(row: Sequence, record: dict) -> Dict[str, object]:
+    current = dict(zip(REFRESH_FIELDS, row[2:]))
+    return {
+        name: record.get(field)
+        for name, field in REFRESH_FIELDS.items()
+        if record.get(field) is not None and record.get(field) != current[name]
+    }
+
+
+def apply_updates(db: Session, changes: Dict[int, Dict[str, object]]) -> None:
+    """
+    Write changed fields back, one statement per set of changed fields.
+
+    PostgreSQL gets ``UPDATE papers ... FROM (VALUES ...)``; other databases
+    an executemany of primary key updates.
+
+    Args:
+        db: Database session
+        changes: Changed field values by paper id
+    """
+    groups: Dict[Tuple[str, ...], List[tuple]] = {}
+    for paper_id, fields in changes.items():
+        names = tuple(sorted(fields))
+        groups.setdefault(names, []).append(
+            (paper_id, *(fields[name] for name in names))
+        )
+
+    table = DBPaper.__table__
+    now = datetime.utcnow()
+    for names, rows in groups.items():
+        for chunk in _chunks(rows, BULK_BATCH_SIZE):
+            if db.get_bind().dialect.name == "postgresql":
+                changed = values(
+                    column("id", Integer),
+                    *(column(name, _COLUMN_TYPES[name]) for name in names),
+                    name="changed",
+                ).data(list(chunk))
+                db.execute(
+                    update(table)
+                    .where(table.c.id == changed.c.id)
+                    .values(
+                        updated_at=now,
+                        **{name: changed.c[name] for name in names},
+                    )
+                )
+            else:
+                db.execute(
+                    update(DBPaper),
+                    [
+                        {"id": row[0], "updated_at": now, **dict(zip(names, row[1:]))}
+                        for row in chunk
+                    ],
+                )
+
+
+async def refresh_metadata(
+    db: Session,
+    client: Optional[AsyncSemanticScholarClient] = None,
+    max_age: timedelta = DEFAULT_MAX_AGE,
+    limit: Optional[int] = None,
+    batch_size: int = BATCH_LIMIT,
+    max_concurrency: int = 4,
+) -> RefreshStats:
+    """
+    Refresh the metadata of stale papers, oldest first.
+
+    Each round of ``batch_size * max_concurrency`` papers is committed as it
+    completes, so an interrupted run keeps its progress.
+
+    Args:
+        db: Database session
+        client: Client to use; if omitted, one limited to the configured API
+            quota is created and closed
+        max_age: Refresh papers last refreshed longer ago than this
+        limit: Refresh at most this many papers, e.g. to stay within an API
+            quota; all stale papers if omitted
+        batch_size: Papers per batch request, at most ``BATCH_LIMIT``
+        max_concurrency: Batch requests in flight
+
+    Returns:
+        RefreshStats: Counts of the run
+    """
+    owns_client = client is None
+    if owns_client:
+        client = AsyncSemanticScholarClient(
+            max_concurrency=max_concurrency, limiter=TokenBucket.from_env()
+        )
+
+    stats = RefreshStats()
+    cutoff = datetime.utcnow() - max_age
+    try:
+        while limit is None or stats.checked < limit:
+            round_size = batch_size * max_concurrency
+            if limit is not None:
+                round_size = min(round_size, limit - stats.checked)
+            rows = select_stale_papers(db, cutoff, round_size)
+            if not rows:
+                break
+
+            batches = list(_chunks(rows, batch_size))
+            results = await asyncio.gather(
+                *(
+                    client.get_papers(
+                        [row[1] for row in batch],
+                        fields=list(REFRESH_FIELDS.values()),
+                    )
+                    for batch in batches
+                )
+            )
+
+            changes = {}
+            for batch, records in zip(batches, results):
+                for row, record in zip(batch, records):
+                    if record is None:
+                        stats.not_found += 1
+                    elif fields := _changed_fields(row, record):
+                        changes[row[0]] = fields
+            apply_updates(db, changes)
+            db.execute(
+                update(DBPaper)
+                .where(DBPaper.id.in_([row[0] for row in rows]))
+                # Keep updated_at, and with it the ETags, of unchanged papers
+                .values(
+                    metadata_refreshed_at=datetime.utcnow(),
+                    updated_at=DBPaper.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+            stats.checked += len(rows)
+            stats.updated += len(changes)
+            logger.info(
+                f"Refreshed {stats.checked} papers, {stats.updated} changed, "
+                f"{stats.not_found} not found"
+            )
+    finally:
+        if owns_client:
+            await client.aclose()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Refresh citation counts and open access status of stale papers"
+    )
+    parser.add_argument(
+        "--max-age-hours",
+        type=float,
+        default=DEFAULT_MAX_AGE.total_seconds() / 3600,
+        help="Freshness SLA: refresh papers last refreshed longer ago than this",
+    )
+    parser.add_argument("--limit", type=int, help="Papers to refresh per run")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="Keep running, starting a new run every this many seconds",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    max_age = timedelta(hours=args.max_age_hours)
+    while True:
+        started = time.monotonic()
+        db = next(get_db())
+        try:
+            stats = asyncio.run(
+                refresh_metadata(
+                    db,
+                    max_age=max_age,
+                    limit=args.limit,
+                    max_concurrency=args.concurrency,
+                )
+            )
+            stale, oldest = staleness(db, max_age)
+        finally:
+            db.close()
+        print(
+            f"Checked {stats.checked} papers: {stats.updated} changed, "
+            f"{stats.not_found} not found. {stale} papers still stale, oldest "
+            f"refreshed {oldest / 3600:.1f}h ago"
+        )
+        if args.interval is None:
+            break
+        time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
@@ -2,11 +2,11 @@
 Models for representing academic papers and related entities.
 """
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Author:
     """Represents an author of a paper."""
 
@@ -14,10 +14,13 @@ class Author:
     affiliations: Optional[List[str]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Paper:
     """
     Represents an academic paper with its metadata.
+
+    Slotted to keep per-instance overhead down; bulk workloads should hold
+    papers in a :class:`~research_assistant.paper_batch.PaperBatch` instead.
     """
 
     title: str
@@ -64,6 +67,24 @@ class Paper:
             semantic_scholar_id=getattr(paper, "paperId", None),
         )
 
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable dict of the paper and its authors."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Paper":
+        """
+        Create a Paper instance from a dict produced by :meth:`to_dict`.
+
+        Args:
+            data: Paper fields
+
+        Returns:
+            Paper: New Paper instance
+        """
+        authors = [Author(**author) for author in data.get("authors") or []]
+        return cls(**{**data, "authors": authors})
+
     def __str__(self) -> str:
         """Return a human-readable string representation of the paper."""
         authors_str = ", ".join(author.name for author in self.authors)
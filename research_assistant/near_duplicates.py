@@ -0,0 +1,482 @@
+"""
+Near-duplicate detection for papers with MinHash and locality-sensitive hashing.
+
+Each paper's title is reduced to its set of character trigrams and its abstract
+to its set of word trigrams. A MinHash signature of each set estimates Jaccard
+similarity, and splitting the signatures into bands that are hashed into
+buckets (LSH) means only papers sharing a bucket are ever compared. This finds
+preprint/published pairs and titles that differ in punctuation or a typo
+without comparing every pair of papers.
+"""
+
+import os
+import threading
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from research_assistant.db.config import get_db
+from research_assistant.db.models import DBPaper
+from research_assistant.normalization import normalize_author_name, normalize_title
+from research_assistant.snapshot import Snapshot
+from research_assistant.title_matching import title_ngrams
+
+NUM_PERM = 128
+# 32 bands of 4 rows: pairs with Jaccard similarity 0.7 share a bucket with
+# probability > 0.999, pairs at 0.3 only ~20% of the time
+NUM_BANDS = 32
+DUPLICATE_THRESHOLD = 0.7
+# Distinct papers often share most of a title ("Attention Is Not All You Need"),
+# so a match only stands in for a paper at this similarity and with the same
+# year or a shared author
+CONFIRMED_DUPLICATE_THRESHOLD = 0.95
+
+# Mersenne prime for the universal hash family; signatures fit in 32 bits
+_PRIME = (1 << 31) - 1
+# Signature of an empty shingle set, larger than any hash value
+_EMPTY = _PRIME
+
+FIELDS = ("title", "abstract")
+
+
+def abstract_shingles(abstract: str) -> FrozenSet[str]:
+    """
+    Word trigrams of a normalized abstract.
+
+    Args:
+        abstract: Paper abstract
+
+    Returns:
+        FrozenSet[str]: Distinct word trigrams
+    """
+    words = normalize_title(abstract).split()
+    if len(words) < 3:
+        return frozenset((" ".join(words),)) if words else frozenset()
+    return frozenset(map(" ".join, zip(words, words[1:], words[2:])))
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index over paper titles and abstracts.
+
+    Two papers are near-duplicates if the estimated Jaccard similarity of
+    either their titles or their abstracts reaches the threshold. Papers can be
+    added incrementally; the index is saved to and loaded from a ``.npz`` file.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = NUM_PERM,
+        num_bands: int = NUM_BANDS,
+        threshold: float = DUPLICATE_THRESHOLD,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            num_perm: Number of hash functions in each signature
+            num_bands: Number of LSH bands, must divide num_perm
+            threshold: Minimum estimated Jaccard similarity of a near-duplicate
+            seed: Seed of the hash functions; indexes are only comparable with
+                the same seed
+        """
+        if num_perm % num_bands:
+            raise ValueError(
+                f"num_bands ({num_bands}) must divide num_perm ({num_perm})"
+            )
+
+        self.num_perm = num_perm
+        self.num_bands = num_bands
+        self.threshold = threshold
+        self.seed = seed
+        self.path: Optional[str] = None
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+        self.ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+        # Signature matrices, grown by doubling so inserts are amortized O(1)
+        self._matrices: Dict[str, np.ndarray] = {
+            field: np.empty((64, num_perm), dtype=np.uint32) for field in FIELDS
+        }
+        self._buckets: Dict[str, List[Dict[bytes, List[int]]]] = {
+            field: [defaultdict(list) for _ in range(num_bands)] for field in FIELDS
+        }
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, paper_id: int) -> bool:
+        return paper_id in self._positions
+
+    def signature(self, shingles: Iterable[str]) -> np.ndarray:
+        """
+        MinHash signature of a shingle set.
+
+        Args:
+            shingles: Distinct shingles
+
+        Returns:
+            np.ndarray: ``num_perm`` uint32 minimum hash values
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+        )
+        if not len(hashes):
+            return np.full(self.num_perm, _EMPTY, dtype=np.uint32)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _signatures(
+        self, title: Optional[str], abstract: Optional[str]
+    ) -> Dict[str, np.ndarray]:
+        return {
+            "title": self.signature(title_ngrams(title) if title else ()),
+            "abstract": self.signature(abstract_shingles(abstract) if abstract else ()),
+        }
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in np.split(signature, self.num_bands)]
+
+    def add(self, paper_id: int, title: str, abstract: Optional[str] = None) -> None:
+        """
+        Add a paper to the index. Papers already indexed are left unchanged.
+
+        Args:
+            paper_id: Database id of the paper
+            title: Paper title
+            abstract: Paper abstract, if known
+        """
+        signatures = self._signatures(title, abstract)
+        with self._lock:
+            self._add(paper_id, signatures)
+
+    def add_many(self, papers: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """
+        Add ``(paper_id, title, abstract)`` rows to the index.
+
+        Args:
+            papers: Rows to index
+        """
+        for paper_id, title, abstract in papers:
+            self.add(paper_id, title, abstract)
+
+    def _add(self, paper_id: int, signatures: Dict[str, np.ndarray]) -> None:
+        if paper_id in self._positions:
+            return
+        position = len(self.ids)
+        self.ids.append(paper_id)
+        self._positions[paper_id] = position
+        for field, signature in signatures.items():
+            matrix = self._matrices[field]
+            if position == len(matrix):
+                matrix = self._matrices[field] = np.vstack(
+                    [matrix, np.empty_like(matrix)]
+                )
+            matrix[position] = signature
+            if signature[0] == _EMPTY:
+                continue
+            for bucket, key in zip(self._buckets[field], self._band_keys(signature)):
+                bucket[key].append(position)
+
+    def _query(
+        self, signatures: Dict[str, np.ndarray], exclude: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        best: Dict[int, float] = {}
+        for field, signature in signatures.items():
+            if signature[0] == _EMPTY:
+                continue
+            candidates: Set[int] = set()
+            for bucket, key in zip(self._buckets[field], self._band_keys(signature)):
+                candidates.update(bucket.get(key, ()))
+            if not candidates:
+                continue
+            positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            matrix = self._matrices[field]
+            similarities = (matrix[positions] == signature).mean(axis=1)
+            for position, similarity in zip(positions.tolist(), similarities.tolist()):
+                if similarity > best.get(position, -1.0):
+                    best[position] = similarity
+
+        matches = [
+            (self.ids[position], similarity)
+            for position, similarity in best.items()
+            if similarity >= self.threshold and self.ids[position] != exclude
+        ]
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def query(
+        self, title: Optional[str], abstract: Optional[str] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find indexed papers that are near-duplicates of a title and abstract.
+
+        Args:
+            title: Title to look for
+            abstract: Abstract to look for, if known
+
+        Returns:
+            List[Tuple[int, float]]: Paper ids and estimated similarities, most
+            similar first
+        """
+        signatures = self._signatures(title, abstract)
+        with self._lock:
+            return self._query(signatures)
+
+    def find_near_duplicates(self, paper) -> List[Tuple[int, float]]:
+        """
+        Find indexed near-duplicates of a paper, excluding the paper itself.
+
+        Args:
+            paper: A DBPaper or Paper
+
+        Returns:
+            List[Tuple[int, float]]: Paper ids and estimated similarities, most
+            similar first
+        """
+        signatures = self._signatures(paper.title, paper.abstract)
+        with self._lock:
+            return self._query(signatures, exclude=getattr(paper, "id", None))
+
+    def duplicate_groups(self) -> List[List[int]]:
+        """
+        Group every indexed paper with its near-duplicates.
+
+        Returns:
+            List[List[int]]: Groups of two or more paper ids, each sorted, largest
+            groups first
+        """
+        with self._lock:
+            parents = list(range(len(self.ids)))
+
+            def find(position: int) -> int:
+                while parents[position] != position:
+                    parents[position] = parents[parents[position]]
+                    position = parents[position]
+                return position
+
+            for position, paper_id in enumerate(self.ids):
+                signatures = {
+                    field: self._matrices[field][position] for field in FIELDS
+                }
+                for duplicate_id, _ in self._query(signatures, exclude=paper_id):
+                    root, other = find(position), find(self._positions[duplicate_id])
+                    if root != other:
+                        parents[max(root, other)] = min(root, other)
+
+            groups: Dict[int, List[int]] = defaultdict(list)
+            for position, paper_id in enumerate(self.ids):
+                groups[find(position)].append(paper_id)
+
+        return sorted(
+            (sorted(group) for group in groups.values() if len(group) > 1),
+            key=lambda group: (-len(group), group[0]),
+        )
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write the index to a ``.npz`` file.
+
+        Args:
+            path: Destination, defaults to the path the index was loaded from
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the index to")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            count = len(self.ids)
+            # Write through a file object so numpy does not append ".npz"
+            with open(path, "wb") as f:
+                np.savez(
+                    f,
+                    ids=np.asarray(self.ids, dtype=np.int64),
+                    title=self._matrices["title"][:count],
+                    abstract=self._matrices["abstract"][:count],
+                    params=np.asarray(
+                        [self.num_perm, self.num_bands, self.seed], dtype=np.int64
+                    ),
+                    threshold=np.asarray(self.threshold),
+                )
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str) -> "NearDuplicateIndex":
+        """
+        Read an index written by :meth:`save`.
+
+        Args:
+            path: Index file
+
+        Returns:
+            NearDuplicateIndex: The loaded index, with buckets rebuilt
+        """
+        with np.load(path) as data:
+            num_perm, num_bands, seed = data["params"].tolist()
+            index = cls(num_perm, num_bands, float(data["threshold"]), seed)
+            for position, paper_id in enumerate(data["ids"].tolist()):
+                index._add(paper_id, {field: data[field][position] for field in FIELDS})
+        index.path = path
+        return index
+
+
+def build_index(db: Session, chunk_size: int = 1000, **kwargs) -> NearDuplicateIndex:
+    """
+    Index every paper in the database.
+
+    Args:
+        db: Database session
+        chunk_size: Rows fetched per round trip
+        **kwargs: NearDuplicateIndex options
+
+    Returns:
+        NearDuplicateIndex: Index of all papers
+    """
+    index = NearDuplicateIndex(**kwargs)
+    rows = db.execute(
+        select(DBPaper.id, DBPaper.title, DBPaper.abstract)
+        .order_by(DBPaper.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    index.add_many(rows)
+    return index
+
+
+def confirmed_duplicate(
+    db: Session, index: Optional[NearDuplicateIndex], paper
+) -> Optional[int]:
+    """
+    Find a stored paper that is the same work as a paper found by a search.
+
+    Candidates flagged by the index are only confirmed if their normalized
+    titles are equal, or if they are at least ``CONFIRMED_DUPLICATE_THRESHOLD``
+    similar and share the paper's year or one of its authors.
+
+    Args:
+        db: Database session
+        index: Near-duplicate index, or None if disabled
+        paper: A Paper with the metadata returned by the search
+
+    Returns:
+        Optional[int]: Id of the stored paper, if one is confirmed
+    """
+    if index is None:
+        return None
+    matches = index.query(paper.title, paper.abstract)
+    if not matches:
+        return None
+
+    stored = {
+        candidate.id: candidate
+        for candidate in db.scalars(
+            select(DBPaper).where(DBPaper.id.in_([paper_id for paper_id, _ in matches]))
+        )
+    }
+    normalized_title = normalize_title(paper.title)
+    author_names = {normalize_author_name(author.name) for author in paper.authors}
+    for paper_id, similarity in matches:
+        candidate = stored.get(paper_id)
+        if candidate is None:
+            continue
+        if candidate.normalized_title == normalized_title:
+            return paper_id
+        if similarity < CONFIRMED_DUPLICATE_THRESHOLD:
+            continue
+        same_year = paper.year is not None and candidate.year == paper.year
+        shared_author = author_names & {a.normalized_name for a in candidate.authors}
+        if same_year or shared_author:
+            return paper_id
+    return None
+
+
+def dedupe_report(
+    db: Session, index: Optional[NearDuplicateIndex] = None
+) -> List[List[DBPaper]]:
+    """
+    Find groups of near-duplicate papers across the whole papers table.
+
+    Args:
+        db: Database session
+        index: Index to use, built from the database if not given
+
+    Returns:
+        List[List[DBPaper]]: Groups of near-duplicate papers, largest first
+    """
+    index = index or build_index(db)
+    groups = index.duplicate_groups()
+    ids = [paper_id for group in groups for paper_id in group]
+    papers = {}
+    if ids:
+        papers = {
+            paper.id: paper
+            for paper in db.scalars(select(DBPaper).where(DBPaper.id.in_(ids)))
+        }
+    return [
+        [papers[paper_id] for paper_id in group if paper_id in papers]
+        for group in groups
+    ]
+
+
+@lru_cache(maxsize=1)
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """
+    Return the process-wide index configured by ``NEAR_DUPLICATE_INDEX_PATH``.
+
+    The index is loaded from that file, or built from the database and saved
+    there on first use.
+
+    Returns:
+        Optional[NearDuplicateIndex]: Shared index, or None if disabled
+    """
+    path = os.getenv("NEAR_DUPLICATE_INDEX_PATH")
+    if not path:
+        return None
+    if Path(path).exists():
+        return NearDuplicateIndex.load(path)
+
+    db = next(get_db())
+    try:
+        index = build_index(db)
+    finally:
+        db.close()
+    index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report near-duplicate papers")
+    parser.add_argument("--save", help="Also write the index to this file")
+    parser.add_argument(
+        "--snapshot", help="Build the index from this snapshot instead of the database"
+    )
+    args = parser.parse_args()
+
+    db = next(get_db())
+    try:
+        if args.snapshot:
+            index = NearDuplicateIndex()
+            index.add_many(Snapshot.open(args.snapshot).rows("title", "abstract"))
+        else:
+            index = build_index(db)
+        if args.save:
+            index.save(args.save)
+        groups = dedupe_report(db, index)
+        for group in groups:
+            print(f"\n{len(group)} near-duplicates:")
+            for paper in group:
+                print(f"  [{paper.id}] {paper.title}")
+        print(f"\n{len(groups)} groups of near-duplicates among {len(index)} papers")
+    finally:
+        db.close()
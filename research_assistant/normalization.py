@@ -0,0 +1,48 @@
+"""
+Normalization helpers for comparing paper titles and author names.
+"""
+
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a title so trivially different spellings compare equal.
+
+    Applies Unicode NFKC, folds case, replaces punctuation with spaces and
+    collapses runs of whitespace.
+
+    Args:
+        title: Title to normalize
+
+    Returns:
+        str: Normalized title
+    """
+    title = unicodedata.normalize("NFKC", title).casefold()
+    return " ".join(_NON_WORD.sub(" ", title).split())
+
+
+def normalize_author_name(name: str) -> str:
+    """
+    Normalize an author name into the key authors are matched on.
+
+    Folds diacritics and case, turns "Last, First" into "First Last", and
+    splits initials so "J.R.R. Tolkien", "J. R. R. Tolkien" and "Tolkien, J R R"
+    share a key. Initials are not expanded, so "John Smith" and "J. Smith"
+    remain distinct; merging those is left to the disambiguation job.
+
+    Args:
+        name: Author name
+
+    Returns:
+        str: Normalized author key
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).casefold()
+    if name.count(",") == 1:
+        last, first = name.split(",")
+        name = f"{first} {last}"
+    return " ".join(_NON_WORD.sub(" ", name).split())
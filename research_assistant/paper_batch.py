@@ -0,0 +1,553 @@
+"""
+Columnar storage for large numbers of papers.
+
+A :class:`PaperBatch` keeps each :class:`~research_assistant.models.Paper`
+field in one NumPy array rather than one Python object per value:
+
+- strings as a UTF-8 byte buffer plus an offsets array,
+- strings that repeat across papers (venues, author names) dictionary-encoded
+  as integer codes into one copy of each distinct value,
+- numbers as fixed-width arrays with a null mask,
+- authors as a compressed sparse row (CSR) index into the author names, and
+  their affiliations, when any author has some, as a second CSR level.
+
+Indexing or iterating a batch yields :class:`PaperView` objects that decode
+fields from the buffers on access, so code written against ``Paper`` (the
+bulk write path, papers-stored listeners) takes a batch unchanged. A batch
+pickles as a handful of arrays, which keeps handing parsed papers between
+processes cheap.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from research_assistant.models import Author, Paper
+
+# Paper fields stored as string columns
+STRING_FIELDS = ("title", "abstract", "url", "semantic_scholar_id")
+# Paper fields shared by many papers, stored dictionary-encoded
+DICTIONARY_FIELDS = ("venue",)
+# Paper fields stored as number columns, with their dtypes
+NUMBER_FIELDS = {
+    "year": np.int16,
+    "title_similarity": np.float64,
+    "citation_count": np.int32,
+    "reference_count": np.int32,
+    "is_open_access": np.bool_,
+}
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def _narrow(offsets: np.ndarray) -> np.ndarray:
+    """Store offsets as int32 unless they address more than 2 GiB."""
+    if offsets[-1] <= _INT32_MAX:
+        return offsets.astype(np.int32)
+    return offsets
+
+
+def _offsets(lengths: Iterable[int], count: int) -> np.ndarray:
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(lengths, dtype=np.int64, count=count), out=offsets[1:])
+    return _narrow(offsets)
+
+
+def _concat_offsets(offsets: Sequence[np.ndarray]) -> np.ndarray:
+    parts = [np.zeros(1, dtype=np.int64)]
+    end = 0
+    for array in offsets:
+        parts.append(array[1:].astype(np.int64) + end)
+        end += int(array[-1])
+    return _narrow(np.concatenate(parts))
+
+
+def _concat_nulls(nulls: Sequence[Optional[np.ndarray]], lengths: Sequence[int]):
+    if all(mask is None for mask in nulls):
+        return None
+    return np.concatenate(
+        [
+            np.zeros(length, dtype=bool) if mask is None else mask
+            for mask, length in zip(nulls, lengths)
+        ]
+    )
+
+
+def _with_nulls(values: list, nulls: Optional[np.ndarray]) -> list:
+    if nulls is not None:
+        for index in np.flatnonzero(nulls).tolist():
+            values[index] = None
+    return values
+
+
+class StringColumn:
+    """Nullable strings stored as one UTF-8 buffer and an offsets array."""
+
+    __slots__ = ("data", "offsets", "nulls")
+
+    def __init__(
+        self, data: np.ndarray, offsets: np.ndarray, nulls: Optional[np.ndarray]
+    ):
+        """
+        Args:
+            data: UTF-8 bytes of every string, concatenated
+            offsets: Start of each string in ``data``, plus the end of the last
+            nulls: Which strings are None, or None if none are
+        """
+        self.data = data
+        self.offsets = offsets
+        self.nulls = nulls
+
+    @classmethod
+    def from_strings(cls, values: Sequence[Optional[str]]) -> "StringColumn":
+        encoded = [b"" if value is None else value.encode("utf-8") for value in values]
+        nulls = np.fromiter(
+            (value is None for value in values), dtype=bool, count=len(values)
+        )
+        return cls(
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            _offsets(map(len, encoded), len(encoded)),
+            nulls if nulls.any() else None,
+        )
+
+    @classmethod
+    def concat(cls, columns: Sequence["StringColumn"]) -> "StringColumn":
+        return cls(
+            np.concatenate([column.data for column in columns]),
+            _concat_offsets([column.offsets for column in columns]),
+            _concat_nulls([c.nulls for c in columns], [len(c) for c in columns]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return str(
+            memoryview(self.data)[self.offsets[index] : self.offsets[index + 1]],
+            "utf-8",
+        )
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        """The column's arrays, named under ``prefix``; see :meth:`from_arrays`."""
+        arrays = {f"{prefix}.data": self.data, f"{prefix}.offsets": self.offsets}
+        if self.nulls is not None:
+            arrays[f"{prefix}.nulls"] = self.nulls
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], prefix: str) -> "StringColumn":
+        return cls(
+            arrays[f"{prefix}.data"],
+            arrays[f"{prefix}.offsets"],
+            arrays.get(f"{prefix}.nulls"),
+        )
+
+    def to_list(self) -> List[Optional[str]]:
+        """Decode every string, much faster than indexing one at a time."""
+        data = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        values = [
+            data[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])
+        ]
+        return _with_nulls(values, self.nulls)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.data.nbytes
+            + self.offsets.nbytes
+            + (0 if self.nulls is None else self.nulls.nbytes)
+        )
+
+
+class DictionaryColumn:
+    """Nullable strings stored as int32 codes into a column of distinct values."""
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self, codes: np.ndarray, values: StringColumn):
+        """
+        Args:
+            codes: Position of each string in ``values``, -1 for None
+            values: Distinct strings
+        """
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_strings(cls, values: Sequence[Optional[str]]) -> "DictionaryColumn":
+        positions: Dict[str, int] = {}
+        codes = np.fromiter(
+            (
+                -1 if value is None else positions.setdefault(value, len(positions))
+                for value in values
+            ),
+            dtype=np.int32,
+            count=len(values),
+        )
+        return cls(codes, StringColumn.from_strings(list(positions)))
+
+    @classmethod
+    def concat(cls, columns: Sequence["DictionaryColumn"]) -> "DictionaryColumn":
+        codes = []
+        shift = 0
+        for column in columns:
+            codes.append(np.where(column.codes < 0, -1, column.codes + shift))
+            shift += len(column.values)
+        return cls(
+            np.concatenate(codes).astype(np.int32),
+            StringColumn.concat([column.values for column in columns]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return None if code < 0 else self.values[code]
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {f"{prefix}.codes": self.codes, **self.values.arrays(f"{prefix}.values")}
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Dict[str, np.ndarray], prefix: str
+    ) -> "DictionaryColumn":
+        return cls(
+            arrays[f"{prefix}.codes"],
+            StringColumn.from_arrays(arrays, f"{prefix}.values"),
+        )
+
+    def to_list(self) -> List[Optional[str]]:
+        values = self.values.to_list() + [None]
+        # Code -1 picks the trailing None
+        return [values[code] for code in self.codes.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.values.nbytes
+
+
+class NumberColumn:
+    """Nullable numbers stored as a fixed-width array and a null mask."""
+
+    __slots__ = ("values", "nulls")
+
+    def __init__(self, values: np.ndarray, nulls: Optional[np.ndarray]):
+        self.values = values
+        self.nulls = nulls
+
+    @classmethod
+    def from_values(cls, values: Sequence, dtype) -> "NumberColumn":
+        nulls = np.fromiter(
+            (value is None for value in values), dtype=bool, count=len(values)
+        )
+        array = np.fromiter(
+            (0 if value is None else value for value in values),
+            dtype=dtype,
+            count=len(values),
+        )
+        return cls(array, nulls if nulls.any() else None)
+
+    @classmethod
+    def concat(cls, columns: Sequence["NumberColumn"]) -> "NumberColumn":
+        return cls(
+            np.concatenate([column.values for column in columns]),
+            _concat_nulls([c.nulls for c in columns], [len(c) for c in columns]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int):
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return self.values[index].item()
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        arrays = {f"{prefix}.values": self.values}
+        if self.nulls is not None:
+            arrays[f"{prefix}.nulls"] = self.nulls
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], prefix: str) -> "NumberColumn":
+        return cls(arrays[f"{prefix}.values"], arrays.get(f"{prefix}.nulls"))
+
+    def to_list(self) -> list:
+        return _with_nulls(self.values.tolist(), self.nulls)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (0 if self.nulls is None else self.nulls.nbytes)
+
+
+Column = Union[StringColumn, DictionaryColumn, NumberColumn]
+
+# Column class of each stored Paper field
+_COLUMN_TYPES = {
+    **{name: StringColumn for name in STRING_FIELDS},
+    **{name: DictionaryColumn for name in DICTIONARY_FIELDS},
+    **{name: NumberColumn for name in NUMBER_FIELDS},
+}
+
+
+class PaperView:
+    """
+    A paper of a :class:`PaperBatch`, read from the batch's columns on access.
+
+    Has the attributes of :class:`Paper`; use :meth:`to_paper` for an
+    independent copy.
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: "PaperBatch", index: int):
+        self._batch = batch
+        self._index = index
+
+    def __getattr__(self, name: str):
+        # Private names are never columns; also keeps copy and pickle from
+        # recursing before the slots are set
+        if name.startswith("_"):
+            raise AttributeError(name)
+        column = self._batch.columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return column[self._index]
+
+    @property
+    def authors(self) -> List[Author]:
+        return self._batch.authors(self._index)
+
+    def to_paper(self) -> Paper:
+        return self._batch.paper(self._index)
+
+    def to_dict(self) -> dict:
+        return self.to_paper().to_dict()
+
+    __str__ = Paper.__str__
+
+    def __repr__(self) -> str:
+        return f"PaperView({self._index}, {self.title!r})"
+
+
+class PaperBatch(Sequence):
+    """
+    Columnar, read-only sequence of papers.
+
+    Build one with :meth:`from_papers` or :meth:`concat`; indexing and
+    iteration yield :class:`PaperView` objects.
+    """
+
+    __slots__ = (
+        "columns",
+        "author_offsets",
+        "author_names",
+        "affiliation_offsets",
+        "affiliations",
+    )
+
+    def __init__(
+        self,
+        columns: Dict[str, Column],
+        author_offsets: np.ndarray,
+        author_names: DictionaryColumn,
+        affiliation_offsets: Optional[np.ndarray] = None,
+        affiliations: Optional[StringColumn] = None,
+    ):
+        """
+        Args:
+            columns: Column of each field in ``STRING_FIELDS``,
+                ``DICTIONARY_FIELDS`` and ``NUMBER_FIELDS``
+            author_offsets: CSR offsets of each paper's authors in ``author_names``
+            author_names: Names of every paper's authors, in order
+            affiliation_offsets: CSR offsets of each author's affiliations, or
+                None if no author has any
+            affiliations: Affiliations of every author, in order; None marks an
+                author without an affiliation list
+        """
+        self.columns = columns
+        self.author_offsets = author_offsets
+        self.author_names = author_names
+        self.affiliation_offsets = affiliation_offsets
+        self.affiliations = affiliations
+
+    @classmethod
+    def from_papers(cls, papers: Iterable[Paper]) -> "PaperBatch":
+        """Copy papers, or views of another batch, into a new batch."""
+        papers = list(papers)
+        columns: Dict[str, Column] = {
+            name: StringColumn.from_strings([getattr(p, name) for p in papers])
+            for name in STRING_FIELDS
+        }
+        for name in DICTIONARY_FIELDS:
+            columns[name] = DictionaryColumn.from_strings(
+                [getattr(p, name) for p in papers]
+            )
+        for name, dtype in NUMBER_FIELDS.items():
+            columns[name] = NumberColumn.from_values(
+                [getattr(p, name) for p in papers], dtype
+            )
+
+        authors_per_paper = [p.authors for p in papers]
+        authors = [
+            author for paper_authors in authors_per_paper for author in paper_authors
+        ]
+        batch = cls(
+            columns,
+            _offsets(map(len, authors_per_paper), len(papers)),
+            DictionaryColumn.from_strings([author.name for author in authors]),
+        )
+        if any(author.affiliations is not None for author in authors):
+            # An author without a list is stored as a single None affiliation
+            lists = [
+                [None] if author.affiliations is None else author.affiliations
+                for author in authors
+            ]
+            batch.affiliation_offsets = _offsets(map(len, lists), len(authors))
+            batch.affiliations = StringColumn.from_strings(
+                [affiliation for affiliations in lists for affiliation in affiliations]
+            )
+        return batch
+
+    def _affiliation_columns(self):
+        if self.affiliation_offsets is not None:
+            return self.affiliation_offsets, self.affiliations
+        count = len(self.author_names)
+        return (
+            _narrow(np.arange(count + 1, dtype=np.int64)),
+            StringColumn(
+                np.zeros(0, dtype=np.uint8),
+                np.zeros(count + 1, dtype=np.int32),
+                np.ones(count, dtype=bool),
+            ),
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence["PaperBatch"]) -> "PaperBatch":
+        """Join batches into one, in order."""
+        if len(batches) == 1:
+            return batches[0]
+        batch = cls(
+            {
+                name: type(column).concat([batch.columns[name] for batch in batches])
+                for name, column in batches[0].columns.items()
+            },
+            _concat_offsets([batch.author_offsets for batch in batches]),
+            DictionaryColumn.concat([batch.author_names for batch in batches]),
+        )
+        if any(batch.affiliation_offsets is not None for batch in batches):
+            parts = [batch._affiliation_columns() for batch in batches]
+            batch.affiliation_offsets = _concat_offsets([p[0] for p in parts])
+            batch.affiliations = StringColumn.concat([p[1] for p in parts])
+        return batch
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Return every array of the batch by name.
+
+        :meth:`from_arrays` rebuilds the batch from them without copying, e.g.
+        from arrays memory-mapped with ``np.load(path, mmap_mode="r")``.
+        """
+        arrays = {"author_offsets": self.author_offsets}
+        arrays.update(self.author_names.arrays("author_names"))
+        for name, column in self.columns.items():
+            arrays.update(column.arrays(name))
+        if self.affiliation_offsets is not None:
+            arrays["affiliation_offsets"] = self.affiliation_offsets
+            arrays.update(self.affiliations.arrays("affiliations"))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "PaperBatch":
+        """Rebuild a batch from the arrays returned by :meth:`arrays`."""
+        batch = cls(
+            {
+                name: column_type.from_arrays(arrays, name)
+                for name, column_type in _COLUMN_TYPES.items()
+            },
+            arrays["author_offsets"],
+            DictionaryColumn.from_arrays(arrays, "author_names"),
+        )
+        if "affiliation_offsets" in arrays:
+            batch.affiliation_offsets = arrays["affiliation_offsets"]
+            batch.affiliations = StringColumn.from_arrays(arrays, "affiliations")
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.author_offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("paper index out of range")
+        return PaperView(self, index)
+
+    def __iter__(self) -> Iterator[PaperView]:
+        return (PaperView(self, index) for index in range(len(self)))
+
+    def authors(self, index: int) -> List[Author]:
+        """Return the authors of the paper at ``index``."""
+        authors = []
+        for position in range(
+            self.author_offsets[index], self.author_offsets[index + 1]
+        ):
+            affiliations = None
+            if self.affiliation_offsets is not None:
+                start = self.affiliation_offsets[position]
+                end = self.affiliation_offsets[position + 1]
+                if not (end - start == 1 and self.affiliations[start] is None):
+                    affiliations = [self.affiliations[i] for i in range(start, end)]
+            authors.append(Author(self.author_names[position], affiliations))
+        return authors
+
+    def paper(self, index: int) -> Paper:
+        """Return the paper at ``index`` as a Paper dataclass."""
+        return Paper(
+            authors=self.authors(index),
+            **{name: column[index] for name, column in self.columns.items()},
+        )
+
+    def to_papers(self) -> List[Paper]:
+        """Return every paper as a Paper dataclass, decoding column by column."""
+        names = self.author_names.to_list()
+        if self.affiliation_offsets is None:
+            affiliations = [None] * len(names)
+        else:
+            values = self.affiliations.to_list()
+            bounds = self.affiliation_offsets.tolist()
+            affiliations = [
+                None
+                if end - start == 1 and values[start] is None
+                else values[start:end]
+                for start, end in zip(bounds, bounds[1:])
+            ]
+        authors = [Author(*author) for author in zip(names, affiliations)]
+
+        bounds = self.author_offsets.tolist()
+        columns = {name: column.to_list() for name, column in self.columns.items()}
+        columns["authors"] = [authors[s:e] for s, e in zip(bounds, bounds[1:])]
+        return [
+            Paper(*values)
+            for values in zip(*(columns[name] for name in Paper.__dataclass_fields__))
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the batch's arrays."""
+        return (
+            sum(column.nbytes for column in self.columns.values())
+            + self.author_offsets.nbytes
+            + self.author_names.nbytes
+            + (
+                0
+                if self.affiliation_offsets is None
+                else self.affiliation_offsets.nbytes + self.affiliations.nbytes
+            )
+        )
@@ -2,22 +2,39 @@
 Module for searching academic papers using various APIs.
 """
 
+import asyncio
 import logging
-from difflib import SequenceMatcher
-from typing import Optional
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
 
 from semanticscholar import SemanticScholar
 from semanticscholar.Paper import Paper as SemanticScholarPaper
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from research_assistant.db.models import DBPaper
+from research_assistant.db.service import find_paper_ids
 from research_assistant.models import Paper
+from research_assistant.normalization import normalize_title
+from research_assistant.rate_limit import TokenBucket
+from research_assistant.search_cache import SearchCache, get_search_cache
+from research_assistant.semantic_scholar_client import (
+    BATCH_LIMIT,
+    AsyncSemanticScholarClient,
+)
+from research_assistant.title_matching import (
+    SIMILARITY_THRESHOLD,
+    best_match,
+    title_similarity,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of search results scored against the requested title
+SEARCH_LIMIT = 10
+
 
 def _get_title_similarity(title1: str, title2: str) -> float:
     """
@@ -30,12 +47,12 @@ def _get_title_similarity(title1: str, title2: str) -> float:
     Returns:
         float: Similarity ratio between 0 and 1
     """
-    return SequenceMatcher(None, title1.lower(), title2.lower()).ratio()
+    return title_similarity(title1, title2)
 
 
 def check_paper_exists(db: Session, title: str) -> Optional[DBPaper]:
     """
-    Check if a paper already exists in the database, using a case-insensitive title comparison.
+    Check if a paper already exists in the database, comparing normalized titles.
 
     Args:
         db: Database session
@@ -44,35 +61,190 @@ def check_paper_exists(db: Session, title: str) -> Optional[DBPaper]:
     Returns:
         Optional[DBPaper]: Existing paper if found, None otherwise
     """
-    # Remove all punctuation from the title
-    return db.query(DBPaper).filter(func.lower(DBPaper.title) == title.lower()).first()
+    return (
+        db.query(DBPaper)
+        .filter(DBPaper.normalized_title == normalize_title(title))
+        .first()
+    )
 
 
-def search_paper(title: str) -> Optional[Paper]:
+def find_existing_titles(
+    db: Session, titles: Iterable[str], chunk_size: int = 10_000
+) -> Set[str]:
     """
-    Search for a paper by its title and return its details.
-    First checks the local database, then falls back to Semantic Scholar.
+    Find which of the given titles are already in the database.
+
+    Titles are matched on their normalized form with one indexed query per
+    ``chunk_size`` distinct titles.
 
     Args:
-        title (str): The title of the paper to search for
+        db: Database session
+        titles: Paper titles to check
+        chunk_size: Maximum number of titles per query
 
     Returns:
-        Optional[Paper]: Paper object if found, None otherwise
+        Set[str]: The input titles that already exist
     """
+    by_normalized: Dict[str, List[str]] = {}
+    for title in titles:
+        by_normalized.setdefault(normalize_title(title), []).append(title)
+
+    existing: Set[str] = set()
+    for found in find_paper_ids(db, list(by_normalized), chunk_size):
+        existing.update(by_normalized[found])
+    return existing
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> SemanticScholar:
+    """Return a shared Semantic Scholar client instead of building one per search."""
+    return SemanticScholar(
+        api_key=os.getenv("SEMANTIC_SCHOLAR_API_KEY"),
+        api_url=os.getenv("SEMANTIC_SCHOLAR_API_URL"),
+    )
 
-    sch = SemanticScholar()
-    papers = sch.search_paper(title)
 
-    if not papers:
+def _select_paper(title: str, papers) -> Optional[Paper]:
+    """
+    Pick the search result matching ``title``, if any.
+
+    Every returned candidate is scored, not just the top result, since the
+    exact title is not always ranked first.
+
+    Args:
+        title: The title that was searched for
+        papers: SemanticScholar paper objects in relevance order
+
+    Returns:
+        Optional[Paper]: The most similar paper if it is similar enough, None otherwise
+    """
+    # Index rather than iterate: iterating search results fetches further pages
+    candidates: List[SemanticScholarPaper] = [papers[i] for i in range(len(papers))]
+    if not candidates:
         return None
 
-    paper: SemanticScholarPaper = papers[0]
-    similarity = _get_title_similarity(title, paper.title)
+    match = best_match(title, [paper.title or "" for paper in candidates], threshold=0)
+    paper = candidates[match[0]]
+    similarity = match[1]
     logger.info(
-        f"Search title: {title}\nFound title: {paper.title}\nTitle similarity: {similarity * 100}%"
+        f"Search title: {title}\nFound title: {paper.title}\n"
+        f"Title similarity: {similarity * 100}%"
     )
-    if similarity < 0.8:
+    if similarity < SIMILARITY_THRESHOLD:
         return None
 
-    # Get the first (most relevant) result and convert to our Paper class
-    return Paper.from_semantic_scholar(papers[0], search_title=title)
+    return Paper.from_semantic_scholar(paper, search_title=title)
+
+
+def search_paper(
+    title: str,
+    cache: Optional[SearchCache] = None,
+    limiter: Optional[TokenBucket] = None,
+) -> Optional[Paper]:
+    """
+    Search for a paper by its title and return its details.
+    First checks the search cache, then falls back to Semantic Scholar.
+
+    Args:
+        title (str): The title of the paper to search for
+        cache: Search cache to use, defaults to the one configured by SEARCH_CACHE_PATH
+        limiter: Rate limiter to wait on before a remote search; cache hits skip it
+
+    Returns:
+        Optional[Paper]: Paper object if found, None otherwise
+    """
+    cache = cache or get_search_cache()
+    if cache is not None:
+        cached, paper = cache.get(title)
+        if cached:
+            return paper
+
+    if limiter is not None:
+        limiter.acquire()
+    papers = _get_client().search_paper(title, limit=SEARCH_LIMIT)
+    paper = _select_paper(title, papers)
+
+    if cache is not None:
+        cache.put(title, paper)
+    return paper
+
+
+async def search_papers_async(
+    titles: Iterable[str],
+    client: Optional[AsyncSemanticScholarClient] = None,
+    max_concurrency: int = 8,
+    cache: Optional[SearchCache] = None,
+) -> List[Optional[Paper]]:
+    """
+    Search for many papers concurrently over one shared connection pool.
+
+    Args:
+        titles: Titles to search for
+        client: Client to use, a new one is created and closed if omitted
+        max_concurrency: Maximum requests in flight when creating a client
+        cache: Search cache to use, defaults to the one configured by SEARCH_CACHE_PATH
+
+    Returns:
+        List[Optional[Paper]]: One result per title, in input order
+    """
+    titles = list(titles)
+    cache = cache or get_search_cache()
+    owns_client = client is None
+    if owns_client:
+        client = AsyncSemanticScholarClient(max_concurrency=max_concurrency)
+
+    async def search_one(title: str) -> Optional[Paper]:
+        if cache is not None:
+            cached, paper = cache.get(title)
+            if cached:
+                return paper
+        records = await client.search_paper(title, limit=SEARCH_LIMIT)
+        paper = _select_paper(title, [SemanticScholarPaper(r) for r in records])
+        if cache is not None:
+            cache.put(title, paper)
+        return paper
+
+    try:
+        return list(await asyncio.gather(*(search_one(t) for t in titles)))
+    finally:
+        if owns_client:
+            await client.aclose()
+
+
+async def fetch_papers_async(
+    semantic_scholar_ids: Iterable[str],
+    client: Optional[AsyncSemanticScholarClient] = None,
+    max_concurrency: int = 8,
+) -> List[Optional[Paper]]:
+    """
+    Fetch papers by Semantic Scholar id with concurrent batch requests.
+
+    Args:
+        semantic_scholar_ids: Semantic Scholar paper ids
+        client: Client to use, a new one is created and closed if omitted
+        max_concurrency: Maximum requests in flight when creating a client
+
+    Returns:
+        List[Optional[Paper]]: One result per id, in input order, None for ids
+        Semantic Scholar does not know
+    """
+    paper_ids = list(semantic_scholar_ids)
+    owns_client = client is None
+    if owns_client:
+        client = AsyncSemanticScholarClient(max_concurrency=max_concurrency)
+
+    try:
+        batches = await asyncio.gather(
+            *(
+                client.get_papers(paper_ids[start : start + BATCH_LIMIT])
+                for start in range(0, len(paper_ids), BATCH_LIMIT)
+            )
+        )
+    finally:
+        if owns_client:
+            await client.aclose()
+    return [
+        Paper.from_semantic_scholar(SemanticScholarPaper(record)) if record else None
+        for batch in batches
+        for record in batch
+    ]
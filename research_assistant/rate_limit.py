@@ -0,0 +1,108 @@
+"""
+Rate limiting for calls to external APIs.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+# Semantic Scholar grants keyed clients 1 request per second; the shared
+# unauthenticated pool is lower and bursty, so stay at the keyed quota by default.
+DEFAULT_SEMANTIC_SCHOLAR_RATE = 1.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``. Callers
+    that find the bucket empty reserve a future token and sleep until it is due,
+    so concurrent callers are spaced out evenly instead of waking up together.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size, defaults to one second worth of tokens
+            clock: Monotonic clock, injectable for tests
+            sleep: Sleep function, injectable for tests
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TokenBucket":
+        """
+        Build a limiter from the Semantic Scholar quota configured in the environment.
+
+        Reads ``SEMANTIC_SCHOLAR_RATE_LIMIT`` (requests per second) and
+        ``SEMANTIC_SCHOLAR_BURST`` (maximum burst size).
+
+        Returns:
+            TokenBucket: Configured limiter
+        """
+        rate = float(
+            os.getenv("SEMANTIC_SCHOLAR_RATE_LIMIT", DEFAULT_SEMANTIC_SCHOLAR_RATE)
+        )
+        burst = os.getenv("SEMANTIC_SCHOLAR_BURST")
+        return cls(rate, float(burst) if burst else None)
+
+    def _reserve(self, tokens: float) -> float:
+        """Take ``tokens`` from the bucket and return how long to wait for them."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until ``tokens`` are available.
+
+        Args:
+            tokens: Number of tokens to consume
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        Wait without blocking the event loop until ``tokens`` are available.
+
+        Args:
+            tokens: Number of tokens to consume
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -1,28 +1,42 @@
-import csv
-from pathlib import Path
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import argparse
+from typing import Optional
 
-# Make sure to adjust this import according to your project's structure.
 from research_assistant.db.config import get_db
-from research_assistant.db.models import DBPaper
-from research_assistant.import_papers import import_papers, read_papers_from_csv
-from research_assistant.paper_search import check_paper_exists, search_paper
+from research_assistant.db.journal import latest_import_job, reset_failed_items
+from research_assistant.db.models import DBImportJob
+from research_assistant.import_papers import import_job
 
 
-def retry_failed_imports(file_path: str) -> None:
+def retry_failed_imports(job_id: Optional[int] = None) -> None:
     """
-    Rerun the import process for papers listed in a CSV file of failed imports.
+    Rerun the import for the titles of an import job that were not found or failed.
 
-    The CSV file should contain headers corresponding to the fields required
-    to create a DBPaper (for example: title, authors, year, etc.).
+    The failed titles are read from the import journal and searched again as
+    part of the same job.
 
     Args:
-        file_path (str): Path to the CSV file with failed paper data.
+        job_id (Optional[int]): Import job to retry, defaults to the latest job.
     """
-    import_papers(file_path)
+    db = next(get_db())
+    try:
+        job = db.get(DBImportJob, job_id) if job_id else latest_import_job(db)
+        if job is None:
+            print("No import job to retry")
+            return
+
+        retried = reset_failed_items(db, job)
+        print(
+            f"Retrying {retried} failed papers from import job {job.id} ({job.source})"
+        )
+        if retried:
+            import_job(db, job)
+    finally:
+        db.close()
 
 
 if __name__ == "__main__":
-    csv_path = Path(__file__).parent.parent / "data" / "failed_papers.csv"
-    retry_failed_imports(str(csv_path))
+    parser = argparse.ArgumentParser(description=retry_failed_imports.__doc__)
+    parser.add_argument("--job-id", type=int, help="Import job to retry")
+    args = parser.parse_args()
+
+    retry_failed_imports(args.job_id)
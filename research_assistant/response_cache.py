@@ -0,0 +1,253 @@
+"""
+Read-through cache of serialized API responses.
+
+Responses are cached as the exact bytes sent to clients, together with an
+ETag derived from the ids and ``updated_at`` of the papers they contain, under
+a key built from the route and its parameters. Storage is pluggable through
+:class:`CacheBackend`; :class:`MemoryBackend` is an in-process LRU with TTLs.
+
+Newly stored papers invalidate the cached responses they could appear in via
+the papers-stored listener of :mod:`research_assistant.db.service`. Writes made
+by other processes are only picked up once entries expire, so the TTL bounds
+how stale a response can be.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Deque, Dict, Iterable, List, Optional, Protocol, Tuple
+
+from research_assistant.db.service import add_papers_stored_listener
+from research_assistant.models import Paper
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 10_000
+# Recent request latencies kept per outcome for the percentiles in stats()
+LATENCY_WINDOW = 1000
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized response body with its ETag and extra headers."""
+
+    body: bytes
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class CacheBackend(Protocol):
+    """Storage for cached responses."""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+class MemoryBackend:
+    """
+    In-process LRU cache with per-entry expiry.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Entries kept before least recently used ones are evicted
+        """
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def make_etag(key: str, versions: Iterable[Tuple[int, object]]) -> str:
+    """
+    Strong ETag of a response from its key and the versions of its papers.
+
+    Args:
+        key: Cache key of the route and parameters that produced the response
+        versions: ``(id, updated_at)`` of each paper in the response, in order
+
+    Returns:
+        str: Quoted ETag header value
+    """
+    digest = hashlib.sha1(key.encode("utf-8"))
+    for paper_id, updated_at in versions:
+        digest.update(f"|{paper_id}:{updated_at}".encode("utf-8"))
+    return f'"{digest.hexdigest()[:24]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value matches an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses weak comparison
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Response cache for the papers API with hit ratio and latency metrics.
+
+    Single-paper responses are keyed by paper id so storing a paper drops only
+    its own entry. Listing keys carry a generation number that every newly
+    stored paper bumps, so stale listings are never looked up again and age
+    out of the backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            backend: Storage for the cached responses
+            ttl: Seconds a response stays cached
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self._generation = 0
+        self._latencies: Dict[str, Deque[float]] = {
+            "hit": deque(maxlen=LATENCY_WINDOW),
+            "miss": deque(maxlen=LATENCY_WINDOW),
+        }
+        self._lock = threading.Lock()
+
+    def paper_key(self, paper_id: int) -> str:
+        """Cache key of a single-paper response."""
+        return f"paper:{paper_id}"
+
+    def listing_key(self, route: str, params: str) -> str:
+        """Cache key of a response listing papers, valid until papers are stored."""
+        return f"{route}:g{self._generation}:{params}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Look up a cached response, counting the hit or miss."""
+        cached = self.backend.get(key)
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        self.backend.set(key, response, self.ttl)
+
+    def record(self, hit: bool, seconds: float, not_modified: bool = False) -> None:
+        """
+        Record the latency of a request served by a cached route.
+
+        Args:
+            hit: Whether the response came from the cache
+            seconds: Time taken to produce the response
+            not_modified: Whether a 304 was returned
+        """
+        with self._lock:
+            self._latencies["hit" if hit else "miss"].append(seconds)
+            if not_modified:
+                self.not_modified += 1
+
+    def invalidate_papers(self, paper_ids: List[int], papers: List[Paper]) -> None:
+        """Papers-stored listener dropping the responses new papers belong in."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+        for paper_id in paper_ids:
+            self.backend.delete(self.paper_key(paper_id))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, object]:
+        """Return hit ratio, counters and latency percentiles in milliseconds."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats: Dict[str, object] = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+            }
+            for outcome, latencies in self._latencies.items():
+                ordered = sorted(latencies)
+                for name, quantile in (("p50", 0.5), ("p99", 0.99)):
+                    position = min(int(quantile * len(ordered)), len(ordered) - 1)
+                    stats[f"{outcome}_{name}_ms"] = (
+                        ordered[position] * 1000 if ordered else None
+                    )
+        if isinstance(self.backend, MemoryBackend):
+            stats["entries"] = len(self.backend)
+            stats["evictions"] = self.backend.evictions
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache configured by ``API_CACHE_*``.
+
+    Storing new papers in this process invalidates the affected entries.
+
+    Returns:
+        Optional[ResponseCache]: Shared cache, or None if ``API_CACHE_MAX_ENTRIES``
+        is 0
+    """
+    max_entries = int(os.getenv("API_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+    if max_entries <= 0:
+        return None
+    cache = ResponseCache(
+        MemoryBackend(max_entries),
+        ttl=float(os.getenv("API_CACHE_TTL", DEFAULT_TTL)),
+    )
+    add_papers_stored_listener(cache.invalidate_papers)
+    return cache
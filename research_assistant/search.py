@@ -1,26 +1,104 @@
 from typing import List
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import func, literal_column, or_
 
 from research_assistant.db.models import DBPaper
 from research_assistant.db.config import engine, SessionLocal
 
+# Weighted tsvector over title (A) and abstract (B). Generated and GIN-indexed by
+# the full-text search migration; not mapped on DBPaper since it is Postgres-only
+# (see POSTGRES_ONLY_SCHEMA in research_assistant.db.models).
+SEARCH_VECTOR = literal_column("papers.search_vector")
 
-def search_papers(query: str, session: Session) -> List[DBPaper]:
+SEARCH_MODES = ("fulltext", "trigram", "substring")
+
+
+def search_papers(
+    query: str,
+    session: Session,
+    limit: int = 20,
+    offset: int = 0,
+    mode: str = "fulltext",
+) -> List[DBPaper]:
     """
     Search the database for papers whose title or abstract match the given query text.
-    Performs a case-insensitive 'LIKE' search on both fields.
+
+    On Postgres the default ``fulltext`` mode matches the query against the
+    indexed title/abstract tsvector and ranks results with ``ts_rank_cd``. If
+    nothing matches, it falls back to a trigram title search so misspelled
+    titles are still found. Other databases use a case-insensitive substring
+    search.
 
     :param query: The text to search for.
     :param session: SQLAlchemy session for database connection.
-    :return: List of matching DBPaper objects.
+    :param limit: Maximum number of papers to return.
+    :param offset: Number of ranked results to skip.
+    :param mode: One of "fulltext", "trigram" or "substring".
+    :return: List of matching DBPaper objects, best matches first.
     """
+    if mode not in SEARCH_MODES:
+        raise ValueError(
+            f"Unknown search mode {mode!r}, expected one of {SEARCH_MODES}"
+        )
+
+    if session.get_bind().dialect.name != "postgresql":
+        mode = "substring"
+
+    if mode == "fulltext":
+        results = _search_fulltext(query, session, limit, offset)
+        if results or offset:
+            return results
+        mode = "trigram"
+
+    if mode == "trigram":
+        return search_titles_fuzzy(query, session, limit, offset)
+
     return (
         session.query(DBPaper)
         .filter(
             or_(DBPaper.title.ilike(f"%{query}%"), DBPaper.abstract.ilike(f"%{query}%"))
         )
+        .order_by(DBPaper.id)
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+
+
+def _search_fulltext(
+    query: str, session: Session, limit: int, offset: int
+) -> List[DBPaper]:
+    ts_query = func.websearch_to_tsquery("english", query)
+    rank = func.ts_rank_cd(SEARCH_VECTOR, ts_query)
+    return (
+        session.query(DBPaper)
+        .filter(SEARCH_VECTOR.op("@@")(ts_query))
+        .order_by(rank.desc(), DBPaper.id)
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+
+
+def search_titles_fuzzy(
+    query: str, session: Session, limit: int = 20, offset: int = 0
+) -> List[DBPaper]:
+    """
+    Typo-tolerant title search using pg_trgm similarity (Postgres only).
+
+    :param query: The title, possibly misspelled, to look for.
+    :param session: SQLAlchemy session for database connection.
+    :param limit: Maximum number of papers to return.
+    :param offset: Number of ranked results to skip.
+    :return: List of DBPaper objects, most similar titles first.
+    """
+    return (
+        session.query(DBPaper)
+        .filter(DBPaper.title.op("%")(query))
+        .order_by(func.similarity(DBPaper.title, query).desc(), DBPaper.id)
+        .limit(limit)
+        .offset(offset)
         .all()
     )
 
@@ -0,0 +1,228 @@
+"""
+Persistent cache of Semantic Scholar search results.
+
+Results are stored in a local SQLite file keyed on a hash of the normalized
+search title, so re-running an import does not repeat searches that were
+already resolved or rejected. Titles that were not found (or whose best match
+was not similar enough) are cached too, with a shorter TTL.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from research_assistant.models import Paper
+from research_assistant.normalization import normalize_title
+
+# Bump when the cached payload format changes to invalidate old entries
+CACHE_VERSION = 1
+
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 100_000
+# Cache hits whose access times are buffered before they are written
+ACCESS_FLUSH_SIZE = 256
+
+
+def cache_key(title: str) -> str:
+    """
+    Content address of a search title.
+
+    Args:
+        title: Search title
+
+    Returns:
+        str: Hex digest of the normalized title
+    """
+    normalized = f"v{CACHE_VERSION}:{normalize_title(title)}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    SQLite-backed search response cache with TTLs and LRU eviction.
+
+    Safe to share between threads. Access times of cache hits are buffered
+    and written with the next insert, eviction or every ``ACCESS_FLUSH_SIZE``
+    hits, so lookups do not each take the SQLite write lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            path: SQLite file path, or ":memory:"
+            ttl: Seconds a found paper stays cached
+            negative_ttl: Seconds a not-found result stays cached
+            max_entries: Entries kept before least recently used ones are evicted
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                payload TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_search_cache_accessed_at "
+            "ON search_cache (accessed_at)"
+        )
+        self._conn.commit()
+        (self._size,) = self._conn.execute(
+            "SELECT COUNT(*) FROM search_cache"
+        ).fetchone()
+
+    def get(self, title: str) -> Tuple[bool, Optional[Paper]]:
+        """
+        Look up a cached search result.
+
+        Args:
+            title: Search title
+
+        Returns:
+            Tuple[bool, Optional[Paper]]: Whether the title was cached, and the
+            cached paper (None for a cached not-found result)
+        """
+        key = cache_key(title)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return False, None
+
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self._conn.commit()
+            if row[0] is None:
+                self.negative_hits += 1
+                return True, None
+            self.hits += 1
+
+        return True, Paper.from_dict(json.loads(row[0]))
+
+    def put(self, title: str, paper: Optional[Paper]) -> None:
+        """
+        Cache a search result.
+
+        Args:
+            title: Search title
+            paper: Paper found for the title, or None if nothing matched
+        """
+        now = time.time()
+        ttl = self.ttl if paper is not None else self.negative_ttl
+        payload = json.dumps(paper.to_dict()) if paper is not None else None
+        with self._lock:
+            self._flush_accessed()
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO search_cache VALUES (?, ?, ?, ?)",
+                (cache_key(title), payload, now + ttl, now),
+            )
+            if cursor.rowcount:
+                self._size += 1
+            else:
+                self._conn.execute(
+                    "UPDATE search_cache SET payload = ?, expires_at = ?, "
+                    "accessed_at = ? WHERE key = ?",
+                    (payload, now + ttl, now, cache_key(title)),
+                )
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_accessed(self) -> None:
+        """Write the buffered access times; the caller commits."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE search_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones down to 90% capacity."""
+        expired = self._conn.execute(
+            "DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        self._size -= expired
+        excess = self._size - int(self.max_entries * 0.9)
+        lru = 0
+        if excess > 0:
+            lru = self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                "SELECT key FROM search_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+            self._size -= lru
+        self.evictions += expired + lru
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current number of entries."""
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": self._size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Return the process-wide search cache configured by ``SEARCH_CACHE_PATH``.
+
+    Returns:
+        Optional[SearchCache]: Shared cache, or None if caching is disabled
+    """
+    path = os.getenv("SEARCH_CACHE_PATH")
+    if not path:
+        return None
+    return SearchCache(
+        path,
+        ttl=float(os.getenv("SEARCH_CACHE_TTL", DEFAULT_TTL)),
+        negative_ttl=float(
+            os.getenv("SEARCH_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)
+        ),
+        max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+    )
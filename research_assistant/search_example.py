@@ -43,7 +43,7 @@ def main():
             db_paper = store_paper(db, paper)
             print(f"Paper stored with ID: {db_paper.id}")
             print(
-                f"Authors stored: {', '.join(author.name for author in db_paper.authors)}"
+                f"Authors stored: {', '.join(author.name for author in paper.authors)}"
             )
         except Exception as e:
             print(f"Error storing paper: {e}")
@@ -0,0 +1,219 @@
+"""
+Async client for the Semantic Scholar Graph API.
+
+A single client owns one keep-alive connection pool for its whole lifetime, so
+many lookups can share connections instead of paying for setup on every call.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+from semanticscholar.Paper import Paper as SemanticScholarPaper
+
+from research_assistant.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.semanticscholar.org"
+GRAPH_PATH = "/graph/v1"
+SEARCH_FIELDS = SemanticScholarPaper.SEARCH_FIELDS
+# Most ids accepted by one POST /paper/batch request
+BATCH_LIMIT = 500
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SemanticScholarAPIError(Exception):
+    """Raised when the Semantic Scholar API returns an unrecoverable response."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Semantic Scholar API error {status_code}: {message}")
+        self.status_code = status_code
+
+
+class AsyncSemanticScholarClient:
+    """
+    Async Semantic Scholar client with bounded concurrency and retries.
+
+    Use as an async context manager so the underlying connection pool is closed:
+
+        async with AsyncSemanticScholarClient() as client:
+            results = await client.search_paper("Attention is all you need")
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 10.0,
+        limiter: Optional[TokenBucket] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            api_url: API root, defaults to ``SEMANTIC_SCHOLAR_API_URL`` or the
+                public API
+            api_key: API key, defaults to ``SEMANTIC_SCHOLAR_API_KEY``
+            max_concurrency: Maximum number of requests in flight
+            max_retries: Retries for 429/5xx responses and connection errors
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Upper bound for a single backoff delay
+            timeout: Request timeout in seconds
+            limiter: Optional rate limiter shared by all requests
+            transport: Optional httpx transport, used by tests
+        """
+        api_url = api_url or os.getenv("SEMANTIC_SCHOLAR_API_URL") or DEFAULT_API_URL
+        api_key = api_key or os.getenv("SEMANTIC_SCHOLAR_API_KEY")
+        headers = {"x-api-key": api_key} if api_key else {}
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limiter = limiter
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=api_url.rstrip("/") + GRAPH_PATH,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "AsyncSemanticScholarClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Delay before the next attempt, honouring Retry-After when present."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent retries from hitting the API in lockstep
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt)
+        )
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+    ) -> Any:
+        """
+        Send a request, retrying rate limits and transient failures.
+
+        Args:
+            method: HTTP method
+            path: Path relative to the Graph API root
+            params: Query string parameters
+            json: JSON request body
+
+        Returns:
+            Any: Decoded JSON response
+
+        Raises:
+            SemanticScholarAPIError: If the API keeps failing or rejects the request
+        """
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self._semaphore:
+                if self._limiter is not None:
+                    await self._limiter.acquire_async()
+                try:
+                    response = await self._client.request(
+                        method, path, params=params, json=json
+                    )
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    logger.warning(f"Request to {path} failed ({e}), retrying")
+                else:
+                    if response.status_code not in RETRY_STATUSES:
+                        if response.is_error:
+                            raise SemanticScholarAPIError(
+                                response.status_code, response.text
+                            )
+                        return response.json()
+                    if attempt >= self.max_retries:
+                        raise SemanticScholarAPIError(
+                            response.status_code, response.text
+                        )
+                    retry_after = response.headers.get("retry-after")
+                    logger.info(
+                        f"Request to {path} returned {response.status_code}, retrying"
+                    )
+
+            # Back off outside the semaphore so other requests can proceed
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+
+    async def search_paper(
+        self, query: str, limit: int = 10, fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        """
+        Search for papers by keyword.
+
+        Args:
+            query: Plain-text search query
+            limit: Maximum number of results (at most 100)
+            fields: Paper fields to return, defaults to the search fields
+
+        Returns:
+            List[dict]: Raw paper records in relevance order
+        """
+        data = await self.request(
+            "GET",
+            "/paper/search",
+            params={
+                "query": query,
+                "limit": limit,
+                "fields": ",".join(fields or SEARCH_FIELDS),
+            },
+        )
+        return data.get("data") or []
+
+    async def get_papers(
+        self, paper_ids: Sequence[str], fields: Optional[List[str]] = None
+    ) -> List[Optional[dict]]:
+        """
+        Fetch papers by id with one POST /paper/batch request.
+
+        Args:
+            paper_ids: Semantic Scholar paper ids, at most ``BATCH_LIMIT``
+            fields: Paper fields to return, e.g. ``references.paperId``;
+                defaults to the search fields
+
+        Returns:
+            List[Optional[dict]]: One raw paper record per id, in input order,
+            None for ids the API does not know
+        """
+        if len(paper_ids) > BATCH_LIMIT:
+            raise ValueError(f"At most {BATCH_LIMIT} papers per batch request")
+        return await self.request(
+            "POST",
+            "/paper/batch",
+            params={"fields": ",".join(fields or SEARCH_FIELDS)},
+            json={"ids": list(paper_ids)},
+        )
@@ -0,0 +1,253 @@
+"""
+Local stub of the Semantic Scholar Graph API for tests and benchmarks.
+
+Serves the endpoints used by this package from an in-memory corpus so clients
+can be exercised and benchmarked without touching the network.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def make_stub_paper(title: str) -> dict:
+    """
+    Build a deterministic Semantic Scholar paper record for a title.
+
+    Args:
+        title: Paper title
+
+    Returns:
+        dict: Paper record shaped like the Graph API response
+    """
+    paper_id = hashlib.sha1(title.encode("utf-8")).hexdigest()
+    return {
+        "paperId": paper_id,
+        "title": title,
+        "abstract": f"Abstract of {title}",
+        "url": f"https://www.semanticscholar.org/paper/{paper_id}",
+        "venue": "Stub Venue",
+        "year": 2020,
+        "citationCount": 1,
+        "referenceCount": 1,
+        "isOpenAccess": False,
+        "authors": [{"authorId": "1", "name": "Stub Author"}],
+    }
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Benchmarks open many connections at once
+    request_queue_size = 128
+
+
+class StubSemanticScholarServer:
+    """
+    Threaded HTTP server that imitates the Semantic Scholar Graph API.
+
+    Use as a context manager; ``url`` can be passed as ``api_url`` to clients:
+
+        with StubSemanticScholarServer() as stub:
+            client = AsyncSemanticScholarClient(api_url=stub.url)
+    """
+
+    def __init__(
+        self,
+        papers: Optional[Iterable[dict]] = None,
+        echo: bool = True,
+        latency: float = 0.0,
+        error_statuses: Optional[List[int]] = None,
+        port: int = 0,
+    ):
+        """
+        Args:
+            papers: Paper records to serve, matched on case-insensitive title by
+                searches and on ``paperId`` by batch lookups
+            echo: Answer unknown search queries with a synthesized paper
+            latency: Seconds to wait before answering each request
+            error_statuses: Statuses returned, in order, by the first requests
+            port: Port to bind, 0 picks a free one
+        """
+        papers = list(papers or [])
+        self.papers = {p["title"].lower(): p for p in papers}
+        self.papers_by_id = {p["paperId"]: p for p in papers}
+        self.echo = echo
+        self.latency = latency
+        self.error_statuses = list(error_statuses or [])
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubSemanticScholarServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve requests in the calling thread until interrupted."""
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubSemanticScholarServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _next_error(self) -> Optional[int]:
+        with self._lock:
+            self.request_count += 1
+            return self.error_statuses.pop(0) if self.error_statuses else None
+
+    def search(self, query: str, limit: int) -> List[dict]:
+        paper = self.papers.get(query.lower())
+        if paper is None and self.echo:
+            paper = make_stub_paper(query)
+        return [paper][:limit] if paper else []
+
+    def get_papers(
+        self, paper_ids: List[str], fields: List[str]
+    ) -> List[Optional[dict]]:
+        # Nested fields such as "references.paperId" select the whole list
+        wanted = {field.split(".")[0] for field in fields} | {"paperId"}
+        results = []
+        for paper_id in paper_ids:
+            paper = self.papers_by_id.get(paper_id)
+            results.append(
+                None
+                if paper is None
+                else {key: value for key, value in paper.items() if key in wanted}
+            )
+        return results
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle delay them
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Any) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _start(self) -> bool:
+                if stub.latency:
+                    time.sleep(stub.latency)
+                error = stub._next_error()
+                if error is not None:
+                    self._send(error, {"message": "stub error"})
+                    return False
+                return True
+
+            def do_GET(self):
+                if not self._start():
+                    return
+
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                if url.path.endswith("/paper/search"):
+                    query = params.get("query", [""])[0]
+                    limit = int(params.get("limit", ["10"])[0])
+                    data = stub.search(query, limit)
+                    return self._send(
+                        200, {"total": len(data), "offset": 0, "data": data}
+                    )
+                self._send(404, {"error": "Not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self._start():
+                    return
+
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                if url.path.endswith("/paper/batch"):
+                    fields = params.get("fields", [""])[0].split(",")
+                    return self._send(200, stub.get_papers(body.get("ids", []), fields))
+                self._send(404, {"error": "Not found"})
+
+        return Handler
+
+
+def _serve(port: int, latency: float) -> None:
+    StubSemanticScholarServer(latency=latency, port=port).serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import logging
+    import multiprocessing
+    import socket
+
+    from research_assistant.paper_search import search_papers_async
+    from research_assistant.semantic_scholar_client import AsyncSemanticScholarClient
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark async lookups against the stub API"
+    )
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    async def benchmark(titles: List[str], url: str) -> None:
+        async with AsyncSemanticScholarClient(
+            api_url=url, max_concurrency=args.concurrency
+        ) as client:
+            started = time.perf_counter()
+            results = await search_papers_async(titles, client=client)
+            elapsed = time.perf_counter() - started
+        found = sum(1 for r in results if r is not None)
+        print(
+            f"{len(titles)} lookups ({found} found) in {elapsed:.2f}s: "
+            f"{len(titles) / elapsed:.0f} lookups/s"
+        )
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("research_assistant.paper_search").setLevel(logging.WARNING)
+
+    # Serve from another process so the server and client don't share a GIL
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = multiprocessing.Process(
+        target=_serve, args=(port, args.latency), daemon=True
+    )
+    server.start()
+    try:
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        titles = [f"Stub paper {i}" for i in range(args.lookups)]
+        asyncio.run(benchmark(titles, f"http://127.0.0.1:{port}"))
+    finally:
+        server.terminate()
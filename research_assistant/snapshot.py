@@ -0,0 +1,416 @@
+"""
+Columnar snapshots of the papers and their authors for offline jobs.
+
+:func:`export_snapshot` streams papers and their author links out of the
+database through server-side cursors and writes them, partitioned by year, as
+the arrays of a :class:`PaperBatch` in ``.npy`` files::
+
+    snapshot/
+        manifest.json
+        year=2019/part-00000/title.data.npy, title.offsets.npy, ...
+        year=unknown/part-00004/...
+
+Each part also holds the papers' database ids, ``updated_at`` and normalized
+titles and the database ids of their authors. Exporting again into an existing
+snapshot only writes the papers updated since the previous export, as new
+parts; readers keep the newest copy of each paper. ``updated_at`` is set when a
+row is written, not when its transaction commits, so incremental exports reach
+back :data:`SNAPSHOT_OVERLAP` before the previous high-water mark and re-export
+the papers in that window. Deleted papers and author
+changes that did not touch the paper row are only picked up by a full export.
+
+:meth:`Snapshot.open` memory-maps every array, so opening a snapshot reads
+little more than its manifest and jobs such as missing-paper matching, dedupe
+or index builds start without touching the database.
+
+Parts are plain NumPy files rather than Parquet or Arrow IPC, which would need
+pyarrow; the string, dictionary and offset arrays follow Arrow's layouts.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Connection, select, true
+from sqlalchemy.orm import Session
+
+from research_assistant.db.config import get_db
+from research_assistant.db.models import DBAuthor, DBPaper, paper_authors
+from research_assistant.models import Author, Paper
+from research_assistant.paper_batch import PaperBatch, PaperView, StringColumn
+
+# Bumped when the layout of the parts changes
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+# Papers per part and rows fetched per round trip
+SNAPSHOT_CHUNK_SIZE = 50_000
+# How far incremental exports look behind the previous high-water mark, to
+# catch rows committed after it by transactions longer than this
+SNAPSHOT_OVERLAP = timedelta(hours=1)
+# Paper columns exported
+PAPER_FIELDS = (
+    "title",
+    "abstract",
+    "url",
+    "venue",
+    "year",
+    "citation_count",
+    "reference_count",
+    "is_open_access",
+    "semantic_scholar_id",
+)
+
+
+@dataclass
+class ExportStats:
+    """Counts of a snapshot export."""
+
+    papers: int = 0
+    parts: int = 0
+    full: bool = True
+
+
+def _year_directory(year: Optional[int]) -> str:
+    return f"year={'unknown' if year is None else year}"
+
+
+def _read_manifest(path: Path) -> Optional[dict]:
+    manifest_path = path / MANIFEST
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has snapshot format {manifest.get('format')}, "
+            f"expected {FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def _write_manifest(path: Path, manifest: dict) -> None:
+    # Readers see either the previous manifest or the new one
+    tmp = path / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, path / MANIFEST)
+
+
+def _write_part(path: Path, relative: str, arrays: Dict[str, np.ndarray]) -> None:
+    final = path / relative
+    tmp = final.with_name(f"{final.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.rmtree(final, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+    os.replace(tmp, final)
+
+
+def _stream_papers(connection: Connection, condition, chunk_size: int):
+    """
+    Yield the papers matching ``condition`` ordered by year and id, each as
+    ``(row, author_ids, authors)``, merging a second stream of author links
+    in the same order.
+
+    Both streams must read the same snapshot of the database, or a paper
+    committed in between shows up among the links only and the merge never
+    gets past it.
+    """
+    order = (DBPaper.year.nulls_last(), DBPaper.id)
+    papers = connection.execute(
+        select(
+            DBPaper.id,
+            DBPaper.updated_at,
+            DBPaper.normalized_title,
+            *(getattr(DBPaper, name) for name in PAPER_FIELDS),
+        )
+        .where(condition)
+        .order_by(*order)
+        .execution_options(yield_per=chunk_size)
+    )
+    links = iter(
+        connection.execute(
+            select(paper_authors.c.paper_id, DBAuthor.id, DBAuthor.name)
+            .join(DBPaper, DBPaper.id == paper_authors.c.paper_id)
+            .join(DBAuthor, DBAuthor.id == paper_authors.c.author_id)
+            .where(condition)
+            .order_by(*order, DBAuthor.id)
+            .execution_options(yield_per=chunk_size)
+        )
+    )
+    link = next(links, None)
+    for row in papers:
+        author_ids, authors = [], []
+        while link is not None and link[0] == row[0]:
+            author_ids.append(link[1])
+            authors.append(Author(link[2]))
+            link = next(links, None)
+        yield row, author_ids, authors
+
+
+def export_snapshot(
+    db: Session,
+    path: str,
+    full: bool = False,
+    chunk_size: int = SNAPSHOT_CHUNK_SIZE,
+) -> ExportStats:
+    """
+    Write the papers to a snapshot, or update an existing one.
+
+    Papers are read through a connection of their own, in one transaction.
+
+    Args:
+        db: Database session, whose engine is used
+        path: Snapshot directory, created if missing
+        full: Rewrite the whole snapshot even if one exists at ``path``; the
+            parts of the previous one are removed once the new manifest is in
+            place
+        chunk_size: Papers per part and rows fetched per round trip
+
+    Returns:
+        ExportStats: Counts of the export
+    """
+    root = Path(path)
+    root.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest(root)
+    incremental = previous is not None and not full
+    manifest = {
+        "format": FORMAT_VERSION,
+        "high_water": None,
+        "next_part": previous["next_part"] if previous else 0,
+        "exports": previous["exports"] if incremental else [],
+        "parts": previous["parts"] if incremental else [],
+    }
+    since = previous["high_water"] if incremental else None
+    condition = (
+        DBPaper.updated_at > datetime.fromisoformat(since) - SNAPSHOT_OVERLAP
+        if since
+        else true()
+    )
+
+    stats = ExportStats(full=not incremental)
+    high_water = datetime.fromisoformat(since) if since else None
+    rows: List[tuple] = []
+    year_index = 3 + PAPER_FIELDS.index("year")
+
+    def flush() -> None:
+        year = rows[0][0][year_index]
+        relative = f"{_year_directory(year)}/part-{manifest['next_part']:05d}"
+        batch = PaperBatch.from_papers(
+            Paper(authors=authors, **dict(zip(PAPER_FIELDS, row[3:])))
+            for row, _, authors in rows
+        )
+        arrays = batch.arrays()
+        arrays["ids"] = np.array([row[0] for row, _, _ in rows], dtype=np.int64)
+        arrays["updated_at"] = np.array(
+            [row[1] for row, _, _ in rows], dtype="datetime64[us]"
+        )
+        arrays.update(
+            StringColumn.from_strings([row[2] for row, _, _ in rows]).arrays(
+                "normalized_title"
+            )
+        )
+        arrays["author_ids"] = np.array(
+            [author_id for _, author_ids, _ in rows for author_id in author_ids],
+            dtype=np.int64,
+        )
+        _write_part(root, relative, arrays)
+        manifest["parts"].append({"path": relative, "year": year, "papers": len(rows)})
+        manifest["next_part"] += 1
+        stats.parts += 1
+        stats.papers += len(rows)
+        rows.clear()
+
+    with db.get_bind().connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # READ COMMITTED takes a new snapshot per statement
+            connection = connection.execution_options(isolation_level="REPEATABLE READ")
+        for item in _stream_papers(connection, condition, chunk_size):
+            if rows and (
+                len(rows) >= chunk_size
+                or rows[-1][0][year_index] != item[0][year_index]
+            ):
+                flush()
+            rows.append(item)
+            updated_at = item[0][1]
+            if updated_at is not None and (
+                high_water is None or updated_at > high_water
+            ):
+                high_water = updated_at
+        if rows:
+            flush()
+
+    manifest["high_water"] = high_water.isoformat() if high_water else None
+    manifest["exports"].append(
+        {
+            "created_at": datetime.utcnow().isoformat(),
+            "since": since,
+            "papers": stats.papers,
+        }
+    )
+    _write_manifest(root, manifest)
+
+    if previous and not incremental:
+        current = {part["path"] for part in manifest["parts"]}
+        for part in previous["parts"]:
+            if part["path"] not in current:
+                shutil.rmtree(root / part["path"], ignore_errors=True)
+    return stats
+
+
+@dataclass
+class SnapshotPart:
+    """Memory-mapped arrays of one part of a snapshot."""
+
+    year: Optional[int]
+    ids: np.ndarray
+    updated_at: np.ndarray
+    normalized_titles: StringColumn
+    author_ids: np.ndarray
+    batch: PaperBatch
+    # Positions of the papers not superseded by a later part
+    live: np.ndarray = field(default=None)
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot written by :func:`export_snapshot`.
+
+    Example:
+        snapshot = Snapshot.open("data/snapshot", years=range(2015, 2025))
+        for paper_id, title, abstract in snapshot.rows("title", "abstract"):
+            ...
+    """
+
+    def __init__(self, manifest: dict, parts: List[SnapshotPart]):
+        self.manifest = manifest
+        self.parts = parts
+
+    @classmethod
+    def open(
+        cls, path: str, years: Optional[Iterable[Optional[int]]] = None
+    ) -> "Snapshot":
+        """
+        Memory-map a snapshot.
+
+        Args:
+            path: Snapshot directory
+            years: Only read the partitions of these years, None for papers
+                without a year; all partitions if omitted
+
+        Returns:
+            Snapshot: The snapshot
+
+        Raises:
+            FileNotFoundError: If there is no snapshot at ``path``
+        """
+        root = Path(path)
+        manifest = _read_manifest(root)
+        if manifest is None:
+            raise FileNotFoundError(f"No snapshot at {path}")
+
+        parts = []
+        for entry in manifest["parts"]:
+            arrays = {
+                file.name[: -len(".npy")]: np.load(file, mmap_mode="r")
+                for file in (root / entry["path"]).glob("*.npy")
+            }
+            parts.append(
+                SnapshotPart(
+                    year=entry["year"],
+                    ids=arrays.pop("ids"),
+                    updated_at=arrays.pop("updated_at"),
+                    normalized_titles=StringColumn.from_arrays(
+                        arrays, "normalized_title"
+                    ),
+                    author_ids=arrays.pop("author_ids"),
+                    batch=PaperBatch.from_arrays(arrays),
+                )
+            )
+
+        # Later parts hold newer copies of papers exported before
+        seen = np.empty(0, dtype=np.int64)
+        for part in reversed(parts):
+            if len(manifest["exports"]) > 1:
+                part.live = np.flatnonzero(~np.isin(part.ids, seen))
+                seen = np.concatenate([seen, part.ids])
+            else:
+                part.live = np.arange(len(part.ids))
+
+        if years is not None:
+            wanted = set(years)
+            parts = [part for part in parts if part.year in wanted]
+        return cls(manifest, parts)
+
+    def __len__(self) -> int:
+        return sum(len(part.live) for part in self.parts)
+
+    @property
+    def high_water(self) -> Optional[datetime]:
+        """Latest ``updated_at`` of the exported papers."""
+        high_water = self.manifest["high_water"]
+        return datetime.fromisoformat(high_water) if high_water else None
+
+    def papers(self) -> Iterator[Tuple[int, PaperView]]:
+        """Yield ``(id, paper)`` for every paper, as views into the arrays."""
+        for part in self.parts:
+            for position in part.live:
+                yield int(part.ids[position]), part.batch[int(position)]
+
+    def rows(self, *fields: str) -> Iterator[tuple]:
+        """
+        Yield ``(id, *values)`` for every paper, decoding whole columns at a
+        time, which is much faster than reading them through :meth:`papers`.
+
+        Args:
+            *fields: Paper fields, or ``"normalized_title"``
+
+        Returns:
+            Iterator[tuple]: One row per paper
+        """
+        for part in self.parts:
+            columns = [part.ids.tolist()]
+            for name in fields:
+                column = (
+                    part.normalized_titles
+                    if name == "normalized_title"
+                    else part.batch.columns[name]
+                )
+                columns.append(column.to_list())
+            if len(part.live) == len(part.ids):
+                yield from zip(*columns)
+            else:
+                for position in part.live.tolist():
+                    yield tuple(column[position] for column in columns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the papers to a columnar snapshot for offline jobs"
+    )
+    parser.add_argument("path", help="Snapshot directory")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rewrite the snapshot instead of adding the papers updated since",
+    )
+    parser.add_argument("--chunk-size", type=int, default=SNAPSHOT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = next(get_db())
+    try:
+        stats = export_snapshot(db, args.path, args.full, args.chunk_size)
+    finally:
+        db.close()
+    print(
+        f"Wrote {stats.papers} papers in {stats.parts} parts "
+        f"({'full' if stats.full else 'incremental'}) to {args.path} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
@@ -0,0 +1,217 @@
+"""
+Fast fuzzy matching of paper titles.
+
+Titles are normalized and broken into character trigrams; two titles are
+compared with the Sørensen–Dice coefficient of their trigram sets,
+``2|A ∩ B| / (|A| + |B|)``. Set intersection runs in C and the trigram sets are
+cached, so scoring is linear in title length rather than quadratic like
+``difflib.SequenceMatcher``. :class:`TitleMatcher` adds an inverted trigram
+index that scores a title against a whole corpus with a few NumPy operations.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from research_assistant.normalization import normalize_title
+
+# Titles at least this similar are considered the same paper
+SIMILARITY_THRESHOLD = 0.8
+
+NGRAM_SIZE = 3
+
+
+@lru_cache(maxsize=65536)
+def title_ngrams(title: str) -> FrozenSet[str]:
+    """
+    Character trigrams of a normalized, space-padded title.
+
+    Args:
+        title: Paper title
+
+    Returns:
+        FrozenSet[str]: Distinct trigrams
+    """
+    padded = f" {normalize_title(title)} "
+    if len(padded) < NGRAM_SIZE:
+        return frozenset((padded,))
+    return frozenset(map("".join, zip(padded, padded[1:], padded[2:])))
+
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def title_similarity(title1: str, title2: str) -> float:
+    """
+    Similarity of two titles between 0 and 1.
+
+    Args:
+        title1: First title
+        title2: Second title
+
+    Returns:
+        float: Dice coefficient of the titles' trigram sets
+    """
+    return _dice(title_ngrams(title1), title_ngrams(title2))
+
+
+def score_titles(title: str, candidates: Iterable[str]) -> List[float]:
+    """
+    Score every candidate title against ``title``.
+
+    Args:
+        title: Title being looked for
+        candidates: Candidate titles
+
+    Returns:
+        List[float]: Similarity of each candidate, in order
+    """
+    grams = title_ngrams(title)
+    return [_dice(grams, title_ngrams(candidate)) for candidate in candidates]
+
+
+def best_match(
+    title: str, candidates: Sequence[str], threshold: float = SIMILARITY_THRESHOLD
+) -> Optional[Tuple[int, float]]:
+    """
+    Find the candidate most similar to ``title``.
+
+    Args:
+        title: Title being looked for
+        candidates: Candidate titles
+        threshold: Minimum similarity for a match
+
+    Returns:
+        Optional[Tuple[int, float]]: Index and similarity of the best candidate,
+        or None if no candidate reaches the threshold
+    """
+    scores = score_titles(title, candidates)
+    if not scores:
+        return None
+    best = max(range(len(scores)), key=scores.__getitem__)
+    if scores[best] < threshold:
+        return None
+    return best, scores[best]
+
+
+class TitleMatcher:
+    """
+    Inverted trigram index for matching titles against a local corpus.
+
+    Each trigram maps to the array of corpus positions containing it. Matching
+    concatenates the query's posting arrays and counts them with
+    ``np.bincount``, which yields the shared-trigram count for every corpus
+    title at once; Dice scores for the whole corpus follow from one vectorized
+    expression.
+    """
+
+    def __init__(self, titles: Iterable[str] = ()):
+        """
+        Args:
+            titles: Initial corpus titles
+        """
+        self.titles: List[str] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        self._size_array: Optional[np.ndarray] = None
+        self.add_many(titles)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def add(self, title: str) -> int:
+        """
+        Add a title to the corpus.
+
+        Args:
+            title: Title to index
+
+        Returns:
+            int: Position of the title in the corpus
+        """
+        index = len(self.titles)
+        grams = title_ngrams(title)
+        self.titles.append(title)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(index)
+        self._arrays = None
+        return index
+
+    def add_many(self, titles: Iterable[str]) -> None:
+        for title in titles:
+            self.add(title)
+
+    def freeze(self) -> Dict[str, np.ndarray]:
+        """
+        Build (or reuse) the array form of the index after additions.
+
+        Happens on the first match after an addition; call it explicitly to do
+        the work up front, e.g. before forking worker processes.
+        """
+        if self._arrays is None:
+            self._arrays = {
+                gram: np.asarray(positions, dtype=np.int32)
+                for gram, positions in self._postings.items()
+            }
+            self._size_array = np.asarray(self._sizes, dtype=np.float32)
+        return self._arrays
+
+    def scores(self, title: str) -> np.ndarray:
+        """
+        Similarity of ``title`` to every corpus title.
+
+        Args:
+            title: Title being looked for
+
+        Returns:
+            np.ndarray: Dice similarity per corpus position
+        """
+        arrays = self.freeze()
+        grams = title_ngrams(title)
+        postings = [arrays[gram] for gram in grams if gram in arrays]
+        if not postings:
+            return np.zeros(len(self.titles), dtype=np.float32)
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.titles))
+        return 2 * shared / (len(grams) + self._size_array)
+
+    def match(
+        self, title: str, threshold: float = SIMILARITY_THRESHOLD
+    ) -> Optional[Tuple[int, float]]:
+        """
+        Find the corpus title most similar to ``title``.
+
+        Args:
+            title: Title being looked for
+            threshold: Minimum similarity for a match
+
+        Returns:
+            Optional[Tuple[int, float]]: Corpus position and similarity of the
+            best match, or None if nothing reaches the threshold
+        """
+        if not self.titles:
+            return None
+        scores = self.scores(title)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        return best, float(scores[best])
+
+    def match_many(
+        self, titles: Iterable[str], threshold: float = SIMILARITY_THRESHOLD
+    ) -> List[Optional[Tuple[int, float]]]:
+        """
+        Match a batch of titles, e.g. a whole CSV, against the corpus.
+
+        Args:
+            titles: Titles being looked for
+            threshold: Minimum similarity for a match
+
+        Returns:
+            List[Optional[Tuple[int, float]]]: One result per title, in order
+        """
+        return [self.match(title, threshold) for title in titles]
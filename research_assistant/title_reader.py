@@ -0,0 +1,181 @@
+"""
+Streaming, chunked reading of paper titles from large CSV files.
+
+Titles are read in fixed-size batches, normalized (optionally in a process
+pool) and deduplicated on their normalized form before any database or API
+work. Inputs may be plain, gzip (``.gz``) or zstd (``.zst``) compressed files,
+or ``-`` for stdin. Memory is bounded by the batch size plus an 8-byte digest
+per distinct title seen.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import IO, Callable, Iterable, Iterator, List, Set, Tuple, TypeVar
+
+from research_assistant.normalization import normalize_title
+
+DEFAULT_BATCH_SIZE = 10_000
+TITLE_COLUMN = "Title"
+
+# (title as written in the file, normalized title)
+TitleBatch = List[Tuple[str, str]]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@contextmanager
+def open_text(path: str) -> Iterator[IO[str]]:
+    """
+    Open a text file for reading, decompressing it based on its extension.
+
+    Args:
+        path: File path, or "-" for stdin
+
+    Yields:
+        IO[str]: UTF-8 text stream suitable for the csv module
+    """
+    if path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        try:
+            yield stream
+        finally:
+            # Leave stdin open for the rest of the process
+            stream.detach()
+    elif path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            yield f
+    elif path.endswith((".zst", ".zstd")):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "Reading zstd-compressed files requires the zstandard package"
+            ) from e
+        with open(path, "rb") as raw:
+            reader = zstandard.ZstdDecompressor().stream_reader(raw)
+            with io.TextIOWrapper(reader, encoding="utf-8", newline="") as f:
+                yield f
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield f
+
+
+def iter_title_chunks(
+    path: str, batch_size: int = DEFAULT_BATCH_SIZE, column: str = TITLE_COLUMN
+) -> Iterator[List[str]]:
+    """
+    Read the non-empty values of one CSV column in chunks.
+
+    Args:
+        path: CSV file path, or "-" for stdin
+        batch_size: Titles per chunk
+        column: Header of the title column
+
+    Yields:
+        List[str]: Up to ``batch_size`` titles
+    """
+    with open_text(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if column not in header:
+            raise ValueError(f"{path} has no {column!r} column")
+        index = header.index(column)
+
+        chunk: List[str] = []
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                chunk.append(row[index])
+                if len(chunk) >= batch_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+
+def normalize_titles(titles: List[str]) -> TitleBatch:
+    """Pair titles with their normalized forms, dropping empty normalized titles."""
+    pairs = ((title, normalize_title(title)) for title in titles)
+    return [(title, normalized) for title, normalized in pairs if normalized]
+
+
+def bounded_map(
+    executor: Executor, fn: Callable[[T], R], items: Iterable[T], prefetch: int
+) -> Iterator[R]:
+    """
+    Like ``executor.map``, but submits at most ``prefetch`` items ahead.
+
+    ``Executor.map`` consumes its whole input up front, which would read an
+    entire multi-gigabyte file into memory.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= prefetch:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class TitleDeduplicator:
+    """Drops titles whose normalized form was already seen."""
+
+    def __init__(self):
+        # 8-byte digests rather than the titles themselves keep memory small
+        self._seen: Set[bytes] = set()
+        self.duplicates = 0
+
+    def __call__(self, batch: TitleBatch) -> TitleBatch:
+        unique = []
+        for title, normalized in batch:
+            key = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+            if key in self._seen:
+                self.duplicates += 1
+                continue
+            self._seen.add(key)
+            unique.append((title, normalized))
+        return unique
+
+
+def read_title_batches(
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    column: str = TITLE_COLUMN,
+    workers: int = 0,
+    dedupe: bool = True,
+) -> Iterator[TitleBatch]:
+    """
+    Stream batches of normalized titles from a CSV file.
+
+    Args:
+        path: CSV file path (optionally .gz or .zst compressed), or "-" for stdin
+        batch_size: Titles read per batch; deduplicated batches may be smaller
+        column: Header of the title column
+        workers: Normalize batches in this many processes; 0 or 1 normalizes
+            in the calling process
+        dedupe: Drop titles whose normalized form appeared earlier in the file
+
+    Yields:
+        TitleBatch: Non-empty lists of (title, normalized title) pairs
+    """
+    chunks = iter_title_chunks(path, batch_size, column)
+    deduplicate = TitleDeduplicator() if dedupe else None
+
+    def finish(batches: Iterable[TitleBatch]) -> Iterator[TitleBatch]:
+        for batch in batches:
+            if deduplicate is not None:
+                batch = deduplicate(batch)
+            if batch:
+                yield batch
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            yield from finish(bounded_map(pool, normalize_titles, chunks, workers * 2))
+    else:
+        yield from finish(map(normalize_titles, chunks))
@@ -1,15 +1,48 @@
+import json
+from contextlib import contextmanager
+
+import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from unittest.mock import AsyncMock, patch
 
-from research_assistant.db.models import DBPaper
+from research_assistant.db.config import get_async_db
+from research_assistant.db.models import Base, DBPaper
+from research_assistant.db.service import (
+    remove_papers_stored_listener,
+    store_papers_bulk,
+)
+from research_assistant.embedding_index import build_embedding_index
+from research_assistant.models import Author, Paper
+from research_assistant.rate_limit import TokenBucket
+from research_assistant.response_cache import get_response_cache
+from research_assistant.semantic_scholar_stub import (
+    StubSemanticScholarServer,
+    make_stub_paper,
+)
 from main import app
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def response_cache():
+    # Every test starts with an empty response cache
+    get_response_cache.cache_clear()
+    yield
+    cache = get_response_cache()
+    if cache is not None:
+        remove_papers_stored_listener(cache.invalidate_papers)
+    get_response_cache.cache_clear()
+
+
 def test_get_papers_empty():
     # Test that the /papers endpoint returns an empty list when there are no papers
-    with patch("api.papers._query_papers", return_value=[]):
+    with patch("api.papers._query_papers", new=AsyncMock(return_value=[])):
         response = client.get("/papers")
         assert response.status_code == 200
         assert response.json() == []
@@ -32,10 +65,385 @@ def test_get_papers_with_data():
     )
 
     # Patch the _query_papers function in api.papers so that it returns our fake paper
-    with patch("api.papers._query_papers", return_value=[fake_paper]):
+    with patch("api.papers._query_papers", new=AsyncMock(return_value=[fake_paper])):
         response = client.get("/papers")
         assert response.status_code == 200
         data = response.json()
         assert len(data) >= 1
         found = any(item["title"] == "Test Paper" for item in data)
         assert found
+
+
+@pytest.fixture
+def db_client(tmp_path):
+    # Serve the API from a SQLite file through aiosqlite, seeded synchronously
+    path = tmp_path / "papers.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    # NullPool: TestClient may run each request on a different event loop
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=NullPool
+    )
+    factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with Session(engine) as db, patch(
+        "api.papers.get_async_sessionmaker", return_value=factory
+    ):
+        yield db
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+@contextmanager
+def count_queries():
+    # Statements sent to any database while the block runs
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _selects(statements):
+    return [s for s in statements if s.lstrip().startswith("SELECT")]
+
+
+def _store(db, count):
+    store_papers_bulk(
+        db,
+        [
+            Paper(title=f"Paper {i}", authors=[], abstract="x" * 100, year=2000 + i)
+            for i in range(count)
+        ],
+    )
+
+
+def test_get_papers_pages_with_cursor(db_client):
+    _store(db_client, 5)
+
+    first = client.get("/papers", params={"limit": 2})
+    second = client.get(
+        "/papers", params={"limit": 2, "after": first.headers["X-Next-Cursor"]}
+    )
+    last = client.get(
+        "/papers", params={"limit": 2, "after": second.headers["X-Next-Cursor"]}
+    )
+
+    assert [p["title"] for p in first.json()] == ["Paper 0", "Paper 1"]
+    assert [p["title"] for p in second.json()] == ["Paper 2", "Paper 3"]
+    assert [p["title"] for p in last.json()] == ["Paper 4"]
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_get_papers_projects_fields(db_client):
+    _store(db_client, 3)
+
+    response = client.get("/papers", params={"fields": "title,year", "limit": 2})
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "title": "Paper 0", "year": 2000},
+        {"id": 2, "title": "Paper 1", "year": 2001},
+    ]
+    assert response.headers["X-Next-Cursor"] == "2"
+
+
+def test_get_papers_rejects_unknown_fields(db_client):
+    response = client.get("/papers", params={"fields": "title,password"})
+
+    assert response.status_code == 400
+
+
+def test_export_papers_streams_ndjson(db_client):
+    _store(db_client, 3)
+
+    response = client.get("/papers/export", params={"fields": "title"})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"id": i + 1, "title": f"Paper {i}"} for i in range(3)]
+
+
+def test_get_paper_by_id(db_client):
+    _store(db_client, 2)
+
+    response = client.get("/papers/2")
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Paper 1"
+
+
+def test_get_paper_missing(db_client):
+    response = client.get("/papers/1")
+
+    assert response.status_code == 404
+
+
+def test_get_paper_is_cached_with_etag(db_client):
+    _store(db_client, 2)
+
+    first = client.get("/papers/2")
+    second = client.get("/papers/2")
+    revalidated = client.get(
+        "/papers/2", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    other = client.get("/papers/1", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.content == first.content
+    assert second.json()["title"] == "Paper 1"
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert other.status_code == 200
+    metrics = client.get("/metrics/cache").json()
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 2
+    assert metrics["hit_ratio"] == 0.5
+    assert metrics["not_modified"] == 1
+
+
+def test_storing_papers_invalidates_cached_listings(db_client):
+    _store(db_client, 2)
+    first = client.get("/papers", params={"fields": "title"})
+    client.get("/papers", params={"fields": "title"})
+
+    store_papers_bulk(db_client, [Paper(title="Paper 2", authors=[])])
+    after = client.get(
+        "/papers",
+        params={"fields": "title"},
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+
+    assert [p["title"] for p in first.json()] == ["Paper 0", "Paper 1"]
+    assert after.status_code == 200
+    assert after.headers["X-Cache"] == "MISS"
+    assert [p["title"] for p in after.json()] == ["Paper 0", "Paper 1", "Paper 2"]
+    assert after.headers["ETag"] != first.headers["ETag"]
+
+
+def test_get_papers_batch_in_request_order_with_one_paper_query(db_client):
+    store_papers_bulk(
+        db_client,
+        [
+            Paper(title=f"Paper {i}", authors=[], semantic_scholar_id=f"s2-{i}")
+            for i in range(4)
+        ],
+    )
+
+    with count_queries() as statements:
+        response = client.post(
+            "/papers/batch",
+            json={
+                "ids": [3, 99, 1],
+                "titles": ["  paper 2!", "Unknown"],
+                "semantic_scholar_ids": ["s2-0", "s2-missing"],
+            },
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [p and p["title"] for p in data["ids"]] == ["Paper 2", None, "Paper 0"]
+    assert [p and p["title"] for p in data["titles"]] == ["Paper 2", None]
+    assert [p and p["id"] for p in data["semantic_scholar_ids"]] == [1, None]
+    assert data["fetched"] == 0
+    # One query for the papers and one for their authors
+    assert len(_selects(statements)) == 2
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    # Point the API at a stub, with a quota that does not slow the tests down
+    def serve(**options):
+        stub = StubSemanticScholarServer(**options)
+        monkeypatch.setenv("SEMANTIC_SCHOLAR_API_URL", stub.url)
+        return stub
+
+    with patch(
+        "api.papers._semantic_scholar_limiter", return_value=TokenBucket(10_000)
+    ), patch("research_assistant.paper_search.get_search_cache", return_value=None):
+        yield serve
+
+
+def test_get_papers_batch_fetches_missing_papers(db_client, monkeypatch):
+    _store(db_client, 1)
+    known = make_stub_paper("Known by id")
+    with StubSemanticScholarServer(papers=[known]) as stub, patch(
+        "research_assistant.paper_search.get_search_cache", return_value=None
+    ):
+        monkeypatch.setenv("SEMANTIC_SCHOLAR_API_URL", stub.url)
+        response = client.post(
+            "/papers/batch",
+            json={
+                "titles": ["Paper 0", "Searched paper"],
+                "semantic_scholar_ids": [known["paperId"], "unknown"],
+                "fetch_missing": True,
+            },
+        )
+    second = client.post("/papers/batch", json={"titles": ["Searched paper"]})
+
+    data = response.json()
+    assert [p["title"] for p in data["titles"]] == ["Paper 0", "Searched paper"]
+    assert data["semantic_scholar_ids"][0]["title"] == "Known by id"
+    assert data["semantic_scholar_ids"][1] is None
+    assert data["fetched"] == 2
+    assert second.json()["titles"][0]["id"] == data["titles"][1]["id"]
+
+
+def test_get_papers_batch_limits_keys(db_client):
+    response = client.post("/papers/batch", json={"ids": list(range(1001))})
+
+    assert response.status_code == 400
+
+
+def _store_with_authors(db, count):
+    store_papers_bulk(
+        db,
+        [
+            Paper(
+                title=f"Paper {i}",
+                authors=[Author(name=f"Author {i}"), Author(name="Shared Author")],
+            )
+            for i in range(count)
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "method, url, body",
+    [
+        ("GET", "/papers?limit={count}", None),
+        ("GET", "/papers?limit={count}&fields=title,authors", None),
+        ("GET", "/papers/{count}", None),
+        ("POST", "/papers/batch", "ids"),
+        ("GET", "/authors/1/papers?limit={count}", None),
+    ],
+)
+def test_author_loading_uses_constant_queries(db_client, method, url, body):
+    counts = []
+    for count in (2, 20):
+        get_response_cache().clear()
+        _store_with_authors(db_client, count)
+        with count_queries() as statements:
+            response = client.request(
+                method,
+                url.format(count=count),
+                json={"ids": list(range(1, count + 1))} if body else None,
+            )
+        assert response.status_code == 200
+        counts.append(len(_selects(statements)))
+
+    assert counts[0] == counts[1] <= 2
+
+
+def test_papers_include_authors(db_client):
+    _store_with_authors(db_client, 2)
+
+    paper = client.get("/papers/2").json()
+    projected = client.get("/papers", params={"fields": "authors"}).json()
+
+    assert sorted(a["name"] for a in paper["authors"]) == ["Author 1", "Shared Author"]
+    assert [sorted(a["name"] for a in p["authors"]) for p in projected] == [
+        ["Author 0", "Shared Author"],
+        ["Author 1", "Shared Author"],
+    ]
+
+
+def test_get_author_papers(db_client):
+    _store_with_authors(db_client, 3)
+    shared_id = next(
+        a["id"]
+        for a in client.get("/papers/1").json()["authors"]
+        if a["name"] == "Shared Author"
+    )
+
+    first = client.get(f"/authors/{shared_id}/papers", params={"limit": 2})
+    rest = client.get(
+        f"/authors/{shared_id}/papers",
+        params={"limit": 2, "after": first.headers["X-Next-Cursor"]},
+    )
+    missing = client.get("/authors/999/papers")
+
+    assert [p["title"] for p in first.json()] == ["Paper 0", "Paper 1"]
+    assert [p["title"] for p in rest.json()] == ["Paper 2"]
+    assert missing.status_code == 404
+
+
+def test_get_similar_papers(db_client, tmp_path):
+    store_papers_bulk(
+        db_client,
+        [
+            Paper(title=title, authors=[])
+            for title in [
+                "Deep neural networks for image classification",
+                "Protein structure prediction with sequence alignment",
+                "Training deep neural networks with dropout",
+                "Sequence alignment of protein families",
+            ]
+        ],
+    )
+    index = build_embedding_index(db_client, str(tmp_path / "embeddings"), dim=2)
+
+    with patch("api.papers.get_embedding_index", return_value=index):
+        response = client.get("/papers/2/similar", params={"k": 1})
+        missing = client.get("/papers/99/similar")
+
+    assert response.status_code == 200
+    (similar,) = response.json()
+    assert similar["paper"]["title"] == "Sequence alignment of protein families"
+    assert 0 < similar["similarity"] <= 1
+    assert missing.status_code == 404
+
+
+def test_get_similar_papers_requires_an_index(db_client):
+    with patch("api.papers.get_embedding_index", return_value=None):
+        response = client.get("/papers/1/similar")
+
+    assert response.status_code == 503
+
+
+def test_get_papers_batch_reports_failed_lookups_as_misses(db_client, stub_api):
+    with stub_api(error_statuses=[400]):
+        response = client.post(
+            "/papers/batch",
+            json={"titles": ["First paper", "Second paper"], "fetch_missing": True},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["fetched"], data["not_fetched"]) == (1, 1)
+    assert sorted(p["title"] for p in data["titles"] if p) in (
+        ["First paper"],
+        ["Second paper"],
+    )
+    assert None in data["titles"]
+
+
+def test_get_papers_batch_caps_fetched_keys(db_client, stub_api, monkeypatch):
+    monkeypatch.setattr("api.papers.FETCH_MAX_KEYS", 2)
+    known = make_stub_paper("Known by id")
+    with stub_api(papers=[known]) as stub:
+        response = client.post(
+            "/papers/batch",
+            json={
+                "titles": ["Paper A", "Paper B"],
+                "semantic_scholar_ids": [known["paperId"]],
+                "fetch_missing": True,
+            },
+        )
+
+    data = response.json()
+    assert (data["fetched"], data["not_fetched"]) == (2, 1)
+    assert data["semantic_scholar_ids"][0]["title"] == "Known by id"
+    assert [p and p["title"] for p in data["titles"]] == ["Paper A", None]
+    assert stub.request_count == 2
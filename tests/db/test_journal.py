@@ -0,0 +1,104 @@
+from research_assistant.db.journal import (
+    ERROR,
+    NOT_FOUND,
+    PENDING,
+    SKIPPED,
+    STORED,
+    failed_titles,
+    finish_import_job,
+    job_counts,
+    latest_import_job,
+    record_states,
+    reset_failed_items,
+    start_import_job,
+    unfinished_items,
+)
+from research_assistant.db.models import DBImportItem, DBPaper
+from research_assistant.normalization import normalize_title
+
+
+def _batches(*titles):
+    return [[(title, normalize_title(title)) for title in titles]]
+
+
+def test_start_import_job_journals_distinct_titles(db):
+    job = start_import_job(db, "papers.csv", _batches("Paper A", "paper a!", "Paper B"))
+
+    assert job.status == "running"
+    assert job_counts(db, job) == {PENDING: 2}
+    assert [item.title for chunk in unfinished_items(db, job) for item in chunk] == [
+        "Paper A",
+        "Paper B",
+    ]
+
+
+def test_start_import_job_skips_stored_papers(db):
+    paper = DBPaper(title="Paper A")
+    db.add(paper)
+    db.commit()
+
+    job = start_import_job(db, "papers.csv", _batches("PAPER A", "Paper B"))
+
+    assert job_counts(db, job) == {PENDING: 1, SKIPPED: 1}
+    skipped = db.query(DBImportItem).filter_by(state=SKIPPED).one()
+    assert (skipped.title, skipped.paper_id) == ("PAPER A", paper.id)
+
+
+def test_start_import_job_resumes_without_reading_titles(db):
+    job = start_import_job(db, "papers.csv", _batches("Paper A"))
+
+    def titles():
+        raise AssertionError("titles should not be read when resuming")
+        yield
+
+    assert start_import_job(db, "papers.csv", titles()).id == job.id
+    assert start_import_job(db, "other.csv", _batches("Paper C")).id != job.id
+    assert latest_import_job(db).source == "other.csv"
+
+
+def test_record_states_and_finish(db):
+    job = start_import_job(db, "papers.csv", _batches("Paper A", "Paper B", "Paper C"))
+    a, b, c = next(unfinished_items(db, job))
+
+    record_states(
+        db,
+        [
+            {"id": a.id, "state": STORED},
+            {"id": b.id, "state": NOT_FOUND, "attempts": 1},
+            {"id": c.id, "state": ERROR, "attempts": 1, "error": "x" * 5000},
+        ],
+    )
+
+    assert [item.title for chunk in unfinished_items(db, job) for item in chunk] == [
+        "Paper C"
+    ]
+    assert list(unfinished_items(db, job, max_attempts=1)) == []
+    assert finish_import_job(db, job) == {STORED: 1, NOT_FOUND: 1, ERROR: 1}
+    assert job.status == "running"
+    assert failed_titles(db, job) == ["Paper B", "Paper C"]
+
+    finish_import_job(db, job, max_attempts=1)
+    assert job.status == "completed"
+
+
+def test_reset_failed_items(db):
+    job = start_import_job(db, "papers.csv", _batches("Paper A", "Paper B"))
+    a, b = next(unfinished_items(db, job))
+    record_states(
+        db,
+        [
+            {"id": a.id, "state": STORED},
+            {"id": b.id, "state": NOT_FOUND, "attempts": 3},
+        ],
+    )
+    finish_import_job(db, job)
+    assert job.status == "completed"
+
+    assert reset_failed_items(db, job) == 1
+
+    assert job.status == "running"
+    assert [
+        (item.title, item.attempts)
+        for chunk in unfinished_items(db, job)
+        for item in chunk
+    ] == [("Paper B", 0)]
@@ -0,0 +1,116 @@
+from research_assistant.db.models import DBAuthor, DBPaper, paper_authors
+from research_assistant.db.service import (
+    AuthorKeyCache,
+    add_papers_stored_listener,
+    remove_papers_stored_listener,
+    store_paper,
+    store_papers_bulk,
+)
+from research_assistant.models import Author, Paper
+
+
+def _paper(title, *authors, semantic_scholar_id=None):
+    return Paper(
+        title=title,
+        authors=[Author(name=name) for name in authors],
+        year=2024,
+        semantic_scholar_id=semantic_scholar_id,
+    )
+
+
+def test_store_papers_bulk_inserts_papers_authors_and_links(db):
+    papers = [
+        _paper("Paper A", "Alice", "Bob", semantic_scholar_id="a"),
+        _paper("Paper B", "Bob", "Carol", semantic_scholar_id="b"),
+        _paper("Paper A", "Alice", "Bob", semantic_scholar_id="a"),
+    ]
+
+    ids = store_papers_bulk(db, papers)
+
+    assert ids[0] == ids[2]
+    assert len(set(ids)) == 2
+    assert db.query(DBPaper).count() == 2
+    assert sorted(a.name for a in db.query(DBAuthor)) == ["Alice", "Bob", "Carol"]
+    assert db.query(paper_authors).count() == 4
+    paper_b = db.get(DBPaper, ids[1])
+    assert paper_b.semantic_scholar_id == "b"
+    assert paper_b.created_at is not None
+    assert sorted(a.name for a in paper_b.authors) == ["Bob", "Carol"]
+
+
+def test_store_papers_bulk_reuses_existing_papers_and_authors(db):
+    existing = store_paper(db, _paper("Paper A", "Alice"))
+
+    ids = store_papers_bulk(
+        db, [_paper("Paper A", "Alice"), _paper("Paper C", "Alice")]
+    )
+
+    assert ids[0] == existing.id
+    assert db.query(DBPaper).count() == 2
+    assert db.query(DBAuthor).count() == 1
+
+
+def test_authors_are_matched_on_normalized_name(db):
+    store_paper(db, _paper("Paper A", "José Núñez", "J. R. R. Tolkien"))
+    cache = AuthorKeyCache()
+
+    store_papers_bulk(db, [_paper("Paper B", "Jose Nunez", "Nunez, Jose")], cache)
+    store_papers_bulk(db, [_paper("Paper C", "JOSÉ NÚÑEZ", "J.R.R. Tolkien")], cache)
+
+    assert sorted(a.name for a in db.query(DBAuthor)) == [
+        "J. R. R. Tolkien",
+        "José Núñez",
+    ]
+    assert db.query(paper_authors).count() == 5
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_store_papers_bulk_skips_conflicting_semantic_scholar_ids(db):
+    store_papers_bulk(db, [_paper("Original", semantic_scholar_id="dup")])
+
+    ids = store_papers_bulk(db, [_paper("Renamed", semantic_scholar_id="dup")])
+
+    assert ids == [None]
+    assert db.query(DBPaper).count() == 1
+
+
+def test_store_paper_persists_the_papers_semantic_scholar_id(db):
+    stored = store_paper(db, _paper("Original", semantic_scholar_id="s2"))
+
+    renamed = store_paper(db, _paper("Renamed", semantic_scholar_id="s2"))
+
+    assert stored.semantic_scholar_id == "s2"
+    assert renamed.id == stored.id
+    assert db.query(DBPaper).count() == 1
+
+
+def test_store_papers_bulk_dedupes_on_normalized_title(db):
+    ids = store_papers_bulk(db, [_paper("Deep Learning."), _paper("deep  learning")])
+
+    assert ids[0] == ids[1]
+    assert db.query(DBPaper).one().normalized_title == "deep learning"
+
+
+def test_papers_stored_listeners_get_new_papers_only(db):
+    calls = []
+
+    def listener(paper_ids, papers):
+        calls.append((paper_ids, [paper.title for paper in papers]))
+
+    def failing(paper_ids, papers):
+        raise RuntimeError("listener failed")
+
+    existing = store_paper(db, _paper("Paper A"))
+    add_papers_stored_listener(failing)
+    add_papers_stored_listener(listener)
+    try:
+        ids = store_papers_bulk(db, [_paper("Paper A"), _paper("Paper B")])
+        store_paper(db, _paper("Paper B"))
+        paper_c = store_paper(db, _paper("Paper C"))
+    finally:
+        remove_papers_stored_listener(failing)
+        remove_papers_stored_listener(listener)
+
+    assert ids[0] == existing.id
+    assert calls == [([ids[1]], ["Paper B"]), ([paper_c.id], ["Paper C"])]
@@ -0,0 +1,74 @@
+from research_assistant.author_disambiguation import (
+    disambiguate_authors,
+    load_author_graph,
+    names_compatible,
+)
+from research_assistant.db.models import DBAuthor
+from research_assistant.db.service import store_papers_bulk
+from research_assistant.models import Author, Paper
+
+
+def _papers(*author_lists):
+    return [
+        Paper(title=f"Paper {i}", authors=[Author(name=name) for name in names])
+        for i, names in enumerate(author_lists)
+    ]
+
+
+def test_names_compatible_allows_initials_only():
+    assert names_compatible("j smith", "john smith")
+    assert names_compatible("j a smith", "john smith")
+    assert not names_compatible("jane smith", "john smith")
+    assert not names_compatible("j smith", "j smyth")
+
+
+def test_disambiguation_merges_variants_sharing_coauthors(db):
+    store_papers_bulk(
+        db,
+        _papers(
+            ["John Smith", "Ada Lovelace", "Alan Turing"],
+            ["J. Smith", "A. Lovelace", "Alan Turing", "Grace Hopper"],
+            # Shares co-authors but is on a paper with John Smith
+            ["John A Smith", "Ada Lovelace", "Alan Turing", "John Smith"],
+            # Compatible name, unrelated co-authors
+            ["J Smith Jr", "Edsger Dijkstra", "Barbara Liskov"],
+        ),
+    )
+
+    merges = disambiguate_authors(db)
+
+    names = {a.name for a in db.query(DBAuthor)}
+    assert "J. Smith" not in names and "A. Lovelace" not in names
+    assert {"John Smith", "John A Smith", "Ada Lovelace", "J Smith Jr"} <= names
+    assert len(merges) == 2
+    ada = db.query(DBAuthor).filter(DBAuthor.name == "Ada Lovelace").one()
+    assert sorted(p.title for p in ada.papers) == ["Paper 0", "Paper 1", "Paper 2"]
+
+
+def test_disambiguation_leaves_ambiguous_initials(db):
+    store_papers_bulk(
+        db,
+        _papers(
+            ["John Smith", "Ada Lovelace", "Alan Turing"],
+            ["J. Smith", "Ada Lovelace", "Alan Turing"],
+            ["Jane Smith", "Ada Lovelace", "Alan Turing"],
+        ),
+    )
+
+    assert disambiguate_authors(db) == {}
+
+
+def test_dry_run_leaves_authors_alone(db):
+    store_papers_bulk(
+        db,
+        _papers(
+            ["John Smith", "Ada Lovelace", "Alan Turing"],
+            ["J. Smith", "Ada Lovelace", "Alan Turing"],
+        ),
+    )
+
+    merges = disambiguate_authors(db, dry_run=True)
+
+    assert len(merges) == 1
+    assert db.query(DBAuthor).count() == 4
+    assert load_author_graph(db).coauthors.nnz == 8
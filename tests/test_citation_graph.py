@@ -0,0 +1,91 @@
+import asyncio
+import gzip
+
+from research_assistant.citation_graph import (
+    crawl_citations,
+    load_citation_graph,
+    load_edge_list,
+)
+from research_assistant.db.models import DBCitationCrawl, DBPaperCitation
+from research_assistant.semantic_scholar_client import AsyncSemanticScholarClient
+from research_assistant.semantic_scholar_stub import StubSemanticScholarServer
+
+# A cites B and C, D cites A, B cites E
+EDGES = [("A", "B"), ("A", "C"), ("D", "A"), ("B", "E")]
+
+
+def _stub_papers():
+    papers = {
+        paper_id: {"paperId": paper_id, "title": f"Paper {paper_id}"}
+        for paper_id in "ABCDE"
+    }
+    for paper in papers.values():
+        paper["references"] = [
+            {"paperId": cited} for citing, cited in EDGES if citing == paper["paperId"]
+        ]
+        paper["citations"] = [
+            {"paperId": citing} for citing, cited in EDGES if cited == paper["paperId"]
+        ]
+    return list(papers.values())
+
+
+def _crawl(db, url, seeds, **kwargs):
+    async def crawl():
+        async with AsyncSemanticScholarClient(api_url=url) as client:
+            return await crawl_citations(db, seeds, client=client, **kwargs)
+
+    return asyncio.run(crawl())
+
+
+def _stored_edges(db):
+    return sorted(db.query(DBPaperCitation.citing_id, DBPaperCitation.cited_id).all())
+
+
+def test_crawl_citations_stores_the_seeds_edges(db):
+    with StubSemanticScholarServer(papers=_stub_papers()) as stub:
+        stats = _crawl(db, stub.url, ["A", "missing"])
+
+    assert _stored_edges(db) == [("A", "B"), ("A", "C"), ("D", "A")]
+    assert (stats.fetched, stats.not_found, stats.depth) == (1, 1, 1)
+    crawls = dict(db.query(DBCitationCrawl.semantic_scholar_id, DBCitationCrawl.found))
+    assert crawls == {"A": True, "missing": False}
+
+
+def test_crawl_citations_expands_to_depth_without_refetching(db):
+    with StubSemanticScholarServer(papers=_stub_papers()) as stub:
+        _crawl(db, stub.url, ["A"])
+        stats = _crawl(db, stub.url, ["A"], max_depth=2, batch_size=2)
+        request_count = stub.request_count
+
+    assert _stored_edges(db) == sorted(EDGES)
+    # A was crawled by the first run; B, C and D are fetched in two batches
+    assert (stats.skipped, stats.fetched) == (1, 3)
+    assert request_count == 3
+
+
+def test_load_citation_graph(db):
+    db.add_all(DBPaperCitation(citing_id=c, cited_id=d) for c, d in EDGES)
+    db.commit()
+
+    graph = load_citation_graph(db)
+
+    assert (graph.num_nodes, graph.num_edges) == (5, 4)
+    assert sorted(graph.references("A")) == ["B", "C"]
+    assert graph.citations("A") == ["D"]
+    assert graph.references("unknown") == []
+    assert graph.neighborhood("A") == {"B", "C", "D"}
+    assert graph.neighborhood("A", hops=2, direction="references") == {"B", "C", "E"}
+    assert graph.neighborhood("E", hops=3, direction="citations") == {"A", "B", "D"}
+
+
+def test_load_edge_list(tmp_path):
+    path = tmp_path / "citations.tsv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("cited_id\tciting_id\n")
+        f.writelines(f"{d}\t{c}\n" for c, d in EDGES)
+
+    graph = load_edge_list(str(path))
+
+    assert graph.num_edges == 4
+    assert sorted(graph.references("A")) == ["B", "C"]
+    assert graph.citations("E") == ["B"]
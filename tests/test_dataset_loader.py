@@ -0,0 +1,143 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select, text
+
+from research_assistant import dataset_loader
+from research_assistant.dataset_loader import (
+    DatasetFilter,
+    drop_deferred_indexes,
+    load_dataset,
+    read_dataset,
+    record_to_paper,
+    restore_deferred_indexes,
+)
+from research_assistant.db.models import DBAuthor, DBPaper
+
+DUMP = str(Path(__file__).parent / "fixtures" / "s2_papers.jsonl")
+
+
+def test_record_to_paper_maps_dataset_fields():
+    paper = record_to_paper(
+        {
+            "corpusid": 42,
+            "title": " A Paper ",
+            "authors": [{"authorId": "1", "name": "Ada Lovelace"}, {"name": ""}],
+            "venue": "ICML",
+            "year": 2020,
+            "citationcount": 3,
+            "referencecount": 7,
+            "isopenaccess": False,
+        }
+    )
+
+    assert paper.title == "A Paper"
+    assert [author.name for author in paper.authors] == ["Ada Lovelace"]
+    assert (paper.citation_count, paper.reference_count) == (3, 7)
+    assert paper.is_open_access is False
+    assert paper.semantic_scholar_id == "CorpusId:42"
+    assert (
+        record_to_paper({"paperId": "abc", "title": "X"}).semantic_scholar_id == "abc"
+    )
+    assert record_to_paper({"corpusid": 1, "title": ""}) is None
+
+
+def test_read_dataset_filters_by_venue_year_and_title():
+    def titles(dataset_filter):
+        return [
+            paper.title
+            for _, papers in read_dataset([DUMP], dataset_filter, batch_size=4)
+            for paper in papers
+        ]
+
+    assert len(titles(DatasetFilter())) == 8
+    assert titles(DatasetFilter(venues=frozenset({"neurips"}), min_year=2015)) == [
+        "Attention Is All You Need",
+        "Language Models are Few-Shot Learners",
+    ]
+    assert titles(DatasetFilter(titles=frozenset({"attention is all you need"}))) == [
+        "Attention Is All You Need",
+        "Attention is all you need.",
+    ]
+
+
+def test_load_dataset_stores_papers_and_authors(db, tmp_path):
+    compressed = tmp_path / "papers.jsonl.gz"
+    with open(DUMP, "rb") as src, gzip.open(compressed, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+    stats = load_dataset(db, [str(compressed)], batch_size=3)
+
+    assert (stats.records, stats.matched) == (9, 8)
+    # The two "Attention" records share a normalized title
+    assert stats.papers == 7
+    assert stats.authors == 13
+    paper = db.scalar(
+        select(DBPaper).where(DBPaper.normalized_title == "attention is all you need")
+    )
+    assert paper.semantic_scholar_id == "CorpusId:1001"
+    assert [author.name for author in paper.authors] == [
+        "Ashish Vaswani",
+        "Noam Shazeer",
+    ]
+    vinyals = db.scalar(select(DBAuthor).where(DBAuthor.name == "Oriol Vinyals"))
+    assert len(vinyals.papers) == 2
+
+    # Reloading the dump stores nothing new
+    again = load_dataset(db, [DUMP])
+    assert (again.papers, again.authors, again.links) == (0, 0, 0)
+
+
+def _secondary_indexes(db):
+    return set(
+        db.scalars(
+            text(
+                "SELECT indexname FROM pg_indexes WHERE tablename = 'paper_authors' "
+                "UNION SELECT conname FROM pg_constraint WHERE contype = 'f'"
+            )
+        )
+    )
+
+
+def test_deferred_indexes_survive_a_failed_load(pg_db, tmp_path):
+    restore_file = str(tmp_path / "deferred_indexes.json")
+    before = _secondary_indexes(pg_db)
+
+    # A load that dies before rebuilding leaves the restore file behind
+    drop_deferred_indexes(pg_db, restore_file)
+    assert _secondary_indexes(pg_db) < before
+    with pytest.raises(RuntimeError):
+        load_dataset(pg_db, [DUMP], restore_path=restore_file)
+
+    assert restore_deferred_indexes(pg_db, restore_file) > 0
+    assert _secondary_indexes(pg_db) == before
+    assert not (tmp_path / "deferred_indexes.json").exists()
+    assert restore_deferred_indexes(pg_db, restore_file) == 0
+
+    stats = load_dataset(pg_db, [DUMP], restore_path=restore_file)
+    assert stats.papers == 7
+    assert _secondary_indexes(pg_db) == before
+
+
+def test_load_dataset_survives_new_connections_between_batches(
+    pg_db, tmp_path, monkeypatch
+):
+    copy_batch = dataset_loader._copy_batch
+
+    def copy_then_recycle(db, papers):
+        counts = copy_batch(db, papers)
+        # Drop the pooled connection, as pool_recycle or a failed ping would
+        db.get_bind().dispose()
+        return counts
+
+    monkeypatch.setattr(dataset_loader, "_copy_batch", copy_then_recycle)
+    stats = load_dataset(
+        pg_db,
+        [DUMP],
+        batch_size=2,
+        restore_path=str(tmp_path / "deferred_indexes.json"),
+    )
+
+    assert (stats.papers, stats.authors) == (7, 13)
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from research_assistant import embedding_index
+from research_assistant.db.models import DBPaper
+from research_assistant.db.service import (
+    add_papers_stored_listener,
+    remove_papers_stored_listener,
+    store_papers_bulk,
+)
+from research_assistant.embedding_index import (
+    EmbeddingIndex,
+    build_embedding_index,
+    similar_papers,
+)
+from research_assistant.embeddings import TfidfSvdEmbedder
+from research_assistant.models import Paper
+
+TEXTS = [
+    "Deep neural networks for image classification",
+    "Training deep neural networks with dropout",
+    "Convolutional neural networks for image recognition",
+    "Protein structure prediction with sequence alignment",
+    "Sequence alignment of protein families",
+    "Gene expression and protein structure",
+    "Graph algorithms for shortest paths",
+    "Shortest paths in sparse graph algorithms",
+]
+
+
+class LookupEmbedder:
+    """Embeds the text "i" as row i of a fixed matrix."""
+
+    name = "lookup"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.dim = vectors.shape[1]
+
+    def embed(self, texts):
+        return self.vectors[[int(text) for text in texts]]
+
+
+def _clustered_vectors(count, dim=16, clusters=10, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=count)] + rng.normal(
+        scale=0.1, size=(count, dim)
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def test_tfidf_svd_embedder_groups_related_texts(tmp_path):
+    embedder = TfidfSvdEmbedder.fit(TEXTS, dim=3)
+
+    vectors = embedder.embed(TEXTS + ["protein alignment", "unrelated words"])
+
+    assert vectors.shape == (10, 3)
+    assert vectors.dtype == np.float32
+    # The closest texts are about proteins
+    assert set(np.argsort(-(vectors[:8] @ vectors[8]))[:3].tolist()) == {3, 4, 5}
+    assert not vectors[9].any()
+
+    embedder.save(str(tmp_path / "embedder.npz"))
+    loaded = TfidfSvdEmbedder.load(str(tmp_path / "embedder.npz"))
+    assert np.allclose(loaded.embed(TEXTS), vectors[:8])
+
+
+def test_index_adds_searches_and_reopens(tmp_path):
+    path = str(tmp_path / "embeddings")
+    index = EmbeddingIndex.create(path, TfidfSvdEmbedder.fit(TEXTS, dim=3))
+
+    assert index.add(list(range(1, 9)), TEXTS) == 8
+    assert index.add([1, 9], [TEXTS[0], "Graph shortest paths"]) == 1
+
+    reopened = EmbeddingIndex.open(path)
+    assert len(reopened) == 9
+    assert reopened.capacity == embedding_index.INITIAL_CAPACITY
+    results = reopened.search(reopened.vector(5), k=2, exclude=5)
+    assert {paper_id for paper_id, _ in results} == {4, 6}
+    assert results[0][1] >= results[1][1]
+
+
+def test_index_clusters_and_readers_see_appended_vectors(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_index, "IVF_MIN_SIZE", 200)
+    monkeypatch.setattr(embedding_index, "INITIAL_CAPACITY", 64)
+    embedder = LookupEmbedder(_clustered_vectors(400))
+    path = str(tmp_path / "embeddings")
+    writer = EmbeddingIndex.create(path, embedder, nprobe=3)
+    writer.add(list(range(300)), [str(i) for i in range(300)])
+    reader = EmbeddingIndex(path, embedder, nprobe=3)
+    reader.refresh()
+
+    writer.add(list(range(300, 400)), [str(i) for i in range(300, 400)])
+    reader.refresh()
+
+    assert writer.centroids is not None and len(writer.centroids) == 17
+    assert len(reader) == 400 and reader.capacity >= 400
+    for paper_id in (5, 250, 399):
+        exact = np.argsort(-(embedder.vectors @ embedder.vectors[paper_id]))[:5]
+        results = reader.search(embedder.vectors[paper_id], k=5)
+        assert results[0] == (paper_id, pytest.approx(1.0))
+        # Well separated clusters: probing the closest lists is exact
+        assert [i for i, _ in results] == exact.tolist()
+
+
+def test_index_follows_stored_papers(db, tmp_path):
+    store_papers_bulk(db, [Paper(title=text, authors=[]) for text in TEXTS[:6]])
+    index = build_embedding_index(db, str(tmp_path / "embeddings"), dim=3)
+    add_papers_stored_listener(index.add_papers)
+    try:
+        (new_id,) = store_papers_bulk(
+            db, [Paper(title="Dropout for deep neural networks", authors=[])]
+        )
+    finally:
+        remove_papers_stored_listener(index.add_papers)
+
+    assert len(index) == 7
+    assert {i for i, _ in similar_papers(new_id, k=2, index=index)} <= {1, 2, 3}
+    assert similar_papers("protein alignment", k=1, index=index)[0][0] in {4, 5, 6}
+    assert similar_papers(1000, db=db, index=index) == []
+    # Papers missing from the index are embedded from the database
+    db.add(DBPaper(title="Protein sequence alignment"))
+    db.commit()
+    assert similar_papers(8, k=1, db=db, index=index)[0][0] in {4, 5, 6}
+
+
+def test_only_subscribed_processes_write_to_the_index(db, tmp_path, monkeypatch):
+    store_papers_bulk(db, [Paper(title=text, authors=[]) for text in TEXTS[:6]])
+    build_embedding_index(db, str(tmp_path / "embeddings"), dim=3)
+    monkeypatch.setenv("EMBEDDING_INDEX_PATH", str(tmp_path / "embeddings"))
+    embedding_index.get_embedding_index.cache_clear()
+    try:
+        # Readers such as the API leave the index to the importer
+        index = embedding_index.get_embedding_index()
+        store_papers_bulk(db, [Paper(title=TEXTS[6], authors=[])])
+        assert len(index) == 6
+
+        assert embedding_index.subscribe_embedding_index() is index
+        store_papers_bulk(db, [Paper(title=TEXTS[7], authors=[])])
+        assert len(index) == 7
+    finally:
+        remove_papers_stored_listener(index.add_papers)
+        embedding_index.get_embedding_index.cache_clear()
@@ -0,0 +1,91 @@
+import csv
+import json
+
+import pytest
+
+from research_assistant.db.models import DBPaper
+from research_assistant.find_missing_papers import (
+    MissingPaper,
+    find_missing_papers,
+    load_local_titles,
+    load_title_set,
+    match_missing_papers,
+    save_title_set,
+    write_report,
+)
+
+
+@pytest.fixture
+def local(db):
+    db.add_all(
+        [
+            DBPaper(title="Attention Is All You Need"),
+            DBPaper(title="Deep Residual Learning for Image Recognition"),
+        ]
+    )
+    db.commit()
+    return load_local_titles(db, chunk_size=1)
+
+
+def _write_csv(tmp_path, titles):
+    csv_path = tmp_path / "papers.csv"
+    csv_path.write_text("Title\n" + "\n".join(titles) + "\n", encoding="utf-8")
+    return str(csv_path)
+
+
+def test_find_missing_papers(tmp_path, local):
+    csv_path = _write_csv(
+        tmp_path,
+        [
+            "attention is all you need.",
+            "Atention Is All You Need",
+            "Generative Adversarial Networks",
+            "Generative adversarial networks",
+        ],
+    )
+
+    assert find_missing_papers(csv_path, local) == [
+        "Atention Is All You Need",
+        "Generative Adversarial Networks",
+    ]
+
+
+def test_title_set_round_trip(tmp_path, local):
+    path = str(tmp_path / "titles.tsv.gz")
+    save_title_set(local, path)
+
+    loaded = load_title_set(path)
+
+    assert loaded == local
+    assert len(loaded) == 2
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_match_missing_papers(local, workers):
+    records = match_missing_papers(
+        ["Atention Is All You Need", "Generative Adversarial Networks"],
+        local,
+        workers=workers,
+    )
+
+    assert records[0].closest_id == local.ids[0]
+    assert records[0].closest_title == "Attention Is All You Need"
+    assert records[0].status == "near_match"
+    assert records[1].status == "missing"
+    assert records[1].similarity < 0.8
+
+
+@pytest.mark.parametrize("name", ["missing.csv", "missing.json"])
+def test_write_report(tmp_path, name):
+    records = [
+        MissingPaper("Paper A", 1, "Paper A.", 0.9, "near_match"),
+        MissingPaper("Paper B"),
+    ]
+    path = str(tmp_path / name)
+
+    write_report(records, path)
+
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f) if name.endswith(".json") else list(csv.DictReader(f))
+    assert [row["title"] for row in rows] == ["Paper A", "Paper B"]
+    assert rows[0]["status"] == "near_match"
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from research_assistant.citation_graph import CitationGraph
+from research_assistant.db.models import (
+    DBAuthor,
+    DBPaper,
+    DBPaperCitation,
+    DBPaperMetrics,
+    DBPaperSimilarity,
+)
+from research_assistant.graph_analytics import (
+    author_centrality,
+    citation_matrix,
+    compute_paper_metrics,
+    pagerank,
+    similar_nodes,
+)
+
+
+def _graph(edges):
+    node_ids = sorted({paper_id for edge in edges for paper_id in edge})
+    index = {paper_id: i for i, paper_id in enumerate(node_ids)}
+    return CitationGraph.from_edges(
+        node_ids,
+        np.array([index[c] for c, _ in edges], dtype=np.int32),
+        np.array([index[d] for _, d in edges], dtype=np.int32),
+    )
+
+
+def test_pagerank_matches_the_stationary_distribution():
+    # D has no references, so its rank is spread over every paper
+    adjacency = np.array(
+        [[0, 1, 1, 0], [0, 0, 1, 0], [1, 0, 0, 1], [0, 0, 0, 0]], dtype=float
+    )
+    n = len(adjacency)
+    transition = adjacency.copy()
+    transition[3] = 1
+    transition /= transition.sum(axis=1, keepdims=True)
+    google = 0.85 * transition + 0.15 / n
+    values, vectors = np.linalg.eig(google.T)
+    expected = np.real(vectors[:, np.argmax(np.real(values))])
+    expected /= expected.sum()
+
+    rank = pagerank(sparse.csr_matrix(adjacency), tol=1e-12, max_iter=1000)
+
+    assert rank == pytest.approx(expected, abs=1e-8)
+
+
+def test_citation_matrix_counts_duplicate_edges_once():
+    matrix = citation_matrix(_graph([("A", "B"), ("A", "B"), ("B", "C")]), 4)
+
+    assert matrix.shape == (4, 4)
+    assert matrix.toarray()[:3, :3].tolist() == [[0, 1, 0], [0, 0, 1], [0, 0, 0]]
+
+
+def test_similar_nodes_co_citation():
+    # X and Y cite A and B, Z cites A and C
+    graph = _graph(
+        [("X", "A"), ("X", "B"), ("Y", "A"), ("Y", "B"), ("Z", "A"), ("Z", "C")]
+    )
+    adjacency = citation_matrix(graph)
+    adjacency_t = adjacency.T.tocsr()
+    in_degree = np.diff(adjacency_t.indptr)
+    a, b, c = (graph.index[paper_id] for paper_id in "ABC")
+
+    results = {
+        node: (list(nodes), list(scores))
+        for node, nodes, scores in similar_nodes(
+            adjacency_t,
+            adjacency,
+            in_degree,
+            np.array([a, b]),
+            np.ones(graph.num_nodes, dtype=bool),
+            block_size=1,
+        )
+    }
+
+    assert results[a][0] == [b, c]
+    assert results[a][1] == pytest.approx([2 / np.sqrt(6), 1 / np.sqrt(3)])
+    assert results[b] == ([a], [pytest.approx(2 / np.sqrt(6))])
+
+
+def test_author_centrality_takes_the_best_connected_author():
+    # Author 1 wrote with authors 2 and 3, who never wrote together
+    centrality = author_centrality(
+        np.array([0, 0, 1, 1, 2]), np.array([1, 2, 1, 3, 3]), 4
+    )
+
+    assert centrality[0] == centrality[1] > centrality[2]
+    assert np.isnan(centrality[3])
+
+
+def test_compute_paper_metrics(db):
+    papers = [
+        DBPaper(title=f"Paper {s2_id}", semantic_scholar_id=s2_id) for s2_id in "ABC"
+    ]
+    papers.append(DBPaper(title="Paper without id"))
+    papers[0].authors.append(DBAuthor(name="Author"))
+    db.add_all(papers)
+    db.add_all(
+        DBPaperCitation(citing_id=c, cited_id=d)
+        for c, d in [("X", "A"), ("X", "B"), ("Y", "A"), ("Y", "B"), ("A", "C")]
+    )
+    db.commit()
+
+    counts = compute_paper_metrics(db)
+
+    metrics = {m.paper_id: m for m in db.query(DBPaperMetrics)}
+    assert counts == {"paper_metrics": 4, "paper_similarities": 2}
+    a, b, c, no_id = (paper.id for paper in papers)
+    assert (metrics[a].in_degree, metrics[a].out_degree) == (2, 1)
+    assert metrics[c].pagerank > metrics[b].pagerank
+    assert metrics[no_id].pagerank is None
+    assert metrics[a].author_centrality == pytest.approx(1.0)
+    assert metrics[b].author_centrality is None
+    similar = {
+        (s.paper_id, s.kind, s.similar_paper_id) for s in db.query(DBPaperSimilarity)
+    }
+    assert similar == {(a, "co_citation", b), (b, "co_citation", a)}
+
+    # Recomputing replaces the previous results
+    assert compute_paper_metrics(db) == counts
@@ -0,0 +1,232 @@
+import io
+import sys
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from research_assistant.db.journal import ERROR, NOT_FOUND, SKIPPED, STORED
+from research_assistant.db.models import Base, DBImportItem, DBImportJob, DBPaper
+from research_assistant.import_papers import _start_job, import_papers_pipelined
+from research_assistant.models import Paper
+from research_assistant.near_duplicates import NearDuplicateIndex, build_index
+from research_assistant.rate_limit import TokenBucket
+
+ABSTRACT = (
+    "The dominant sequence transduction models are based on complex recurrent or "
+    "convolutional neural networks. We propose a new simple network architecture, "
+    "the Transformer, based solely on attention mechanisms."
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # File-backed SQLite so the reader and writer threads get their own connections
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'import.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    with patch("research_assistant.import_papers.get_db", get_db):
+        yield factory
+    engine.dispose()
+
+
+def _write_csv(tmp_path, titles):
+    csv_path = tmp_path / "papers.csv"
+    csv_path.write_text("Title\n" + "\n".join(titles) + "\n", encoding="utf-8")
+    return str(csv_path)
+
+
+def test_import_papers_pipelined_stores_found_papers(tmp_path, session_factory):
+    titles = [f"Paper {i}" for i in range(20)] + ["Existing", "Missing", "Broken"]
+    csv_path = _write_csv(tmp_path, titles)
+
+    def fake_search(title, limiter=None):
+        if title == "Missing":
+            return None
+        if title == "Broken":
+            raise RuntimeError("boom")
+        return Paper(title=title, authors=[])
+
+    with session_factory() as db:
+        db.add(DBPaper(title="Existing"))
+        db.commit()
+
+    with patch(
+        "research_assistant.import_papers.search_paper", side_effect=fake_search
+    ), patch(
+        "research_assistant.import_papers.store_papers_bulk",
+        side_effect=lambda db, papers: list(range(len(papers))),
+    ) as store_papers_bulk, patch(
+        "research_assistant.import_papers._write_failed_papers"
+    ) as write_failed:
+        stats = import_papers_pipelined(
+            csv_path, workers=4, limiter=TokenBucket(rate=10_000), batch_size=8
+        )
+
+    # "Existing" is skipped while the CSV is journaled, before the pipeline starts
+    assert stats.total == 22
+    assert stats.skipped == 0
+    assert stats.searched == 22
+    assert stats.stored == 20
+    assert sum(len(c.args[1]) for c in store_papers_bulk.call_args_list) == 20
+    assert all(len(c.args[1]) <= 8 for c in store_papers_bulk.call_args_list)
+    assert sorted(stats.failed) == [
+        ("Broken", "Search error"),
+        ("Missing", "Not found"),
+    ]
+    write_failed.assert_called_once_with(["Missing", "Broken"])
+
+    with session_factory() as db:
+        job = db.scalars(select(DBImportJob)).one()
+        states = dict(db.execute(select(DBImportItem.title, DBImportItem.state)).all())
+    assert job.status == "running"  # "Broken" can still be retried
+    assert states["Paper 0"] == STORED
+    assert states["Existing"] == SKIPPED
+    assert states["Missing"] == NOT_FOUND
+    assert states["Broken"] == ERROR
+
+
+def test_import_papers_pipelined_resumes_unfinished_titles(tmp_path, session_factory):
+    titles = [f"Paper {i}" for i in range(10)]
+    csv_path = _write_csv(tmp_path, titles)
+    searched = []
+
+    def fake_search(title, limiter=None):
+        searched.append(title)
+        if title == "Paper 7" and searched.count(title) == 1:
+            raise RuntimeError("timeout")
+        return Paper(title=title, authors=[])
+
+    with patch(
+        "research_assistant.import_papers.search_paper", side_effect=fake_search
+    ), patch(
+        "research_assistant.import_papers.store_papers_bulk",
+        side_effect=lambda db, papers: list(range(len(papers))),
+    ), patch(
+        "research_assistant.import_papers._write_failed_papers"
+    ):
+        first = import_papers_pipelined(csv_path, limiter=TokenBucket(rate=10_000))
+        # The CSV is not needed to resume: every title is journaled
+        (tmp_path / "papers.csv").unlink()
+        second = import_papers_pipelined(csv_path, limiter=TokenBucket(rate=10_000))
+
+    assert first.stored == 9
+    assert second.total == 1
+    assert second.stored == 1
+    assert sorted(searched) == sorted(titles + ["Paper 7"])
+    with session_factory() as db:
+        job = db.scalars(select(DBImportJob)).one()
+        item = db.scalars(
+            select(DBImportItem).where(DBImportItem.title == "Paper 7")
+        ).one()
+    assert job.status == "completed"
+    assert (item.state, item.attempts) == (STORED, 2)
+
+
+def test_import_papers_pipelined_skips_confirmed_duplicates(tmp_path, session_factory):
+    csv_path = _write_csv(
+        tmp_path,
+        [
+            "The Transformer (preprint)",
+            # Distinct papers the index flags as near-duplicates
+            "Attention Is Not All You Need",
+            "Language Models are Zero-Shot Learners",
+            "Deep Residual Learning for Speech Recognition",
+        ],
+    )
+    with session_factory() as db:
+        stored = [
+            DBPaper(title="Attention Is All You Need", abstract=ABSTRACT, year=2017),
+            DBPaper(title="Language Models are Few-Shot Learners", year=2020),
+            DBPaper(title="Deep Residual Learning for Image Recognition", year=2016),
+        ]
+        db.add_all(stored)
+        db.commit()
+        index = build_index(db)
+        attention_id = stored[0].id
+    index.path = str(tmp_path / "index.npz")
+
+    def fake_search(title, limiter=None):
+        if title.endswith("(preprint)"):
+            # Published under another title, recognized by its abstract and year
+            return Paper(
+                title="The Transformer", authors=[], abstract=ABSTRACT, year=2017
+            )
+        return Paper(title=title, authors=[], year=2021)
+
+    with patch(
+        "research_assistant.import_papers.get_near_duplicate_index",
+        return_value=index,
+    ), patch(
+        "research_assistant.import_papers.search_paper", side_effect=fake_search
+    ) as search_paper:
+        stats = import_papers_pipelined(csv_path, limiter=TokenBucket(rate=10_000))
+
+    # Every title is still searched; only the confirmed duplicate is skipped
+    assert search_paper.call_count == 4
+    assert (stats.skipped, stats.stored) == (1, 3)
+    with session_factory() as db:
+        states = dict(db.execute(select(DBImportItem.title, DBImportItem.state)).all())
+        skipped = db.scalars(
+            select(DBImportItem.paper_id).where(DBImportItem.state == SKIPPED)
+        ).all()
+    assert states["Attention Is Not All You Need"] == STORED
+    assert skipped == [attention_id]
+    assert len(NearDuplicateIndex.load(index.path)) == 6
+
+
+def test_import_papers_pipelined_survives_writer_failures(tmp_path, session_factory):
+    titles = [f"Paper {i}" for i in range(20)]
+    csv_path = _write_csv(tmp_path, titles)
+
+    with patch(
+        "research_assistant.import_papers.search_paper",
+        side_effect=lambda title, limiter=None: Paper(title=title, authors=[]),
+    ), patch(
+        "research_assistant.import_papers._store_batch",
+        side_effect=RuntimeError("database is down"),
+    ), patch(
+        "research_assistant.import_papers._write_failed_papers"
+    ):
+        # A dead writer would leave the searchers blocked on the full results queue
+        stats = import_papers_pipelined(
+            csv_path, workers=4, limiter=TokenBucket(rate=10_000), batch_size=2
+        )
+
+    assert stats.searched == 20
+    assert stats.stored == 0
+    assert len(stats.failed) == 20
+    with session_factory() as db:
+        states = set(db.scalars(select(DBImportItem.state)))
+    assert states == {ERROR}
+
+
+def test_stdin_jobs_are_keyed_by_content(db, monkeypatch):
+    def start(csv):
+        stdin = io.TextIOWrapper(io.BytesIO(csv.encode("utf-8")), encoding="utf-8")
+        monkeypatch.setattr(sys, "stdin", stdin)
+        return _start_job(db, "-")
+
+    first = start("Title\nPaper A\n")
+    other = start("Title\nPaper B\n")
+    again = start("Title\nPaper A\n")
+
+    assert other.id != first.id
+    assert again.id == first.id
+    assert first.source.startswith("<stdin:")
+    titles = db.scalars(
+        select(DBImportItem.title).where(DBImportItem.job_id == other.id)
+    ).all()
+    assert titles == ["Paper B"]
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from research_assistant.db.models import DBPaper
+from research_assistant.db.service import store_papers_bulk
+from research_assistant.metadata_refresh import refresh_metadata, staleness
+from research_assistant.models import Paper
+from research_assistant.semantic_scholar_client import AsyncSemanticScholarClient
+from research_assistant.semantic_scholar_stub import (
+    StubSemanticScholarServer,
+    make_stub_paper,
+)
+
+
+def _store(db, count):
+    papers = [make_stub_paper(f"Paper {i}") for i in range(count)]
+    store_papers_bulk(
+        db,
+        [
+            Paper(
+                title=p["title"],
+                authors=[],
+                citation_count=p["citationCount"],
+                reference_count=p["referenceCount"],
+                is_open_access=p["isOpenAccess"],
+                semantic_scholar_id=p["paperId"],
+            )
+            for p in papers
+        ],
+    )
+    return papers
+
+
+def _refresh(db, url, **kwargs):
+    async def refresh():
+        async with AsyncSemanticScholarClient(api_url=url) as client:
+            return await refresh_metadata(db, client=client, **kwargs)
+
+    return asyncio.run(refresh())
+
+
+def test_refresh_metadata_writes_back_changed_fields_only(db):
+    papers = _store(db, 4)
+    papers[0]["citationCount"] = 50
+    papers[1]["isOpenAccess"] = True
+    papers[1]["referenceCount"] = 9
+    updated_at = {p.semantic_scholar_id: p.updated_at for p in db.query(DBPaper)}
+
+    with StubSemanticScholarServer(papers=papers[:3]) as stub:
+        stats = _refresh(db, stub.url)
+        again = _refresh(db, stub.url)
+        request_count = stub.request_count
+
+    db.expire_all()
+    stored = {p.semantic_scholar_id: p for p in db.query(DBPaper)}
+    first, second, third = (stored[p["paperId"]] for p in papers[:3])
+    assert (stats.checked, stats.updated, stats.not_found) == (4, 2, 1)
+    assert (first.citation_count, first.reference_count) == (50, 1)
+    assert (second.reference_count, second.is_open_access) == (9, True)
+    assert first.updated_at > updated_at[first.semantic_scholar_id]
+    assert third.updated_at == updated_at[third.semantic_scholar_id]
+    assert all(p.metadata_refreshed_at is not None for p in stored.values())
+    # Everything is fresh, so the second run fetches nothing
+    assert again.checked == 0
+    assert request_count == 1
+    assert staleness(db) == (0, 0)
+
+
+def test_refresh_metadata_picks_the_stalest_papers_within_limit(db):
+    papers = _store(db, 5)
+    week_ago = datetime.utcnow() - timedelta(days=8)
+    db.query(DBPaper).update({DBPaper.metadata_refreshed_at: week_ago})
+    db.query(DBPaper).filter(
+        DBPaper.semantic_scholar_id == papers[4]["paperId"]
+    ).update({DBPaper.metadata_refreshed_at: datetime.utcnow()})
+    db.commit()
+    assert staleness(db)[0] == 4
+
+    with StubSemanticScholarServer(papers=papers) as stub:
+        stats = _refresh(db, stub.url, limit=3, batch_size=2, max_concurrency=1)
+        request_count = stub.request_count
+
+    assert stats.checked == 3
+    assert request_count == 2
+    stale, oldest = staleness(db)
+    assert stale == 1
+    assert oldest >= 8 * 24 * 3600
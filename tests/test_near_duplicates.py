@@ -0,0 +1,150 @@
+from research_assistant.db.models import DBPaper
+from research_assistant.db.service import store_papers_bulk
+from research_assistant.models import Author, Paper
+from research_assistant.near_duplicates import (
+    NearDuplicateIndex,
+    build_index,
+    confirmed_duplicate,
+    dedupe_report,
+)
+
+ABSTRACT = (
+    "The dominant sequence transduction models are based on complex recurrent or "
+    "convolutional neural networks. We propose a new simple network architecture, "
+    "the Transformer, based solely on attention mechanisms."
+)
+
+
+def _index():
+    index = NearDuplicateIndex()
+    index.add(1, "Attention Is All You Need", ABSTRACT)
+    index.add(2, "Deep Residual Learning for Image Recognition")
+    index.add(3, "BERT: Pre-training of Deep Bidirectional Transformers")
+    return index
+
+
+def test_query_finds_title_variants():
+    index = _index()
+
+    assert index.query("attention is all you need.")[0] == (1, 1.0)
+    assert [i for i, _ in index.query("Atention Is All You Need")] == [1]
+    assert index.query("Generative Adversarial Networks") == []
+
+
+def test_find_near_duplicates_by_abstract():
+    index = _index()
+    published = Paper(
+        title="Transformers: Attention-Only Sequence Transduction",
+        authors=[],
+        abstract=ABSTRACT + " Experiments on two translation tasks.",
+    )
+
+    assert [i for i, _ in index.find_near_duplicates(published)] == [1]
+
+
+def test_find_near_duplicates_excludes_paper_itself():
+    index = _index()
+    paper = DBPaper(id=1, title="Attention Is All You Need", abstract=ABSTRACT)
+
+    assert index.find_near_duplicates(paper) == []
+
+
+def test_add_is_incremental_and_idempotent():
+    index = NearDuplicateIndex()
+    for paper_id in range(200):
+        index.add(paper_id, f"Paper number {paper_id} about topic {paper_id * 7}")
+    index.add(0, "Something else entirely")
+
+    assert len(index) == 200
+    assert 150 in index
+    assert index.query("Paper number 150 about topic 1050")[0] == (150, 1.0)
+
+
+def test_save_and_load(tmp_path):
+    index = _index()
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+
+    loaded = NearDuplicateIndex.load(path)
+
+    assert len(loaded) == 3
+    assert loaded.path == path
+    assert loaded.query("Attention is all you need") == index.query(
+        "Attention is all you need"
+    )
+    loaded.add(4, "Attention Is All You Need!")
+    assert loaded.duplicate_groups() == [[1, 4]]
+
+
+def test_dedupe_report(db):
+    db.add_all(
+        [
+            DBPaper(title="Attention Is All You Need", abstract=ABSTRACT),
+            DBPaper(title="Deep Residual Learning for Image Recognition"),
+            DBPaper(title="Attention is all you need (v2)", abstract=ABSTRACT),
+            DBPaper(title="Deep residual learning for image recognitoin"),
+            DBPaper(title="Generative Adversarial Networks"),
+        ]
+    )
+    db.commit()
+
+    index = build_index(db)
+    groups = dedupe_report(db, index)
+
+    assert len(index) == 5
+    assert [[paper.id for paper in group] for group in groups] == [[1, 3], [2, 4]]
+
+
+# Distinct papers whose titles are near-duplicates of well-known ones
+NEAR_MISSES = [
+    ("Attention Is All You Need", "Attention Is Not All You Need"),
+    ("Language Models are Few-Shot Learners", "Language Models are Zero-Shot Learners"),
+    (
+        "Deep Residual Learning for Image Recognition",
+        "Deep Residual Learning for Speech Recognition",
+    ),
+]
+
+
+def test_confirmed_duplicate_rejects_distinct_papers_with_similar_titles(db):
+    ids = store_papers_bulk(
+        db,
+        [
+            Paper(title=stored, authors=[Author("Ashish Vaswani")], year=2017)
+            for stored, _ in NEAR_MISSES
+        ],
+    )
+    index = build_index(db)
+
+    for paper_id, (_, title) in zip(ids, NEAR_MISSES):
+        # Flagged by the index, but not similar enough to stand in for the paper
+        assert paper_id in dict(index.query(title))
+        paper = Paper(title=title, authors=[Author("Ashish Vaswani")], year=2017)
+        assert confirmed_duplicate(db, index, paper) is None
+
+
+def test_confirmed_duplicate_needs_title_match_or_shared_metadata(db):
+    (paper_id,) = store_papers_bulk(
+        db,
+        [
+            Paper(
+                title="Attention Is All You Need",
+                authors=[Author("Ashish Vaswani")],
+                abstract=ABSTRACT,
+                year=2017,
+            )
+        ],
+    )
+    index = build_index(db)
+
+    renamed = Paper(title="The Transformer", authors=[], abstract=ABSTRACT)
+    assert confirmed_duplicate(db, index, Paper("attention is all you need.", [])) == (
+        paper_id
+    )
+    assert confirmed_duplicate(db, index, renamed) is None
+    renamed.year = 2017
+    assert confirmed_duplicate(db, index, renamed) == paper_id
+    renamed.year = None
+    renamed.authors = [Author("Ashish  Vaswani")]
+    assert confirmed_duplicate(db, index, renamed) == paper_id
+    assert confirmed_duplicate(None, None, renamed) is None
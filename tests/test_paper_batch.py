@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from research_assistant.db.models import DBPaper
+from research_assistant.db.service import store_papers_bulk
+from research_assistant.models import Author, Paper
+from research_assistant.paper_batch import PaperBatch
+
+PAPERS = [
+    Paper(
+        title="Über Graphen",
+        authors=[Author("José Núñez", ["Uni A", "Lab B"]), Author("Bo Li")],
+        abstract="",
+        year=2020,
+        citation_count=12,
+        is_open_access=True,
+        semantic_scholar_id="s2-a",
+    ),
+    Paper(title="Paper B", authors=[], title_similarity=0.5, is_open_access=False),
+    Paper(title="Paper C", authors=[Author("Ada Lovelace", [])], venue="ICML"),
+]
+
+
+def test_paper_batch_round_trips_papers():
+    batch = PaperBatch.from_papers(PAPERS)
+
+    assert len(batch) == 3
+    assert batch.to_papers() == PAPERS
+    view = batch[0]
+    assert (view.title, view.abstract, view.url) == ("Über Graphen", "", None)
+    assert (view.year, view.citation_count, view.is_open_access) == (2020, 12, True)
+    assert view.authors == PAPERS[0].authors
+    assert str(view) == str(PAPERS[0])
+    assert batch[-1].to_paper() == PAPERS[2]
+    assert [paper.title for paper in batch[1:]] == ["Paper B", "Paper C"]
+    with pytest.raises(IndexError):
+        batch[3]
+    with pytest.raises(AttributeError):
+        view.missing
+
+
+def test_paper_batch_concat_and_pickle():
+    no_affiliations = Paper(title="Paper D", authors=[Author("Bo Li")], venue="ICML")
+    expected = PAPERS[:1] + [no_affiliations] + PAPERS[1:]
+
+    batch = PaperBatch.concat(
+        [
+            PaperBatch.from_papers(PAPERS[:1]),
+            PaperBatch.from_papers([no_affiliations]),
+            PaperBatch.from_papers(PAPERS[1:]),
+        ]
+    )
+
+    assert batch.to_papers() == expected
+    assert pickle.loads(pickle.dumps(batch)).to_papers() == expected
+    assert PaperBatch.from_papers(batch).to_papers() == expected
+    assert PaperBatch.from_papers([]).to_papers() == []
+
+
+def test_store_papers_bulk_accepts_a_paper_batch(db):
+    ids = store_papers_bulk(db, PaperBatch.from_papers(PAPERS))
+
+    stored = db.get(DBPaper, ids[0])
+    assert stored.semantic_scholar_id == "s2-a"
+    assert sorted(author.name for author in stored.authors) == ["Bo Li", "José Núñez"]
+    assert db.query(DBPaper).count() == 3
@@ -1,7 +1,14 @@
 import pytest
 from unittest.mock import patch
 
-from research_assistant.paper_search import search_paper
+from research_assistant.db.service import store_paper
+from research_assistant.models import Paper
+from research_assistant.normalization import normalize_title
+from research_assistant.paper_search import (
+    check_paper_exists,
+    find_existing_titles,
+    search_paper,
+)
 
 
 class DummyPaper:
@@ -48,3 +55,26 @@ def test_search_paper_returns_valid_paper():
     ):
         result = search_paper(title)
     assert result == dummy_converted_paper
+
+
+def test_normalize_title_folds_case_punctuation_and_unicode():
+    assert normalize_title("  Deep-Learning:  a Survey ") == "deep learning a survey"
+    assert normalize_title("ＢＥＲＴ—Pre‐training") == "bert pre training"
+
+
+def test_check_paper_exists_matches_normalized_title(db):
+    store_paper(db, Paper(title="Attention Is All You Need", authors=[]))
+
+    assert check_paper_exists(db, "attention is all you need!") is not None
+    assert check_paper_exists(db, "Attention is not all you need") is None
+
+
+def test_find_existing_titles_returns_input_titles_in_database(db):
+    store_paper(db, Paper(title="Paper One", authors=[]))
+    store_paper(db, Paper(title="Paper Two", authors=[]))
+
+    existing = find_existing_titles(
+        db, ["paper one", "PAPER ONE.", "Paper Three", "Paper Two"], chunk_size=1
+    )
+
+    assert existing == {"paper one", "PAPER ONE.", "Paper Two"}
@@ -0,0 +1,46 @@
+from research_assistant.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_initial_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(3)]
+
+    assert waits == [0.0, 0.0, 0.0]
+    assert clock.now == 0.0
+
+
+def test_token_bucket_paces_requests_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, capacity=1, clock=clock, sleep=clock.sleep)
+
+    for _ in range(9):
+        bucket.acquire()
+
+    # One token is available immediately, the other eight arrive at 4 per second
+    assert clock.now == 2.0
+
+
+def test_token_bucket_refills_while_idle():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+
+    clock.now += 10
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 1.0
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from research_assistant.response_cache import (
+    CachedResponse,
+    MemoryBackend,
+    ResponseCache,
+    etag_matches,
+    make_etag,
+)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    for key in "abc":
+        if key == "c":
+            backend.get("a")
+        backend.set(key, CachedResponse(key.encode(), f'"{key}"'), ttl=60)
+
+    assert backend.get("a").body == b"a"
+    assert backend.get("b") is None
+    assert backend.get("c").body == b"c"
+    assert backend.evictions == 1
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryBackend()
+    with patch("research_assistant.response_cache.time.monotonic", return_value=0):
+        backend.set("a", CachedResponse(b"a", '"a"'), ttl=10)
+    with patch("research_assistant.response_cache.time.monotonic", return_value=11):
+        assert backend.get("a") is None
+    assert len(backend) == 0
+
+
+def test_etags_follow_updated_at():
+    etag = make_etag("paper:1", [(1, "2024-01-01T00:00:00")])
+
+    assert etag == make_etag("paper:1", [(1, "2024-01-01T00:00:00")])
+    assert etag != make_etag("paper:1", [(1, "2024-01-02T00:00:00")])
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+
+
+def test_new_papers_invalidate_listings_and_their_own_entries():
+    cache = ResponseCache(MemoryBackend())
+    listing = cache.listing_key("papers", "limit=10")
+    cache.put(listing, CachedResponse(b"[]", '"a"'))
+    cache.put(cache.paper_key(1), CachedResponse(b"{}", '"b"'))
+    cache.put(cache.paper_key(2), CachedResponse(b"{}", '"c"'))
+
+    cache.invalidate_papers([1], [])
+
+    assert cache.get(cache.listing_key("papers", "limit=10")) is None
+    assert cache.get(cache.paper_key(1)) is None
+    assert cache.get(cache.paper_key(2)) is not None
+    assert cache.stats()["hit_ratio"] == 1 / 3
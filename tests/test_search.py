@@ -0,0 +1,44 @@
+import pytest
+
+from research_assistant.db.service import store_papers_bulk
+from research_assistant.models import Paper
+from research_assistant.search import search_papers
+
+
+def test_search_papers_falls_back_to_substring_search_with_paging(db):
+    store_papers_bulk(
+        db,
+        [
+            Paper(title=f"Machine Learning {i}", authors=[], abstract="")
+            for i in range(5)
+        ]
+        + [Paper(title="Unrelated", authors=[], abstract="uses machine learning")],
+    )
+
+    first_page = search_papers("machine learning", db, limit=4)
+    second_page = search_papers("machine learning", db, limit=4, offset=4)
+
+    assert [p.title for p in first_page] == [f"Machine Learning {i}" for i in range(4)]
+    assert [p.title for p in second_page] == ["Machine Learning 4", "Unrelated"]
+
+
+def test_search_papers_rejects_unknown_mode(db):
+    with pytest.raises(ValueError):
+        search_papers("query", db, mode="regex")
+
+
+def test_search_papers_ranks_full_text_matches_on_postgres(pg_db):
+    store_papers_bulk(
+        pg_db,
+        [
+            Paper(title="Graph neural networks", authors=[], abstract="Learning."),
+            Paper(title="Survey", authors=[], abstract="Neural networks on graphs."),
+            Paper(title="Unrelated", authors=[], abstract="Databases."),
+        ],
+    )
+
+    results = search_papers("graph neural networks", pg_db)
+
+    # Title matches are weighted above abstract matches, stemming matches "graphs"
+    assert [p.title for p in results] == ["Graph neural networks", "Survey"]
+    assert [p.title for p in search_papers("networks", pg_db, offset=1)] == ["Survey"]
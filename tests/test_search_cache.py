@@ -0,0 +1,93 @@
+import sqlite3
+from unittest.mock import patch
+
+from research_assistant.models import Author, Paper
+from research_assistant.paper_search import search_paper
+from research_assistant.search_cache import SearchCache, cache_key
+
+
+class DummySemanticPaper:
+    def __init__(self, title):
+        self.title = title
+        self.authors = []
+        self.abstract = None
+        self.url = None
+        self.venue = None
+        self.year = 2021
+
+
+def test_cache_round_trips_papers_by_normalized_title(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"))
+    paper = Paper(title="Deep Learning", authors=[Author(name="A. Author")])
+
+    cache.put("Deep Learning", paper)
+
+    cached, result = cache.get("  deep   LEARNING. ")
+    assert cached
+    assert result == paper
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_stores_negative_results_and_counts_misses():
+    cache = SearchCache(":memory:")
+
+    assert cache.get("Unknown") == (False, None)
+    cache.put("Unknown", None)
+
+    assert cache.get("Unknown") == (True, None)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_cache_expires_entries():
+    cache = SearchCache(":memory:", ttl=-1, negative_ttl=-1)
+    cache.put("Expired", Paper(title="Expired", authors=[]))
+
+    assert cache.get("Expired") == (False, None)
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = SearchCache(":memory:", max_entries=10)
+    for i in range(10):
+        cache.put(f"Paper {i}", None)
+    cache.get("Paper 0")
+
+    cache.put("Paper 10", None)
+
+    assert cache.stats()["entries"] == 9
+    assert cache.get("Paper 0")[0]
+    assert not cache.get("Paper 1")[0]
+
+
+def test_cache_buffers_access_times_of_hits(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SearchCache(path)
+    cache.put("Paper", None)
+    cache.get("Paper")
+
+    # Hits do not write until the buffer is flushed
+    assert cache._conn.in_transaction is False
+    assert cache._accessed
+
+    accessed_at = cache._accessed[cache_key("Paper")]
+    cache.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT accessed_at FROM search_cache").fetchall() == [
+        (accessed_at,)
+    ]
+
+
+def test_search_paper_uses_cache_on_rerun():
+    cache = SearchCache(":memory:")
+    with patch(
+        "research_assistant.paper_search.SemanticScholar.search_paper",
+        side_effect=[[DummySemanticPaper("Cached Title")], []],
+    ) as remote_search:
+        first = search_paper("Cached Title", cache=cache)
+        second = search_paper("cached title", cache=cache)
+        assert search_paper("Missing Title", cache=cache) is None
+        assert search_paper("Missing Title", cache=cache) is None
+
+    assert remote_search.call_count == 2
+    assert first == second
+    assert second.year == 2021
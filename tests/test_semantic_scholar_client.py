@@ -0,0 +1,59 @@
+import asyncio
+
+from research_assistant.paper_search import search_papers_async
+from research_assistant.semantic_scholar_client import AsyncSemanticScholarClient
+from research_assistant.semantic_scholar_stub import (
+    StubSemanticScholarServer,
+    make_stub_paper,
+)
+
+
+async def _search(url, titles, **kwargs):
+    async with AsyncSemanticScholarClient(
+        api_url=url, backoff_base=0.01, **kwargs
+    ) as client:
+        return await search_papers_async(titles, client=client)
+
+
+def test_search_papers_async_returns_results_in_input_order():
+    titles = [f"Paper number {i}" for i in range(25)]
+    with StubSemanticScholarServer(latency=0.001) as stub:
+        results = asyncio.run(_search(stub.url, titles, max_concurrency=4))
+
+    assert [paper.title for paper in results] == titles
+    assert results[3].semantic_scholar_id == make_stub_paper(titles[3])["paperId"]
+
+
+def test_search_papers_async_returns_none_for_missing_papers():
+    papers = [make_stub_paper("Known paper")]
+    with StubSemanticScholarServer(papers=papers, echo=False) as stub:
+        results = asyncio.run(_search(stub.url, ["Unknown paper", "Known paper"]))
+
+    assert results[0] is None
+    assert results[1].title == "Known paper"
+
+
+def test_search_papers_async_retries_rate_limits_and_server_errors():
+    with StubSemanticScholarServer(error_statuses=[429, 503, 429]) as stub:
+        results = asyncio.run(_search(stub.url, ["Retried paper"]))
+        request_count = stub.request_count
+
+    assert results[0].title == "Retried paper"
+    assert request_count == 4
+
+
+def test_get_papers_returns_none_for_unknown_ids():
+    async def get_papers(url):
+        async with AsyncSemanticScholarClient(api_url=url) as client:
+            return await client.get_papers(
+                ["unknown", paper["paperId"]], fields=["title", "year"]
+            )
+
+    paper = make_stub_paper("Known paper")
+    with StubSemanticScholarServer(papers=[paper]) as stub:
+        records = asyncio.run(get_papers(stub.url))
+
+    assert records == [
+        None,
+        {"paperId": paper["paperId"], "title": "Known paper", "year": 2020},
+    ]
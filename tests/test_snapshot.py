@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from sqlalchemy import Connection, update
+from sqlalchemy.orm import Session
+
+from research_assistant.db.models import DBPaper
+from research_assistant.db.service import store_papers_bulk
+from research_assistant.models import Author, Paper
+from research_assistant.snapshot import Snapshot, export_snapshot
+
+PAPERS = [
+    Paper(
+        title="Paper A",
+        authors=[Author("Ada Lovelace"), Author("Alan Turing")],
+        abstract="About A",
+        venue="ICML",
+        year=2020,
+        citation_count=3,
+    ),
+    Paper(title="Paper B", authors=[Author("Ada Lovelace")], year=2021),
+    Paper(title="Paper C", authors=[], year=2020),
+    Paper(title="Paper D", authors=[Author("Grace Hopper")]),
+]
+
+
+def _store(db, papers, updated_at):
+    ids = store_papers_bulk(db, papers)
+    db.execute(update(DBPaper).where(DBPaper.id.in_(ids)).values(updated_at=updated_at))
+    db.commit()
+    return ids
+
+
+def test_export_snapshot_writes_memory_mapped_parts(db, tmp_path):
+    ids = _store(db, PAPERS, datetime(2026, 1, 1))
+
+    stats = export_snapshot(db, str(tmp_path), chunk_size=1)
+    snapshot = Snapshot.open(str(tmp_path))
+
+    # One part per year and chunk
+    assert (stats.papers, stats.parts, stats.full) == (4, 4, True)
+    assert sorted(part.year or 0 for part in snapshot.parts) == [0, 2020, 2020, 2021]
+    assert snapshot.high_water == datetime(2026, 1, 1)
+    assert len(snapshot) == 4
+    papers = {paper_id: paper.to_paper() for paper_id, paper in snapshot.papers()}
+    assert papers == dict(zip(ids, PAPERS))
+    assert sorted(snapshot.rows("title", "normalized_title")) == [
+        (ids[0], "Paper A", "paper a"),
+        (ids[1], "Paper B", "paper b"),
+        (ids[2], "Paper C", "paper c"),
+        (ids[3], "Paper D", "paper d"),
+    ]
+    assert isinstance(snapshot.parts[0].ids, np.memmap)
+
+    recent = Snapshot.open(str(tmp_path), years=[2021, None])
+    assert sorted(title for _, title in recent.rows("title")) == ["Paper B", "Paper D"]
+
+
+def test_incremental_export_supersedes_updated_papers(db, tmp_path):
+    ids = _store(db, PAPERS, datetime(2026, 1, 1))
+    export_snapshot(db, str(tmp_path))
+
+    later = datetime(2026, 1, 1) + timedelta(days=1)
+    db.execute(
+        update(DBPaper)
+        .where(DBPaper.id == ids[0])
+        .values(citation_count=10, year=2022, updated_at=later)
+    )
+    new_id = _store(db, [Paper(title="Paper E", authors=[], year=2020)], later)[0]
+
+    stats = export_snapshot(db, str(tmp_path))
+    snapshot = Snapshot.open(str(tmp_path))
+
+    # Everything was updated within SNAPSHOT_OVERLAP of the first high-water mark
+    assert (stats.papers, stats.full) == (5, False)
+    assert snapshot.high_water == later
+    assert len(snapshot) == 5
+    rows = {row[0]: row[1:] for row in snapshot.rows("citation_count", "year")}
+    assert rows[ids[0]] == (10, 2022)
+    assert rows[new_id] == (None, 2020)
+    assert [paper.title for _, paper in snapshot.papers()].count("Paper A") == 1
+
+    # Rows committed late with an updated_at just before the high-water mark
+    late = _store(
+        db, [Paper(title="Paper F", authors=[])], later - timedelta(minutes=1)
+    )
+    stats = export_snapshot(db, str(tmp_path))
+    snapshot = Snapshot.open(str(tmp_path))
+    # Paper A and Paper E are exported again along with it
+    assert stats.papers == 3
+    assert snapshot.high_water == later
+    assert len(snapshot) == 6
+    assert late[0] in {paper_id for paper_id, _ in snapshot.papers()}
+
+    # A full export replaces the parts of the incremental ones
+    previous = {part["path"] for part in snapshot.manifest["parts"]}
+    stats = export_snapshot(db, str(tmp_path), full=True)
+    snapshot = Snapshot.open(str(tmp_path))
+    assert (stats.papers, stats.full, len(snapshot)) == (6, True, 6)
+    assert not any((tmp_path / path).exists() for path in previous)
+    assert len(snapshot.manifest["exports"]) == 1
+
+
+def test_export_reads_papers_and_links_from_one_snapshot(pg_db, tmp_path, monkeypatch):
+    _store(pg_db, PAPERS, datetime(2026, 1, 1))
+    execute = Connection.execute
+    statements = []
+
+    def execute_then_commit_paper(connection, statement, *args, **kwargs):
+        result = execute(connection, statement, *args, **kwargs)
+        statements.append(statement)
+        if len(statements) == 1:
+            # A paper sorting first is committed between the two statements
+            with Session(pg_db.get_bind()) as writer:
+                store_papers_bulk(
+                    writer, [Paper(title="Paper 0", authors=[Author("Ada")], year=1)]
+                )
+        return result
+
+    monkeypatch.setattr(Connection, "execute", execute_then_commit_paper)
+    stats = export_snapshot(pg_db, str(tmp_path))
+    monkeypatch.undo()
+
+    assert stats.papers == 4
+    papers = [paper.to_paper() for _, paper in Snapshot.open(str(tmp_path)).papers()]
+    assert sorted(papers, key=lambda paper: paper.title) == PAPERS
@@ -0,0 +1,74 @@
+import pytest
+
+from research_assistant.title_matching import (
+    TitleMatcher,
+    best_match,
+    title_ngrams,
+    title_similarity,
+)
+
+
+def test_title_similarity_ignores_case_and_punctuation():
+    assert (
+        title_similarity("Attention Is All You Need", "attention is all you need!")
+        == 1.0
+    )
+
+
+def test_title_similarity_tolerates_typos():
+    similarity = title_similarity(
+        "Attention Is All You Need", "Atention Is All You Need"
+    )
+    assert 0.8 < similarity < 1.0
+
+
+def test_title_similarity_of_unrelated_titles_is_low():
+    assert title_similarity("Attention Is All You Need", "Deep Residual Learning") < 0.3
+
+
+def test_title_ngrams_of_short_title():
+    assert title_ngrams("") == frozenset({"  "})
+    assert title_ngrams("a") == frozenset({" a "})
+
+
+def test_best_match():
+    candidates = ["Deep Residual Learning", "Attention is all you need", "BERT"]
+    index, score = best_match("Attention Is All You Need.", candidates)
+    assert index == 1
+    assert score == 1.0
+    assert best_match("Something Else Entirely", candidates) is None
+    assert best_match("Anything", []) is None
+
+
+def test_title_matcher_agrees_with_title_similarity():
+    corpus = [
+        "Deep Residual Learning for Image Recognition",
+        "Attention Is All You Need",
+        "BERT: Pre-training of Deep Bidirectional Transformers",
+    ]
+    matcher = TitleMatcher(corpus)
+    query = "Atention is all you need"
+
+    index, score = matcher.match(query)
+
+    assert index == 1
+    assert score == pytest.approx(title_similarity(query, corpus[1]))
+    assert matcher.scores(query).tolist() == pytest.approx(
+        [title_similarity(query, title) for title in corpus]
+    )
+
+
+def test_title_matcher_add_after_match():
+    matcher = TitleMatcher(["Deep Residual Learning"])
+    assert matcher.match("Attention Is All You Need") is None
+
+    assert matcher.add("Attention Is All You Need") == 1
+    assert len(matcher) == 2
+    assert matcher.match_many(["attention is all you need", "Unrelated"]) == [
+        (1, 1.0),
+        None,
+    ]
+
+
+def test_title_matcher_empty():
+    assert TitleMatcher().match("Anything") is None
@@ -0,0 +1,93 @@
+import gzip
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from research_assistant.title_reader import (
+    bounded_map,
+    iter_title_chunks,
+    read_title_batches,
+)
+
+CSV = 'Title,Year\nPaper A,2020\n,2021\n"Paper, B",2022\npaper a!,2023\nPaper C,2024\n'
+
+
+def _write(tmp_path, name, data=CSV):
+    path = tmp_path / name
+    path.write_bytes(data.encode("utf-8"))
+    return str(path)
+
+
+def test_read_title_batches_normalizes_and_dedupes(tmp_path):
+    batches = list(read_title_batches(_write(tmp_path, "papers.csv"), batch_size=2))
+
+    assert batches == [
+        [("Paper A", "paper a"), ("Paper, B", "paper b")],
+        [("Paper C", "paper c")],
+    ]
+
+
+def test_read_title_batches_without_dedupe(tmp_path):
+    titles = [
+        title
+        for batch in read_title_batches(_write(tmp_path, "papers.csv"), dedupe=False)
+        for title, _ in batch
+    ]
+
+    assert titles == ["Paper A", "Paper, B", "paper a!", "Paper C"]
+
+
+def test_read_title_batches_gzip(tmp_path):
+    path = tmp_path / "papers.csv.gz"
+    path.write_bytes(gzip.compress(CSV.encode("utf-8")))
+
+    assert sum(len(batch) for batch in read_title_batches(str(path))) == 3
+
+
+def test_read_title_batches_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "papers.csv.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(CSV.encode("utf-8")))
+
+    assert sum(len(batch) for batch in read_title_batches(str(path))) == 3
+
+
+def test_read_title_batches_stdin(monkeypatch):
+    stdin = io.TextIOWrapper(io.BytesIO(CSV.encode("utf-8")), encoding="utf-8")
+    monkeypatch.setattr(sys, "stdin", stdin)
+
+    assert sum(len(batch) for batch in read_title_batches("-")) == 3
+    assert not stdin.closed
+
+
+def test_read_title_batches_in_worker_processes(tmp_path):
+    rows = "".join(f"Paper {i % 500}\n" for i in range(2000))
+    path = _write(tmp_path, "papers.csv", "Title\n" + rows)
+
+    batches = list(read_title_batches(path, batch_size=100, workers=2))
+
+    assert [title for batch in batches for title, _ in batch] == [
+        f"Paper {i}" for i in range(500)
+    ]
+
+
+def test_iter_title_chunks_requires_column(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_title_chunks(_write(tmp_path, "papers.csv"), column="Name"))
+
+
+def test_bounded_map_reads_ahead_lazily():
+    consumed = []
+
+    def items():
+        for i in range(100):
+            consumed.append(i)
+            yield i
+
+    with ThreadPoolExecutor(2) as pool:
+        results = bounded_map(pool, lambda x: x * 2, items(), prefetch=4)
+        assert next(results) == 0
+        assert len(consumed) == 4
+        assert list(results) == [x * 2 for x in range(1, 100)]